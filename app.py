@@ -2,6 +2,9 @@ from PySide6.QtWidgets import QApplication
 from ui.login import LoginDialog
 from ui.main_window import MainWindow
 from core.auth import load_tokens
+from core.workers import run_sync, shutdown_loop
+from core.http_cache import close_shared_client
+from core.token_store import flush_tokens
 import sys
 
 def run_main(username: str, app: QApplication):
@@ -17,8 +20,18 @@ def run_main(username: str, app: QApplication):
     w = MainWindow(username, on_logout=back_to_login)
     w.show()
 
+def close_clients():
+    # Antes de detener el loop: el cliente compartido (updater, /status) vive en él
+    try:
+        run_sync(close_shared_client(), timeout=5)
+    except Exception:
+        pass
+
 def main():
     app = QApplication(sys.argv)
+    app.aboutToQuit.connect(close_clients)
+    app.aboutToQuit.connect(shutdown_loop)
+    app.aboutToQuit.connect(flush_tokens)
 
     dlg = LoginDialog()
     can, user = dlg.should_autologin()
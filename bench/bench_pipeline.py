@@ -0,0 +1,438 @@
+# bench/bench_pipeline.py
+"""Benchmark del pipeline de registros contra una FAdeAPI local (tools/mock_fadeapi.py).
+
+Por cada combinación filas × sensores mide:
+
+- fetch / fetch_parallel: extremo a extremo por HTTP (ApiClient.iter_registros
+  e iter_registros_parallel + records_to_arrays) contra el mock en un proceso
+  aparte, con bytes por red y decodificados.
+- json_decode / to_arrays: decodificación incremental (iter_json_array) y
+  conversión a arrays sobre un cuerpo JSON ya generado, sin red.
+- merge: RegistrosStore.merge_arrays por páginas (lo que hace
+  RegistrosTab._merge con cada lote) y merge_overlap: re-merge de una página
+  del medio (ts ya presentes: se descartan como duplicados).
+- table: RegistrosTableModel + QTableView (reset, ancho de columnas por
+  muestreo, scroll al final y repintado) y table_append (una página nueva).
+- plot_build / plot_zoom / plot_append: GraficoTab.update_plot completo,
+  render con zoom al último 1 % y actualización incremental tras un append.
+- memoria: pico de tracemalloc armando store + gráfico (pasada aparte) y
+  ru_maxrss del proceso donde exista.
+
+Las etapas de red y JSON se limitan a --net-max-cells celdas (filas × sensores)
+y las de memoria a --max-cells; los casos que no entran se registran como
+'skipped' o con 'rows' menor al pedido. El resultado va a un JSON versionado
+para comparar corridas (--baseline).
+
+La configuración (QSettings) va a un ámbito propio en una carpeta temporal y
+los tokens quedan sólo en memoria: no se toca la configuración ni el keyring
+del usuario, y corre en máquinas sin keyring (CI, headless).
+
+Uso:
+    python bench/bench_pipeline.py
+    python bench/bench_pipeline.py --sizes 10k,100k --sensors 3,16 --repeat 5
+    python bench/bench_pipeline.py --baseline bench/results/anterior.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "tools"))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import numpy as np  # noqa: E402
+from PySide6.QtCore import QSettings  # noqa: E402
+from PySide6.QtWidgets import QApplication, QTableView  # noqa: E402
+
+from core.api import ApiClient, iter_json_array  # noqa: E402
+from core.auth import login  # noqa: E402
+from core.config import Config  # noqa: E402
+from core.registros_store import RegistrosStore, records_to_arrays  # noqa: E402
+from core.timeparse import iso_from_ns, parse_iso_ns  # noqa: E402
+from core.token_store import MemoryBackend, TokenStore, set_store  # noqa: E402
+from mock_fadeapi import SyntheticData  # noqa: E402
+from ui.main_window import GraficoTab  # noqa: E402
+from ui.registros_model import RegistrosTableModel, resize_columns_from_sample  # noqa: E402
+
+SCHEMA = 1
+RATE_HZ = 1000.0   # filas por segundo del mock: el ts avanza 1 ms por fila
+
+
+def parse_size(s: str) -> int:
+    s = s.strip().lower()
+    mult = {"k": 1_000, "m": 1_000_000}.get(s[-1:], 1)
+    return int(float(s[:-1] if mult > 1 else s) * mult)
+
+
+def synthetic_arrays(n: int, sensors: int, t0_ns: int = 1_700_000_000 * 10**9) -> tuple[np.ndarray, np.ndarray]:
+    """Mismas senoides que el mock, generadas vectorizadas."""
+    ts = t0_ns + np.arange(n, dtype=np.int64) * int(1e9 / RATE_HZ)
+    t = ts / 1e9
+    vals = np.empty((n, sensors))
+    for j in range(sensors):
+        vals[:, j] = 0.5 + 0.5 * np.sin(2 * np.pi * t / 60 + j * np.pi / 4)
+    return ts, vals
+
+
+def timed(fn, repeat: int) -> dict:
+    """Corre fn() 'repeat' veces; fn devuelve dict opcional con datos extra del último intento."""
+    times, extra = [], {}
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        extra = fn() or {}
+        times.append(time.perf_counter() - t0)
+    return {"seconds": min(times), "median_s": statistics.median(times), "runs": len(times), **extra}
+
+
+# ---------------------------------------------------------------- red ----
+class MockProcess:
+    """tools/mock_fadeapi.py en un proceso aparte (así el servidor no compite por el GIL)."""
+    def __init__(self, rows: int, sensors: int):
+        with socket.socket() as s:
+            s.bind(("127.0.0.1", 0))
+            self.port = s.getsockname()[1]
+        history = rows / RATE_HZ + 5
+        self.proc = subprocess.Popen(
+            [sys.executable, os.path.join(ROOT, "tools", "mock_fadeapi.py"), "--port", str(self.port),
+             "--rate", str(RATE_HZ), "--history", str(history), "--sensors", str(sensors)],
+            stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+        self.proc.stdout.readline()   # "Mock FAdeAPI en ..." → ya escucha
+        self.url = f"http://127.0.0.1:{self.port}/"
+
+    def close(self):
+        self.proc.terminate()
+        self.proc.wait(10)
+
+
+def isolate_settings(folder: str):
+    """QSettings en un ámbito propio dentro de 'folder' y tokens sólo en memoria."""
+    set_store(TokenStore(MemoryBackend()))
+    for fmt in (QSettings.Format.NativeFormat, QSettings.Format.IniFormat):
+        QSettings.setPath(fmt, QSettings.Scope.UserScope, folder)
+    # En Windows NativeFormat es el registro (setPath no aplica): el ámbito propio se borra al final
+    Config.application = f"{Config.application}-bench-{os.getpid()}"
+
+
+def bench_client(url: str) -> ApiClient:
+    """ApiClient contra el mock (con la configuración aislada por isolate_settings)."""
+    api = ApiClient("__bench__")
+    api.cfg.set_base_url(url)
+    api._set_tokens(None, None)
+    return api
+
+
+def bench_fetch(rows: int, sensors: int, repeat: int, page_size: int) -> dict:
+    mock = MockProcess(rows, sensors)
+    api = bench_client(mock.url)
+
+    async def run(parallel: bool) -> dict:
+        if api._access is None:
+            access, refresh = await login(api.base_url, "bench", "bench", client=await api.client())
+            api._set_tokens(access, refresh)
+        mark = api.transfer_stats.snapshot()
+        if parallel:
+            # El rango se fija a partir del primer ts que tiene el servidor
+            first = (await api.request("GET", "registros/", params={"limit": 1})).json()[0]["ts"]
+            last = iso_from_ns(parse_iso_ns(first) + int((rows - 1) * 1e9 / RATE_HZ))
+            it = api.iter_registros_parallel(first, last, concurrency=4, target_rows=page_size,
+                                             page_size=page_size)
+        else:
+            it = api.iter_registros(None, None, page_size=page_size, max_rows=rows)
+        got = 0
+        async for recs in it:
+            got += len(records_to_arrays(recs)[0])
+        wire, decoded = (a - b for a, b in zip(api.transfer_stats.snapshot(), mark))
+        return {"rows": got, "wire_bytes": wire, "decoded_bytes": decoded}
+
+    try:
+        out = {}
+        for name, parallel in (("fetch", False), ("fetch_parallel", True)):
+            loop = asyncio.new_event_loop()
+            try:
+                res = timed(lambda: loop.run_until_complete(run(parallel)), repeat)
+                loop.run_until_complete(api.aclose())
+            finally:
+                loop.run_until_complete(loop.shutdown_asyncgens())
+                loop.close()
+            res["rows_per_s"] = res["rows"] / res["seconds"] if res["seconds"] else None
+            out[name] = res
+        return out
+    finally:
+        mock.close()
+
+
+# ------------------------------------------------------------ decode ----
+def json_chunks(rows: int, sensors: int, chunk_chars: int = 1 << 16) -> list[str]:
+    """Cuerpo JSON como lo arma el mock, partido en fragmentos como los que entrega aiter_text."""
+    data = SyntheticData(rate=RATE_HZ, history_s=rows / RATE_HZ + 1, sensors=sensors)
+    text = "[" + ",".join(data.rows_json(a, min(rows, a + 10_000)) for a in range(0, rows, 10_000)) + "]"
+    return [text[i:i + chunk_chars] for i in range(0, len(text), chunk_chars)]
+
+
+def bench_decode(rows: int, sensors: int, repeat: int, page_size: int) -> dict:
+    chunks = json_chunks(rows, sensors)
+
+    async def agen():
+        for c in chunks:
+            yield c
+
+    async def decode() -> list[list]:
+        return [batch async for batch in iter_json_array(agen(), batch_size=page_size)]
+
+    batches = []
+
+    def run_json():
+        batches[:] = asyncio.run(decode())
+        return {"rows": sum(len(b) for b in batches), "body_chars": sum(len(c) for c in chunks)}
+
+    def run_arrays():
+        return {"rows": sum(len(records_to_arrays(b)[0]) for b in batches)}
+
+    return {"json_decode": timed(run_json, repeat), "to_arrays": timed(run_arrays, repeat)}
+
+
+# ---------------------------------------------------- store / UI ----
+def build_store(ts: np.ndarray, vals: np.ndarray, page_size: int) -> RegistrosStore:
+    store = RegistrosStore()
+    for a in range(0, len(ts), page_size):
+        store.merge_arrays(ts[a:a + page_size], vals[a:a + page_size])
+    return store
+
+
+def bench_store_ui(rows: int, sensors: int, repeat: int, page_size: int, app: QApplication) -> dict:
+    ts, vals = synthetic_arrays(rows + page_size, sensors)
+    ts_new, vals_new = ts[rows:], vals[rows:]          # una página extra para los appends
+    ts, vals = ts[:rows], vals[:rows]
+    out = {}
+
+    holder = {}
+
+    def run_merge():
+        holder["store"] = build_store(ts, vals, page_size)
+        return {"rows": len(holder["store"])}
+
+    out["merge"] = timed(run_merge, repeat)
+    store = holder["store"]
+
+    mid = rows // 2
+    out["merge_overlap"] = timed(
+        lambda: {"rows": store.merge_arrays(ts[mid:mid + page_size], vals[mid:mid + page_size])[1]}, repeat)
+
+    # --- tabla
+    view = QTableView()
+    view.resize(1200, 700)
+    model = RegistrosTableModel(store)
+    view.setModel(model)
+    view.show()
+    app.processEvents()
+
+    def run_table():
+        model.reset()
+        resize_columns_from_sample(view)
+        view.scrollToBottom()
+        view.viewport().repaint()
+        app.processEvents()
+
+    out["table"] = timed(run_table, repeat)
+
+    # --- gráfico
+    tab = GraficoTab()
+    tab.resize(1200, 700)
+    tab.show()
+    app.processEvents()
+
+    def run_plot_build():
+        tab._generation = None          # fuerza el recálculo completo
+        tab.update_plot(store)
+        app.processEvents()
+
+    out["plot_build"] = timed(run_plot_build, repeat)
+
+    x = tab._x[:tab._n]
+    vb = tab.plot.getViewBox()
+
+    def run_zoom():
+        vb.setXRange(x[int(len(x) * 0.99)], x[-1], padding=0)
+        tab._render()
+        app.processEvents()
+
+    out["plot_zoom"] = timed(run_zoom, repeat)
+    vb.enableAutoRange()
+
+    # --- append de una página nueva (camino del modo en vivo); una sola vez
+    t0 = time.perf_counter()
+    first, added = store.merge_arrays(ts_new, vals_new)
+    t1 = time.perf_counter()
+    model.notify_merge(first, added)
+    view.viewport().repaint()
+    app.processEvents()
+    t2 = time.perf_counter()
+    tab.update_plot(store)
+    app.processEvents()
+    t3 = time.perf_counter()
+    out["merge_append"] = {"seconds": t1 - t0, "runs": 1, "rows": added}
+    out["table_append"] = {"seconds": t2 - t1, "runs": 1, "rows": added}
+    out["plot_append"] = {"seconds": t3 - t2, "runs": 1, "rows": added}
+
+    tab.close(); view.close()
+    tab.deleteLater(); view.deleteLater()
+    app.processEvents()
+    return out
+
+
+def bench_memory(rows: int, sensors: int, page_size: int, app: QApplication) -> dict:
+    """Pico de tracemalloc armando store + pirámides del gráfico (NumPy informa sus buffers)."""
+    ts, vals = synthetic_arrays(rows, sensors)
+    tracemalloc.start()
+    try:
+        store = build_store(ts, vals, page_size)
+        store_peak = tracemalloc.get_traced_memory()[1]
+        tab = GraficoTab()
+        tab.update_plot(store)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    tab.deleteLater()
+    app.processEvents()
+    return {"input_bytes": ts.nbytes + vals.nbytes, "store_peak_bytes": store_peak,
+            "store_plot_peak_bytes": peak}
+
+
+def max_rss_bytes() -> int | None:
+    try:
+        import resource
+    except ImportError:   # Windows
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss if sys.platform == "darwin" else rss * 1024
+
+
+# ---------------------------------------------------------- corrida ----
+def run_case(rows: int, sensors: int, a, app: QApplication) -> dict:
+    case = {"rows": rows, "sensors": sensors, "status": "ok", "stages": {}}
+    cells = rows * sensors
+    if cells > a.max_cells:
+        case.update(status="skipped", reason=f"{cells:,} celdas > --max-cells {a.max_cells:,.0f}")
+        return case
+    repeat = a.repeat if cells <= 2e7 else 1
+    net_rows = min(rows, int(a.net_max_cells // sensors))
+    st = case["stages"]
+    if not a.no_network and net_rows:
+        st.update(bench_fetch(net_rows, sensors, repeat, a.page_size))
+    if net_rows:
+        st.update(bench_decode(net_rows, sensors, repeat, a.page_size))
+    st.update(bench_store_ui(rows, sensors, repeat, a.page_size, app))
+    if not a.no_memory:
+        case["memory"] = bench_memory(rows, sensors, a.page_size, app)
+    case["max_rss_bytes"] = max_rss_bytes()
+    for res in st.values():
+        if res.get("rows") and res.get("seconds"):
+            res.setdefault("rows_per_s", res["rows"] / res["seconds"])
+    return case
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, timeout=10).stdout.strip() or None
+    except Exception:
+        return None
+
+
+def compare(results: dict, baseline_path: str):
+    """Imprime nuevo/anterior del tiempo de cada etapa (>1 = más lento)."""
+    with open(baseline_path, encoding="utf-8") as f:
+        base = json.load(f)
+    old = {(c["rows"], c["sensors"]): c for c in base.get("cases", [])}
+    print(f"\nComparación con {baseline_path} (commit {base.get('git_commit')}): nuevo / anterior")
+    for c in results["cases"]:
+        b = old.get((c["rows"], c["sensors"]))
+        if b is None or c["status"] != "ok" or b.get("status") != "ok":
+            continue
+        parts = []
+        for name, res in c["stages"].items():
+            prev = b["stages"].get(name)
+            if prev and prev.get("seconds") and res.get("rows") == prev.get("rows"):
+                parts.append(f"{name} ×{res['seconds'] / prev['seconds']:.2f}")
+        print(f"  {c['rows']:>10,} × {c['sensors']:<3} " + "  ".join(parts))
+
+
+def print_case(c: dict):
+    head = f"{c['rows']:>10,} × {c['sensors']:<3}"
+    if c["status"] != "ok":
+        print(f"{head} omitido: {c['reason']}")
+        return
+    parts = []
+    for name, res in c["stages"].items():
+        part = f"{name} {res['seconds'] * 1000:.1f} ms"
+        if res.get("rows") and res["rows"] != c["rows"]:
+            part += f" ({res['rows']:,} filas)"   # tope --net-max-cells o lote agregado
+        parts.append(part)
+    mem = c.get("memory")
+    if mem:
+        parts.append(f"pico {mem['store_plot_peak_bytes'] / 2**20:.0f} MB")
+    print(f"{head} " + " | ".join(parts), flush=True)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark del pipeline de registros contra el mock de FAdeAPI.")
+    ap.add_argument("--sizes", default="10k,100k,1M,10M", help="filas por caso (sufijos k/M)")
+    ap.add_argument("--sensors", default="3,16,64")
+    ap.add_argument("--repeat", type=int, default=3, help="repeticiones (se reporta el mínimo y la mediana)")
+    ap.add_argument("--page-size", type=int, default=10_000, help="filas por página/lote")
+    ap.add_argument("--net-max-cells", type=float, default=1e7,
+                    help="tope filas×sensores para las etapas de red y JSON")
+    ap.add_argument("--max-cells", type=float, default=1e8, help="casos más grandes se omiten")
+    ap.add_argument("--no-network", action="store_true", help="omitir fetch contra el mock")
+    ap.add_argument("--no-memory", action="store_true", help="omitir la pasada con tracemalloc")
+    ap.add_argument("-o", "--output", help="archivo JSON (por defecto bench/results/bench-<fecha>.json)")
+    ap.add_argument("--baseline", help="JSON de una corrida anterior para comparar")
+    a = ap.parse_args()
+
+    sizes = [parse_size(s) for s in a.sizes.split(",") if s.strip()]
+    sensors = [int(s) for s in a.sensors.split(",") if s.strip()]
+    out = a.output or os.path.join(ROOT, "bench", "results", time.strftime("bench-%Y%m%d-%H%M%S.json"))
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+
+    app = QApplication.instance() or QApplication([])
+    results = {
+        "schema": SCHEMA,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "git_commit": git_commit(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "args": vars(a),
+        "cases": [],
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        isolate_settings(tmp)
+        try:
+            for n in sizes:
+                for s in sensors:
+                    case = run_case(n, s, a, app)
+                    results["cases"].append(case)
+                    print_case(case)
+                    # Guardado parcial: una corrida larga interrumpida igual deja resultados
+                    with open(out, "w", encoding="utf-8") as f:
+                        json.dump(results, f, indent=2)
+        finally:
+            QSettings(Config.organization, Config.application).clear()
+    print(f"\nResultados en {out}")
+    if a.baseline:
+        compare(results, a.baseline)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,134 @@
 # core/api.py
+import asyncio
+import json
+import os
+import tempfile
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
 import httpx
+from jose import jwt
 from core.config import Config
 from core.auth import load_tokens, refresh, save_tokens
+from core.http_cache import CachedTransport, ResponseCache
+from core.live import is_transient, retry_after_s
+from core.resilience import RETRY_STATUS, CircuitBreaker, CircuitOpenError, RetryPolicy
+from core.telemetry import RequestTrace, endpoint_label, telemetry
+from core.timeparse import iso_from_ns, parse_iso_array, parse_iso_ns
+from core.transfer_stats import AccountingTransport, TransferStats, accept_encoding
+
+# HTTP/2 requiere el extra 'h2' (pip install httpx[http2]); sin él se usa HTTP/1.1
+try:
+    import h2  # noqa: F401
+    _HTTP2_AVAILABLE = True
+except Exception:
+    _HTTP2_AVAILABLE = False
+
+# Segundos de anticipación con los que se renueva el access token antes de su 'exp'
+REFRESH_SKEW = 30
+
+
+def _token_exp(token: str | None) -> float | None:
+    """Lee el claim 'exp' del JWT sin verificar la firma (sólo para planificar el refresh)."""
+    if not token:
+        return None
+    try:
+        exp = jwt.get_unverified_claims(token).get("exp")
+        return float(exp) if exp is not None else None
+    except Exception:
+        return None
+
+
+_json_decoder = json.JSONDecoder()
+
+
+async def iter_json_array(chunks: AsyncIterator[str], batch_size: int = 5000) -> AsyncIterator[list]:
+    """Decodifica incrementalmente un array JSON de nivel superior a partir de fragmentos de texto.
+
+    Cada elemento se decodifica apenas llega completo, y se entregan lotes de
+    hasta batch_size elementos, así nunca se retiene el cuerpo entero.
+    Después del ']' se lee el resto del cuerpo hasta el final (sólo puede
+    haber espacios): una respuesta leída entera deja la conexión keep-alive
+    reutilizable para la página siguiente.
+
+    Raises:
+        ValueError: Si el cuerpo no es un array JSON o hay contenido después del array.
+    """
+    buf, pos, started, batch = "", 0, False, []
+    busy = 0.0  # tiempo de decodificación del lote en curso (sin contar la espera de red)
+    async for chunk in chunks:
+        t0 = time.perf_counter()
+        buf = buf[pos:] + chunk
+        pos = 0
+        while True:
+            while pos < len(buf) and buf[pos] in " \t\r\n,":
+                pos += 1
+            if pos >= len(buf):
+                break
+            if not started:
+                if buf[pos] != "[":
+                    raise ValueError("Se esperaba un array JSON")
+                started, pos = True, pos + 1
+                continue
+            if buf[pos] == "]":
+                busy += time.perf_counter() - t0
+                if buf[pos + 1:].strip():
+                    raise ValueError("Contenido inesperado después del array JSON")
+                async for rest in chunks:
+                    if rest.strip():
+                        raise ValueError("Contenido inesperado después del array JSON")
+                if batch:
+                    telemetry.observe("stage_seconds", busy, stage="json_decode")
+                    yield batch
+                return
+            try:
+                obj, pos = _json_decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                break  # elemento incompleto: esperar el próximo fragmento
+            batch.append(obj)
+            if len(batch) >= batch_size:
+                telemetry.observe("stage_seconds", busy + time.perf_counter() - t0, stage="json_decode")
+                yield batch
+                batch, busy, t0 = [], 0.0, time.perf_counter()
+        busy += time.perf_counter() - t0
+    if not started:
+        raise ValueError("Se esperaba un array JSON")
+    if batch:
+        telemetry.observe("stage_seconds", busy, stage="json_decode")
+        yield batch
+
+
+class StreamUnsupported(RuntimeError):
+    """El servidor no expone el endpoint de streaming (usar polling incremental)."""
+
+
+async def iter_sse(lines: AsyncIterator[str]) -> AsyncIterator[dict]:
+    """Parsea un flujo text/event-stream en eventos {'event', 'data', 'id', 'retry'}.
+
+    Los comentarios (':' al inicio, usados como keep-alive) se ignoran; las
+    líneas 'data:' consecutivas se unen con '\\n' según la especificación SSE.
+    """
+    event, data, ev_id, retry = None, [], None, None
+    async for line in lines:
+        line = line.rstrip("\r\n")
+        if not line:
+            if data:
+                yield {"event": event or "message", "data": "\n".join(data), "id": ev_id, "retry": retry}
+            event, data, retry = None, [], None
+            continue
+        if line.startswith(":"):
+            continue
+        field, _, value = line.partition(":")
+        value = value[1:] if value.startswith(" ") else value
+        if field == "data":
+            data.append(value)
+        elif field == "event":
+            event = value
+        elif field == "id":
+            ev_id = value
+        elif field == "retry" and value.isdigit():
+            retry = int(value)
+
 
 class ApiClient:
     def __init__(self, username: str):
@@ -13,6 +140,25 @@ class ApiClient:
         self.cfg = Config()
         self.username = username
         self._access, self._refresh = load_tokens(username)
+        self._access_exp = _token_exp(self._access)
+        self._client: httpx.AsyncClient | None = None
+        self._client_loop: asyncio.AbstractEventLoop | None = None
+        self._client_opts: tuple | None = None
+        # Solicitudes en curso por cliente: uno reemplazado se cierra cuando llega a 0
+        self._leases: dict[httpx.AsyncClient, int] = {}
+        self._refresh_lock: asyncio.Lock | None = None
+        self._lock_loop: asyncio.AbstractEventLoop | None = None
+        # Se incrementa en cada aclose(): los streams abiertos antes dejan de reconectarse
+        self._closed_gen = 0
+        # Caché de respuestas condicionales; sobrevive a recrear el cliente
+        self.http_cache = ResponseCache()
+        # Bytes por red vs decodificados de cada respuesta (relación de compresión)
+        self.transfer_stats = TransferStats()
+        # Identidad (usuarios/me) de la sesión; se descarta al cambiar el token o ante un 403
+        self._me: dict | None = None
+        # Reintentos y circuit breaker (sobreviven a recrear el cliente)
+        self.retry = RetryPolicy(attempts=self.cfg.get_http_retries())
+        self.breaker = CircuitBreaker()
 
     @property
     def base_url(self) -> str:
@@ -24,50 +170,278 @@ class ApiClient:
         url = self.cfg.base_url()
         return url if url.endswith("/") else url + "/"
 
-    async def _ensure_token(self, r: httpx.Response) -> bool:
+    def _build_client(self) -> httpx.AsyncClient:
+        """Crea el AsyncClient con pool keep-alive, compresión negociada y caché condicional según la configuración.
+
+        Returns:
+            httpx.AsyncClient: Cliente apuntando a la URL base actual.
+        """
+        limits = httpx.Limits(
+            max_connections=self.cfg.get_http_max_connections(),
+            max_keepalive_connections=self.cfg.get_http_max_keepalive(),
+            keepalive_expiry=self.cfg.get_http_keepalive_expiry(),
+        )
+        transport = httpx.AsyncHTTPTransport(limits=limits, http2=self.cfg.get_http2() and _HTTP2_AVAILABLE)
+        if self.cfg.get_http_cache():
+            transport = CachedTransport(transport, self.http_cache, self.cfg.get_http_cache_ttls())
+        transport = AccountingTransport(transport, self.transfer_stats)
+        return httpx.AsyncClient(
+            base_url=self.base_url,
+            timeout=httpx.Timeout(self.cfg.get_http_read_timeout(), connect=self.cfg.get_http_connect_timeout()),
+            follow_redirects=True,
+            transport=transport,
+            headers={"Accept-Encoding": accept_encoding(self.cfg.get_http_compression())},
+            event_hooks={"request": [self._trace_request]},
+        )
+
+    async def _trace_request(self, request: httpx.Request):
+        """Event hook: etiqueta la solicitud con su endpoint y engancha el trace de httpcore."""
+        path = request.url.path
+        base = httpx.URL(self.base_url).path
+        endpoint = endpoint_label(path[len(base):] if path.startswith(base) else path)
+        request.extensions["endpoint"] = endpoint
+        request.extensions["trace"] = RequestTrace(telemetry, endpoint)
+
+    def _client_options(self) -> tuple:
+        """Opciones de configuración del transporte, que obligan a recrear el cliente si cambian."""
+        cfg = self.cfg
+        return (self.base_url, cfg.get_http2(), cfg.get_http_compression(), cfg.get_http_cache(),
+                cfg.get_http_cache_ttls(), cfg.get_http_connect_timeout(), cfg.get_http_read_timeout(),
+                cfg.get_http_max_connections(), cfg.get_http_max_keepalive(), cfg.get_http_keepalive_expiry())
+
+    async def client(self) -> httpx.AsyncClient:
+        """Devuelve el cliente HTTP persistente, creándolo si hace falta.
+
+        Las conexiones de httpx quedan ligadas al event loop que las abrió, por
+        lo que el cliente se recrea si se invoca desde otro loop o si cambió la
+        configuración del transporte (URL base, HTTP/2, compresión, caché,
+        timeouts o límites del pool). El reemplazado se cierra recién cuando
+        terminan las solicitudes que lo usan (ver _lease). Los reintentos
+        configurados se aplican sin recrearlo; el circuit breaker y el lock de
+        refresh se conservan.
+
+        Returns:
+            httpx.AsyncClient: Cliente compartido por todos los endpoints.
+        """
+        loop = asyncio.get_running_loop()
+        if self._lock_loop is not loop:
+            # asyncio.Lock queda ligado al loop en que se usa
+            self._refresh_lock = asyncio.Lock()
+            self._lock_loop = loop
+        self.retry.attempts = self.cfg.get_http_retries()
+        c, c_loop = self._client, self._client_loop
+        opts = self._client_options()
+        if c is None or c.is_closed or c_loop is not loop or self._client_opts != opts:
+            self._client = self._build_client()
+            self._client_loop = loop
+            self._client_opts = opts
+            if c is not None and not c.is_closed and c_loop is loop and not self._leases.get(c):
+                await c.aclose()
+        return self._client
+
+    @asynccontextmanager
+    async def _lease(self):
+        """Cliente actual, contado como en uso hasta salir del bloque.
+
+        Yields:
+            httpx.AsyncClient: El mismo cliente durante todo el bloque, aunque client() lo reemplace.
+        """
+        c = await self.client()
+        self._leases[c] = self._leases.get(c, 0) + 1
+        try:
+            yield c
+        finally:
+            n = self._leases.pop(c) - 1
+            if n:
+                self._leases[c] = n
+            elif c is not self._client and not c.is_closed:
+                await c.aclose()
+
+    async def aclose(self):
+        """Cierra el pool de conexiones (logout / cierre de la ventana)."""
+        c, loop = self._client, self._client_loop
+        self._client, self._client_loop = None, None
+        self._closed_gen += 1
+        if c is None or c.is_closed:
+            return
+        if loop is asyncio.get_running_loop():
+            await c.aclose()
+
+    @property
+    def has_tokens(self) -> bool:
+        """True si hay una sesión (access o refresh token) con la que consultar la API."""
+        return bool(self._access or self._refresh)
+
+    def _set_tokens(self, access: str | None, refresh_token: str | None):
+        self._access, self._refresh = access, refresh_token
+        self._access_exp = _token_exp(access)
+        self._me = None
+
+    async def _refresh_tokens(self, stale_access: str | None) -> bool:
+        """Refresca los tokens una sola vez aunque haya varios llamadores concurrentes.
+
+        El primero que toma el lock hace el refresh; los demás, al entrar, ven
+        que el access token ya no es el que tenían y reutilizan el nuevo.
+
+        Args:
+            stale_access (str | None): Access token que el llamador considera vencido.
+
+        Returns:
+            bool: True si hay un access token nuevo disponible; False si no hay refresh token.
+        """
+        async with self._lease() as c, self._refresh_lock:
+            if self._access != stale_access:
+                return True
+            if not self._refresh:
+                return False
+            new_access, new_refresh = await refresh(self.base_url, self._refresh, client=c)
+            self._set_tokens(new_access, new_refresh)
+            save_tokens(self.username, new_access, new_refresh)
+            return True
+
+    async def _ensure_fresh(self):
+        """Renueva el access token de forma proactiva si está por vencer (según 'exp')."""
+        if self._access_exp is None or not self._refresh:
+            return
+        if time.time() >= self._access_exp - REFRESH_SKEW:
+            await self._refresh_tokens(self._access)
+
+    async def _ensure_token(self, r: httpx.Response, used_access: str | None = None) -> bool:
         """Refresca el token de acceso si la respuesta fue 401 y existe refresh token.
 
         Args:
             r (httpx.Response): Respuesta HTTP que originó el chequeo.
+            used_access (str | None): Access token enviado en esa solicitud.
 
         Returns:
-            bool: True si se refrescó el token y se guardó; False en caso contrario.
+            bool: True si hay un token nuevo para reintentar; False en caso contrario.
 
         Raises:
             Exception: Si falla el flujo de refresh (propaga excepciones de red).
         """
         if r.status_code != 401 or not self._refresh:
             return False
-        new_access, new_refresh = await refresh(self.base_url, self._refresh)
-        self._access, self._refresh = new_access, new_refresh
-        save_tokens(self.username, new_access, new_refresh)
-        return True
+        return await self._refresh_tokens(used_access)
+
+    async def _send_once(self, c: httpx.AsyncClient, method: str, path: str, stream: bool,
+                         headers: dict, **kwargs) -> httpx.Response:
+        """Un intento autenticado (con refresh proactivo y reintento ante 401)."""
+        await self._ensure_fresh()
+        used_access = self._access
+        if used_access:
+            headers["Authorization"] = f"Bearer {used_access}"
+        r = await c.send(c.build_request(method, path, headers=headers, **kwargs), stream=stream)
+        if r.status_code == 401 and self._refresh:
+            await r.aclose()
+            if await self._ensure_token(r, used_access):
+                headers["Authorization"] = f"Bearer {self._access}"
+                r = await c.send(c.build_request(method, path, headers=headers, **kwargs), stream=stream)
+        return r
+
+    async def _send(self, c: httpx.AsyncClient, method: str, path: str, stream: bool = False,
+                    **kwargs) -> httpx.Response:
+        """Envía la solicitud autenticada con el cliente 'c' sin validar el estado final.
+
+        Aplica la política de resiliencia: reintentos con backoff y jitter
+        (idempotentes ante red caída, 5xx y 429; cualquier método si no se
+        pudo conectar) y circuit breaker, que falla de inmediato mientras el
+        servidor está caído. Con stream=True sólo se reintenta antes de
+        entregar la respuesta, nunca a mitad del cuerpo.
+
+        Raises:
+            CircuitOpenError: Si el circuito está abierto.
+            httpx.TransportError: Si se agotan los reintentos por errores de red.
+        """
+        headers = kwargs.pop("headers", {})
+        endpoint = endpoint_label(path)
+        try:
+            probe = self.breaker.before()
+        except CircuitOpenError:
+            telemetry.inc("http_errors_total", endpoint=endpoint, method=method, kind="CircuitOpenError")
+            raise
+        attempt = 0
+        t0 = time.perf_counter()
+        try:
+            while True:
+                try:
+                    r = await self._send_once(c, method, path, stream, headers, **kwargs)
+                except httpx.TransportError as e:
+                    if probe or not self.retry.should_retry(method, attempt, exc=e):
+                        self.breaker.on_failure()
+                        raise
+                    delay = self.retry.delay(attempt)
+                else:
+                    # 429 no cuenta como falla: el servidor responde, sólo pide bajar el ritmo
+                    alive = r.status_code not in RETRY_STATUS or r.status_code == 429
+                    if alive:
+                        self.breaker.on_success()
+                    if r.status_code not in RETRY_STATUS or probe or \
+                            not self.retry.should_retry(method, attempt, response=r):
+                        if not alive:
+                            self.breaker.on_failure()
+                        break
+                    delay = self.retry.delay(attempt, r)
+                    await r.aclose()
+                attempt += 1
+                telemetry.inc("http_retries_total", endpoint=endpoint, method=method)
+                await asyncio.sleep(delay)
+        except Exception as e:
+            telemetry.inc("http_errors_total", endpoint=endpoint, method=method, kind=type(e).__name__)
+            raise
+        finally:
+            if probe:
+                self.breaker.release()
+        # Hasta los headers de la respuesta final, reintentos incluidos
+        telemetry.observe("http_request_seconds", time.perf_counter() - t0, endpoint=endpoint, method=method)
+        telemetry.inc("http_requests_total", endpoint=endpoint, method=method, status=r.status_code)
+        if r.status_code == 403:
+            # El servidor manda: si niega permisos, la identidad cacheada puede estar desactualizada
+            self._me = None
+        return r
 
     async def request(self, method: str, path: str, **kwargs):
         """Realiza una solicitud HTTP autenticada y reintenta tras refrescar token si es 401.
 
+        Si el access token está por vencer se renueva antes de enviar la solicitud.
+
         Args:
             method (str): Método HTTP (GET, POST, etc.).
             path (str): Ruta relativa dentro de la API.
-            **kwargs: Parámetros adicionales aceptados por httpx.AsyncClient.request.
+            **kwargs: Parámetros adicionales aceptados por httpx.AsyncClient.build_request.
+            La conexión se toma del pool persistente del cliente.
 
         Returns:
             httpx.Response: Respuesta HTTP con estado exitoso.
 
         Raises:
-            httpx.HTTPStatusError: Si la respuesta final no es exitosa.
+            httpx.HTTPStatusError: Si la respuesta final no es exitosa (tras los reintentos).
+            CircuitOpenError: Si el servidor viene fallando y el circuito está abierto.
             Exception: Errores de red u otros durante la solicitud.
         """
-        headers = kwargs.pop("headers", {})
-        if self._access:
-            headers["Authorization"] = f"Bearer {self._access}"
-        async with httpx.AsyncClient(base_url=self.base_url, timeout=60, follow_redirects=True) as c:
-            r = await c.request(method, path, headers=headers, **kwargs)
-            if r.status_code == 401 and await self._ensure_token(r):
-                headers["Authorization"] = f"Bearer {self._access}"
-                r = await c.request(method, path, headers=headers, **kwargs)
-            r.raise_for_status()
-            return r
+        async with self._lease() as c:
+            r = await self._send(c, method, path, **kwargs)
+        r.raise_for_status()
+        return r
+
+    @asynccontextmanager
+    async def stream(self, method: str, path: str, **kwargs):
+        """Como request(), pero sin leer el cuerpo: se consume con aiter_bytes/aiter_text.
+
+        Yields:
+            httpx.Response: Respuesta en modo streaming (se cierra al salir del bloque).
+
+        Raises:
+            httpx.HTTPStatusError: Si la respuesta no es exitosa.
+        """
+        async with self._lease() as c:
+            r = await self._send(c, method, path, stream=True, **kwargs)
+            try:
+                if r.is_error:
+                    await r.aread()
+                r.raise_for_status()
+                yield r
+            finally:
+                await r.aclose()
 
     # -------- Registros --------
     async def get_registros(self, limit: int = 100, desde_iso: str | None = None, hasta_iso: str | None = None):
@@ -89,6 +463,202 @@ class ApiClient:
         r = await self.request("GET", "registros/", params=params)
         return r.json()
 
+    async def iter_registros(self, desde_iso: str | None = None, hasta_iso: str | None = None,
+                             page_size: int = 10_000, max_rows: int | None = None,
+                             batch_size: int = 5000) -> AsyncIterator[list[dict]]:
+        """Recorre el rango por páginas (cursor sobre 'desde') entregando lotes a medida que llegan.
+
+        Cada página es un GET registros/ con limit=page_size; su cuerpo se
+        decodifica en streaming, así la memoria queda acotada por el tamaño
+        de lote y los primeros registros están disponibles tras un round trip.
+        La página siguiente arranca 1 µs después del ts máximo recibido.
+
+        Args:
+            desde_iso (str | None): Límite inferior ISO (opcional).
+            hasta_iso (str | None): Límite superior ISO (opcional).
+            page_size (int): Registros por solicitud.
+            max_rows (int | None): Tope total de registros (None = hasta agotar el rango).
+            batch_size (int): Máximo de registros por lote entregado.
+
+        Yields:
+            list[dict]: Lotes de registros con 'ts' y 'sensores'.
+        """
+        cursor, total = desde_iso, 0
+        while True:
+            limit = page_size if max_rows is None else min(page_size, max_rows - total)
+            if limit <= 0:
+                return
+            params = {"limit": limit}
+            if cursor:
+                params["desde"] = cursor
+            if hasta_iso:
+                params["hasta"] = hasta_iso
+            got, max_ns = 0, None
+            async with self.stream("GET", "registros/", params=params) as r:
+                async for batch in iter_json_array(r.aiter_text(), min(batch_size, limit)):
+                    got += len(batch)
+                    ts = parse_iso_array([b["ts"] for b in batch if b.get("ts")])
+                    if len(ts):
+                        m = int(ts.max())
+                        max_ns = m if max_ns is None else max(max_ns, m)
+                    yield batch
+            total += got
+            if got < limit or max_ns is None:
+                return
+            cursor = iso_from_ns(max_ns + 1000)
+
+    async def iter_registros_parallel(self, desde_iso: str, hasta_iso: str | None = None,
+                                      concurrency: int = 4, target_rows: int = 10_000,
+                                      initial_window_s: float = 3600.0,
+                                      page_size: int = 10_000,
+                                      max_window_rows: int | None = None) -> AsyncIterator[list[dict]]:
+        """Descarga el intervalo en ventanas de tiempo concurrentes y entrega los lotes en orden.
+
+        El ancho de cada ventana nueva se ajusta con la densidad de la última
+        ventana terminada (filas/segundo) para que traiga ~target_rows
+        registros; una ventana vacía cuadruplica el ancho, así los tramos sin
+        datos se saltean en pocas solicitudes. Hasta conocer la densidad se
+        lanza una sola ventana de prueba.
+
+        Cada ventana trae a lo sumo max_window_rows registros; si se corta, el
+        resto del tramo se pide como una ventana más. Entre ventanas en vuelo y
+        terminadas sin entregar hay a lo sumo 2 × concurrency, lo que acota la
+        memoria retenida para entregar en orden.
+
+        Args:
+            desde_iso (str): Inicio del intervalo (ISO).
+            hasta_iso (str | None): Fin del intervalo (ISO); None = ahora.
+            concurrency (int): Ventanas simultáneas como máximo.
+            target_rows (int): Registros buscados por ventana.
+            initial_window_s (float): Ancho de la primera ventana, antes de conocer la densidad.
+            page_size (int): Tamaño de página dentro de cada ventana.
+            max_window_rows (int | None): Tope de registros por ventana (None = 2 × target_rows).
+
+        Yields:
+            list[dict]: Lotes de registros, en orden creciente de ts.
+        """
+        t0 = parse_iso_ns(desde_iso)
+        t1 = parse_iso_ns(hasta_iso) if hasta_iso else time.time_ns()
+        if t1 <= t0:
+            return
+        min_span = 1_000_000_000          # 1 s
+        span = max(min_span, int(initial_window_s * 1e9))
+        cap = max_window_rows or 2 * target_rows
+        max_ahead = 2 * concurrency
+
+        async def fetch(a: int, b: int) -> tuple[list[list[dict]], int, int]:
+            """Trae [a, b) (la última ventana incluye t1). Devuelve (lotes, filas, hasta dónde cubrió)."""
+            out, rows, max_ns = [], 0, None
+            b_incl = b if b == t1 else b - 1000
+            async for batch in self.iter_registros(iso_from_ns(a), iso_from_ns(b_incl),
+                                                   page_size=min(page_size, cap), max_rows=cap):
+                out.append(batch)
+                rows += len(batch)
+                ts = parse_iso_array([x["ts"] for x in batch if x.get("ts")])
+                if len(ts):
+                    m = int(ts.max())
+                    max_ns = m if max_ns is None else max(max_ns, m)
+            if rows >= cap and max_ns is not None and max_ns + 1000 < b:
+                return out, rows, max_ns + 1000   # cortada por el tope: falta [max_ns + 1 µs, b)
+            return out, rows, b
+
+        running: dict[asyncio.Task, tuple[int, int]] = {}
+        ready: dict[int, tuple[list[list[dict]], int]] = {}   # inicio → (lotes, fin cubierto)
+        remainders: list[tuple[int, int]] = []                # restos de ventanas cortadas
+        next_start, emit_pos, calibrated = t0, t0, False
+        try:
+            while running or ready or remainders or next_start < t1:
+                while len(running) < concurrency:
+                    if remainders:
+                        # Los restos van primero y sin mirar max_ahead: la entrega en orden los espera
+                        a, b = remainders.pop(0)
+                    elif next_start < t1 and len(running) + len(ready) < max_ahead \
+                            and (calibrated or not running):
+                        a, b = next_start, min(t1, next_start + span)
+                        next_start = b
+                    else:
+                        break
+                    running[asyncio.create_task(fetch(a, b))] = (a, b)
+                if running:
+                    done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                    for task in sorted(done, key=lambda t: running[t][0]):
+                        a, b = running.pop(task)
+                        batches, rows, end = task.result()
+                        if end < b:
+                            remainders.append((end, b))
+                            remainders.sort()
+                        if rows:
+                            calibrated = True
+                            span = max(min_span, int(target_rows * (end - a) / rows))
+                        elif b - a >= span:
+                            span *= 4
+                        ready[a] = (batches, end)
+                while emit_pos in ready:
+                    batches, emit_pos = ready.pop(emit_pos)
+                    for batch in batches:
+                        yield batch
+        finally:
+            for task in running:
+                task.cancel()
+
+    async def stream_registros(self, desde_iso: str | None = None,
+                               max_backoff_s: float = 30.0) -> AsyncIterator[list[dict]]:
+        """Se suscribe a registros/stream (Server-Sent Events) y entrega los registros nuevos.
+
+        Cada evento 'registro' trae un registro o una lista en 'data' (JSON). Si
+        la conexión se corta (red, 5xx, 429 o fin del stream) se reconecta con
+        backoff, retomando 1 µs después del último ts recibido. Si entretanto se
+        cerró el cliente (aclose), el generador termina en vez de reconectarse.
+
+        Args:
+            desde_iso (str | None): Retomar desde este ts (ISO); None = sólo lo nuevo.
+            max_backoff_s (float): Espera máxima entre reconexiones.
+
+        Yields:
+            list[dict]: Registros recibidos en cada evento.
+
+        Raises:
+            StreamUnsupported: Si el servidor no tiene el endpoint (404/405/501).
+            httpx.HTTPStatusError: Ante otros errores HTTP no recuperables.
+        """
+        cursor, delay = desde_iso, 1.0
+        # Sin límite de lectura: el servidor puede pasar un rato sin eventos
+        timeout = httpx.Timeout(None, connect=self.cfg.get_http_connect_timeout())
+        gen = self._closed_gen
+        while self._closed_gen == gen:
+            params = {"desde": cursor} if cursor else {}
+            wait = delay
+            try:
+                async with self.stream("GET", "registros/stream", params=params, timeout=timeout,
+                                       headers={"Accept": "text/event-stream"}) as r:
+                    async for ev in iter_sse(r.aiter_lines()):
+                        if ev["retry"] is not None:
+                            delay = ev["retry"] / 1000
+                        if ev["event"] not in ("registro", "message"):
+                            continue
+                        payload = json.loads(ev["data"])
+                        recs = payload if isinstance(payload, list) else [payload]
+                        ts = parse_iso_array([x["ts"] for x in recs if x.get("ts")])
+                        if len(ts):
+                            cursor = iso_from_ns(int(ts.max()) + 1000)
+                        delay = 1.0
+                        yield recs
+                wait = delay
+            except httpx.HTTPStatusError as e:
+                if e.response.status_code in (404, 405, 501):
+                    raise StreamUnsupported("El servidor no soporta registros/stream") from e
+                if not is_transient(e):
+                    raise
+                wait = retry_after_s(e) or delay
+            except httpx.TransportError:
+                wait = delay
+            except CircuitOpenError as e:
+                wait = max(delay, e.retry_in)
+            if self._closed_gen != gen:
+                return
+            await asyncio.sleep(min(wait, max_backoff_s))
+            delay = min(max_backoff_s, delay * 2)
+
     async def download_csv(self) -> bytes:
         """Descarga el CSV de registros.
 
@@ -98,6 +668,42 @@ class ApiClient:
         r = await self.request("GET", "registros/csv")
         return r.content
 
+    async def download_csv_to(self, path: str, gzip: bool = False) -> AsyncIterator[tuple[int, int | None]]:
+        """Descarga el CSV de registros directamente a disco, en streaming.
+
+        Los bytes se escriben en un archivo temporal en la carpeta destino que
+        se renombra atómicamente a 'path' al terminar; si la descarga falla o
+        se cancela (cerrando el generador) el temporal se borra y 'path' queda
+        intacto. La memoria usada no depende del tamaño del CSV.
+
+        Args:
+            path (str): Ruta final del archivo.
+            gzip (bool): Pedir transferencia comprimida (zstd/br/gzip según disponibilidad;
+                se descomprime al vuelo).
+
+        Yields:
+            tuple[int, int | None]: (bytes recibidos por la red, total según Content-Length o None).
+        """
+        folder = os.path.dirname(os.path.abspath(path))
+        fd, tmp = tempfile.mkstemp(prefix=".registros-", suffix=".part", dir=folder)
+        headers = {"Accept-Encoding": accept_encoding(gzip)}
+        try:
+            with os.fdopen(fd, "wb") as f:
+                async with self.stream("GET", "registros/csv", headers=headers) as r:
+                    total = r.headers.get("Content-Length")
+                    total = int(total) if total and total.isdigit() else None
+                    yield 0, total
+                    async for chunk in r.aiter_bytes():
+                        f.write(chunk)
+                        yield r.num_bytes_downloaded, total
+            os.replace(tmp, path)
+        except BaseException:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            raise
+
     async def delete_registros(self):
         """Elimina todos los registros.
 
@@ -107,15 +713,40 @@ class ApiClient:
         return (await self.request("DELETE", "registros/")).json()
 
     # -------- Usuarios --------
-    async def get_me(self):
+    async def get_me(self, fresh: bool = False):
         """Obtiene los datos del usuario autenticado.
 
+        Args:
+            fresh (bool): Revalidar con el servidor aunque la caché HTTP tenga una copia vigente.
+
         Returns:
             dict: Información del usuario actual.
         """
-        r = await self.request("GET", "usuarios/me")
+        headers = {"Cache-Control": "no-cache"} if fresh else {}
+        r = await self.request("GET", "usuarios/me", headers=headers)
         return r.json()
 
+    async def identity(self, refresh: bool = False) -> dict:
+        """Datos del usuario de la sesión, consultados una vez y reutilizados.
+
+        Se vuelve a pedir usuarios/me sólo si cambió el token o si el servidor
+        respondió 403 desde la última consulta.
+
+        Args:
+            refresh (bool): Forzar la consulta al servidor (sin la copia de la caché HTTP).
+
+        Returns:
+            dict: Información del usuario actual (incluye 'role').
+        """
+        if self._me is None or refresh:
+            self._me = await self.get_me(fresh=refresh)
+        return self._me
+
+    @property
+    def is_admin(self) -> bool | None:
+        """True/False según la identidad cacheada; None si todavía no se conoce."""
+        return None if self._me is None else self._me.get("role") == "admin"
+
     async def list_usuarios(self):
         """Lista todos los usuarios (requiere permisos adecuados).
 
@@ -1,41 +1,36 @@
-import keyring
+# core/auth.py
 from typing import Optional
 import httpx
+from core.token_store import SERVICE, get_store  # noqa: F401  (SERVICE se re-exporta)
 
-SERVICE = "FADEAPI-Client"
-
+# Los tokens pasan por el TokenStore: caché en memoria + persistencia diferida al keyring
 def save_tokens(username: str, access: str, refresh: str):
-    keyring.set_password(SERVICE, f"{username}:access", access)
-    keyring.set_password(SERVICE, f"{username}:refresh", refresh)
+    get_store().save(username, access, refresh)
 
 def load_tokens(username: str) -> tuple[Optional[str], Optional[str]]:
-    return (
-        keyring.get_password(SERVICE, f"{username}:access"),
-        keyring.get_password(SERVICE, f"{username}:refresh"),
-    )
-    
-# core/auth.py
+    return get_store().load(username)
+
 def delete_tokens(username: str):
-    try:
-        keyring.delete_password(SERVICE, f"{username}:access")
-    except Exception:
-        pass
-    try:
-        keyring.delete_password(SERVICE, f"{username}:refresh")
-    except Exception:
-        pass
+    get_store().delete(username)
+
 
+async def _post_token(base_url: str, path: str, client: Optional[httpx.AsyncClient], **kwargs) -> tuple[str, str]:
+    # Si el llamador ya tiene un cliente con pool (ApiClient), reutilizamos su conexión
+    if client is not None:
+        r = await client.post(base_url + path, timeout=30, **kwargs)
+    else:
+        async with httpx.AsyncClient(base_url=base_url, timeout=30) as c:
+            r = await c.post(path, **kwargs)
+    r.raise_for_status()
+    j = r.json()
+    return j["access_token"], j["refresh_token"]
 
-async def login(base_url: str, username: str, password: str) -> tuple[str, str]:
-    async with httpx.AsyncClient(base_url=base_url, timeout=30) as c:
-        r = await c.post("token", data={"username": username, "password": password})
-        r.raise_for_status()
-        j = r.json()
-        return j["access_token"], j["refresh_token"]
+async def login(base_url: str, username: str, password: str,
+                client: Optional[httpx.AsyncClient] = None) -> tuple[str, str]:
+    return await _post_token(base_url, "token", client,
+                             data={"username": username, "password": password})
 
-async def refresh(base_url: str, refresh_token: str) -> tuple[str, str]:
-    async with httpx.AsyncClient(base_url=base_url, timeout=30) as c:
-        r = await c.post("token/refresh", json={"refresh_token": refresh_token})
-        r.raise_for_status()
-        j = r.json()
-        return j["access_token"], j["refresh_token"]
+async def refresh(base_url: str, refresh_token: str,
+                  client: Optional[httpx.AsyncClient] = None) -> tuple[str, str]:
+    return await _post_token(base_url, "token/refresh", client,
+                             json={"refresh_token": refresh_token})
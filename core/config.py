@@ -1,3 +1,4 @@
+import json
 from PySide6.QtCore import QSettings
 from datetime import datetime, timedelta, timezone
 
@@ -5,8 +6,12 @@ _CLOUD_URL     = "https://fadeapi-498d1e85e7e4.herokuapp.com/"
 _LOCALHOST_URL = "http://localhost:8000/"
 
 class Config:
+    # Ámbito de QSettings; el benchmark lo cambia para no tocar la configuración del usuario
+    organization = "FAdeA"
+    application = "FADEAPI-Client"
+
     def __init__(self):
-        self.q = QSettings("FAdeA", "FADEAPI-Client")
+        self.q = QSettings(self.organization, self.application)
 
     # === API base ===
     def base_url(self) -> str:
@@ -76,12 +81,180 @@ class Config:
     def set_default_limit(self, n: int):
         self.q.setValue("default_limit", int(n))
 
+    def get_page_size(self) -> int:
+        try:
+            return int(self.q.value("page_size", 10_000))
+        except Exception:
+            return 10_000
+
+    def set_page_size(self, n: int):
+        self.q.setValue("page_size", int(n))
+
+    # === Store acotado (sesiones largas) ===
+    def get_store_bounded(self) -> bool:
+        return bool(self.q.value("store_bounded", False, type=bool))
+
+    def set_store_bounded(self, v: bool):
+        self.q.setValue("store_bounded", bool(v))
+
+    def get_store_max_rows(self) -> int:
+        try:
+            return int(self.q.value("store_max_rows", 1_000_000))
+        except Exception:
+            return 1_000_000
+
+    def set_store_max_rows(self, n: int):
+        self.q.setValue("store_max_rows", int(n))
+
+    def get_store_retention_h(self) -> float:
+        # 0 = sin límite de tiempo (sólo por filas)
+        try:
+            return float(self.q.value("store_retention_h", 0.0))
+        except Exception:
+            return 0.0
+
+    def set_store_retention_h(self, h: float):
+        self.q.setValue("store_retention_h", float(h))
+
+    def get_store_max_sensors(self) -> int:
+        try:
+            return int(self.q.value("store_max_sensors", 64))
+        except Exception:
+            return 64
+
+    def set_store_max_sensors(self, n: int):
+        self.q.setValue("store_max_sensors", int(n))
+
+    def get_local_cache(self) -> bool:
+        # Copia en disco (SQLite) de los registros descargados
+        return bool(self.q.value("local_cache", True, type=bool))
+
+    def set_local_cache(self, v: bool):
+        self.q.setValue("local_cache", bool(v))
+
+    def get_csv_gzip(self) -> bool:
+        # Pedir el CSV comprimido (gzip) al descargarlo
+        return bool(self.q.value("csv_gzip", True, type=bool))
+
+    def set_csv_gzip(self, v: bool):
+        self.q.setValue("csv_gzip", bool(v))
+
+    def get_fetch_concurrency(self) -> int:
+        # Ventanas de tiempo descargadas en paralelo al cargar un rango
+        try:
+            return max(1, int(self.q.value("fetch_concurrency", 4)))
+        except Exception:
+            return 4
+
+    def set_fetch_concurrency(self, n: int):
+        self.q.setValue("fetch_concurrency", int(n))
+
+    # === Conexiones HTTP (pool persistente del ApiClient) ===
+    def get_http_max_connections(self) -> int:
+        try:
+            return int(self.q.value("http_max_connections", 10))
+        except Exception:
+            return 10
+
+    def set_http_max_connections(self, n: int):
+        self.q.setValue("http_max_connections", int(n))
+
+    def get_http_max_keepalive(self) -> int:
+        try:
+            return int(self.q.value("http_max_keepalive", 5))
+        except Exception:
+            return 5
+
+    def set_http_max_keepalive(self, n: int):
+        self.q.setValue("http_max_keepalive", int(n))
+
+    def get_http_keepalive_expiry(self) -> float:
+        try:
+            return float(self.q.value("http_keepalive_expiry", 30.0))
+        except Exception:
+            return 30.0
+
+    def get_http_connect_timeout(self) -> float:
+        # Corto: un servidor caído se detecta rápido (los reintentos cubren el arranque en frío)
+        try:
+            return float(self.q.value("http_connect_timeout", 10.0))
+        except Exception:
+            return 10.0
+
+    def set_http_connect_timeout(self, s: float):
+        self.q.setValue("http_connect_timeout", float(s))
+
+    def get_http_read_timeout(self) -> float:
+        try:
+            return float(self.q.value("http_read_timeout", 30.0))
+        except Exception:
+            return 30.0
+
+    def set_http_read_timeout(self, s: float):
+        self.q.setValue("http_read_timeout", float(s))
+
+    def get_http_retries(self) -> int:
+        # Intentos totales por solicitud (1 = sin reintentos)
+        try:
+            return max(1, int(self.q.value("http_retries", 4)))
+        except Exception:
+            return 4
+
+    def set_http_retries(self, n: int):
+        self.q.setValue("http_retries", int(n))
+
+    def get_http2(self) -> bool:
+        return bool(self.q.value("http2", False, type=bool))
+
+    def set_http2(self, v: bool):
+        self.q.setValue("http2", bool(v))
+
+    def get_http_compression(self) -> bool:
+        # Accept-Encoding con zstd/br/gzip (los que httpx pueda decodificar); False → identity
+        return bool(self.q.value("http_compression", True, type=bool))
+
+    def set_http_compression(self, v: bool):
+        self.q.setValue("http_compression", bool(v))
+
+    def get_http_cache(self) -> bool:
+        # Caché de respuestas GET con ETag/Last-Modified (If-None-Match / 304)
+        return bool(self.q.value("http_cache", True, type=bool))
+
+    def set_http_cache(self, v: bool):
+        self.q.setValue("http_cache", bool(v))
+
+    def get_http_cache_ttls(self) -> dict[str, float]:
+        # TTL (s) por sufijo de ruta: dentro de ese plazo se responde sin consultar al servidor
+        default = {"status": 10, "usuarios/me": 60}
+        try:
+            v = json.loads(self.q.value("http_cache_ttls", "") or "null")
+            return {str(k): float(t) for k, t in v.items()} if isinstance(v, dict) else default
+        except Exception:
+            return default
+
+    def set_http_cache_ttls(self, ttls: dict[str, float]):
+        self.q.setValue("http_cache_ttls", json.dumps(ttls))
+
     def get_auto_check_updates(self) -> bool:
         return bool(self.q.value("auto_check_updates", True, type=bool))
 
     def set_auto_check_updates(self, v: bool):
         self.q.setValue("auto_check_updates", bool(v))
 
+    # === Gráfico ===
+    def get_plot_opengl(self) -> bool:
+        return bool(self.q.value("plot_opengl", False, type=bool))
+
+    def set_plot_opengl(self, v: bool):
+        self.q.setValue("plot_opengl", bool(v))
+
+    def get_plot_lod(self) -> str:
+        # "minmax" (envolvente completa, default) | "lttb"
+        return self.q.value("plot_lod", "minmax")
+
+    def set_plot_lod(self, mode: str):
+        self.q.setValue("plot_lod", mode)
+
     # === Tema UI ===
     def get_theme(self) -> str:
         # "light" | "dark"
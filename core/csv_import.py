@@ -0,0 +1,64 @@
+# core/csv_import.py
+"""Importación de CSV de registros (id,ts,s1,s2,...) por bloques, sin un dict por fila."""
+import io
+import os
+from typing import Iterator
+import numpy as np
+from core.timeparse import parse_iso_array
+
+
+def _columns(header: str) -> tuple[int, list[int]]:
+    """Índices de la columna 'ts' y de las columnas de sensores (todas las demás salvo 'id')."""
+    names = [h.strip().strip('"').lower() for h in header.strip().split(",")]
+    if "ts" not in names:
+        raise RuntimeError("El CSV no tiene columna 'ts'")
+    ts_col = names.index("ts")
+    sens = [i for i, name in enumerate(names) if i != ts_col and name != "id"]
+    return ts_col, sens
+
+
+def _parse_block(text: str, ts_col: int, sens: list[int]) -> tuple[np.ndarray, np.ndarray]:
+    ts = parse_iso_array(np.loadtxt(io.StringIO(text), delimiter=",", usecols=ts_col,
+                                    dtype="S40", ndmin=1, quotechar='"'))
+    if not sens:
+        return ts, np.empty((len(ts), 0))
+    try:
+        vals = np.loadtxt(io.StringIO(text), delimiter=",", usecols=sens, dtype=np.float64,
+                          ndmin=2, quotechar='"')
+    except ValueError:
+        # Celdas vacías (canal ausente): genfromtxt es más lento pero las deja en NaN
+        vals = np.genfromtxt(io.StringIO(text), delimiter=",", usecols=sens, dtype=np.float64)
+        vals = vals.reshape(len(ts), len(sens))
+    return ts, vals
+
+
+def iter_csv_chunks(path: str, chunk_bytes: int = 8 << 20) -> Iterator[tuple[np.ndarray, np.ndarray, int, int]]:
+    """Lee el CSV en bloques de ~chunk_bytes y los parsea en forma vectorizada.
+
+    Cada bloque se corta en el último fin de línea y se parsea con
+    np.loadtxt (en C); los ts se convierten con parse_iso_array.
+
+    Yields:
+        tuple: (ts int64 epoch-ns, valores float64 (n, sensores), bytes leídos, bytes totales).
+    """
+    total = os.path.getsize(path)
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        header = f.readline()
+        ts_col, sens = _columns(header)
+        done = len(header.encode("utf-8"))
+        rest = ""
+        while True:
+            block = f.read(chunk_bytes)
+            if not block:
+                break
+            block = rest + block
+            cut = block.rfind("\n") + 1
+            if cut == 0:
+                rest = block
+                continue
+            text, rest = block[:cut], block[cut:]
+            done += len(text.encode("utf-8"))
+            if text.strip():
+                yield (*_parse_block(text, ts_col, sens), done, total)
+        if rest.strip():
+            yield (*_parse_block(rest, ts_col, sens), total, total)
@@ -0,0 +1,161 @@
+# core/export.py
+"""Exportación de los registros locales a formatos columnares (Parquet, Arrow IPC, NPZ).
+
+Se escribe por bloques, copiando cada bloque del rango del RegistrosStore al escribirlo,
+sin pasar por texto. Parquet y Arrow requieren pyarrow (opcional); NPZ sólo NumPy.
+"""
+import os
+import tempfile
+import zipfile
+from typing import Iterator
+import numpy as np
+from core.registros_store import RegistrosStore
+
+FORMATS = {".parquet": "parquet", ".arrow": "arrow", ".ipc": "arrow", ".feather": "arrow", ".npz": "npz"}
+
+
+def format_from_path(path: str) -> str:
+    fmt = FORMATS.get(os.path.splitext(path)[1].lower())
+    if fmt is None:
+        raise RuntimeError("Formato no soportado: use .parquet, .arrow o .npz")
+    return fmt
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError as e:
+        raise RuntimeError("Para exportar a Parquet/Arrow instale pyarrow (pip install pyarrow)") from e
+
+
+def row_range(store: RegistrosStore, desde_ns: int | None = None, hasta_ns: int | None = None) -> tuple[int, int]:
+    """Filas [i0, i1) del store con desde <= ts <= hasta (búsqueda binaria sobre ts ordenado)."""
+    ts = store.ts
+    i0 = 0 if desde_ns is None else int(np.searchsorted(ts, desde_ns, side="left"))
+    i1 = len(ts) if hasta_ns is None else int(np.searchsorted(ts, hasta_ns, side="right"))
+    return i0, max(i0, i1)
+
+
+class _Snapshot:
+    """Vistas (sin copia) del rango, tomadas en el hilo dueño del store.
+
+    Los appends sólo escriben después de la última fila (o en arrays nuevos al
+    crecer), así que las vistas siguen valiendo mientras no cambie
+    'generation'. Cada bloque se copia al leerlo y se valida después: si un
+    merge intercaló o descartó filas, la exportación se aborta.
+    """
+    def __init__(self, store: RegistrosStore, i0: int, i1: int):
+        self._store = store
+        self._generation = store.generation
+        self._ts = store.ts[i0:i1]
+        self._vals = store.values[i0:i1]
+        self.n = i1 - i0
+        self.n_cols = store.n_sensors
+
+    def _checked(self, view: np.ndarray) -> np.ndarray:
+        out = np.array(view)
+        if self._store.generation != self._generation:
+            raise RuntimeError("Los registros cambiaron durante la exportación (se intercalaron o "
+                               "descartaron filas); vuelva a exportar")
+        return out
+
+    def ts(self, a: int, b: int) -> np.ndarray:
+        return self._checked(self._ts[a:b])
+
+    def column(self, j: int, a: int, b: int) -> np.ndarray:
+        return self._checked(self._vals[a:b, j])
+
+
+def iter_export(store: RegistrosStore, path: str, desde_ns: int | None = None, hasta_ns: int | None = None,
+                chunk_rows: int = 1 << 20) -> Iterator[tuple[int, int]]:
+    """Exporta las filas del rango a 'path' (formato según extensión), por bloques de chunk_rows.
+
+    Se escribe en un temporal de la misma carpeta que se renombra al final;
+    si se interrumpe (cerrando el generador) el destino queda intacto.
+    Columnas: ts (epoch-ns UTC) y s1..sN (float64; NaN = canal ausente).
+
+    El rango se fija al llamar, en el hilo dueño del store, y cada bloque se
+    copia recién al escribirlo (ver _Snapshot): los appends que lleguen
+    mientras tanto quedan fuera; si un merge desplaza filas, RuntimeError.
+
+    Returns:
+        Iterator[tuple[int, int]]: (filas escritas, filas totales) tras cada bloque.
+    """
+    fmt = format_from_path(path)
+    if fmt != "npz":
+        _require_pyarrow()
+    snap = _Snapshot(store, *row_range(store, desde_ns, hasta_ns))
+    writer = {"npz": _write_npz, "parquet": _write_parquet, "arrow": _write_arrow}[fmt]
+    return _export(writer, path, snap, chunk_rows)
+
+
+def _export(writer, path: str, snap: _Snapshot, chunk_rows: int) -> Iterator[tuple[int, int]]:
+    fd, tmp = tempfile.mkstemp(prefix=".export-", suffix=".part", dir=os.path.dirname(os.path.abspath(path)))
+    os.close(fd)
+    try:
+        yield from writer(tmp, snap, chunk_rows)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def _write_npz(path: str, snap: _Snapshot, chunk_rows: int):
+    """Un .npy por columna dentro del zip (sin compresión, como np.savez), escrito por bloques."""
+    n = snap.n
+    total_cols = 1 + snap.n_cols
+    done = 0
+    readers = [("ts", np.int64, snap.ts)] + [
+        (f"s{j + 1}", np.float64, lambda a, b, j=j: snap.column(j, a, b)) for j in range(snap.n_cols)]
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_STORED, allowZip64=True) as zf:
+        for name, dtype, read in readers:
+            with zf.open(name + ".npy", "w", force_zip64=True) as f:
+                np.lib.format.write_array_header_1_0(
+                    f, {"descr": np.lib.format.dtype_to_descr(np.dtype(dtype)), "fortran_order": False, "shape": (n,)})
+                for a in range(0, n, chunk_rows):
+                    f.write(np.ascontiguousarray(read(a, min(n, a + chunk_rows)), dtype=dtype).data)
+                    done += min(chunk_rows, n - a)
+                    yield done // total_cols, n
+    if not n:
+        yield 0, 0
+
+
+def _arrow_schema(n_cols: int):
+    import pyarrow as pa
+    return pa.schema([pa.field("ts", pa.timestamp("ns", tz="UTC"))] +
+                     [pa.field(f"s{j + 1}", pa.float64()) for j in range(n_cols)])
+
+
+def _arrow_batch(schema, snap: _Snapshot, a: int, b: int):
+    import pyarrow as pa
+    arrays = [pa.array(snap.ts(a, b), type=schema.field(0).type)]
+    # from_pandas=True: NaN (canal ausente) → null
+    arrays += [pa.array(snap.column(j, a, b), type=pa.float64(), from_pandas=True) for j in range(snap.n_cols)]
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+def _write_parquet(path: str, snap: _Snapshot, chunk_rows: int):
+    import pyarrow.parquet as pq
+    schema = _arrow_schema(snap.n_cols)
+    n = snap.n
+    with pq.ParquetWriter(path, schema, compression="zstd") as w:
+        for a in range(0, n, chunk_rows):
+            w.write_batch(_arrow_batch(schema, snap, a, min(n, a + chunk_rows)))
+            yield min(n, a + chunk_rows), n
+    if not n:
+        yield 0, 0
+
+
+def _write_arrow(path: str, snap: _Snapshot, chunk_rows: int):
+    import pyarrow as pa
+    schema = _arrow_schema(snap.n_cols)
+    n = snap.n
+    with pa.OSFile(path, "wb") as sink, pa.ipc.new_file(sink, schema) as w:
+        for a in range(0, n, chunk_rows):
+            w.write_batch(_arrow_batch(schema, snap, a, min(n, a + chunk_rows)))
+            yield min(n, a + chunk_rows), n
+    if not n:
+        yield 0, 0
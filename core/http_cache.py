@@ -0,0 +1,280 @@
+# core/http_cache.py
+"""Caché HTTP de respuestas GET con validación condicional (ETag / Last-Modified).
+
+CachedTransport envuelve el transporte de httpx: guarda las respuestas
+chicas que traen validadores, Cache-Control max-age o un TTL configurado;
+mientras están frescas se sirven sin red, y después se revalidan con
+If-None-Match / If-Modified-Since (un 304 se responde desde la caché).
+Los métodos que modifican (POST/PUT/PATCH/DELETE) invalidan la colección
+afectada. Las respuestas en streaming grandes (registros, SSE, descargas)
+pasan sin tocarse.
+
+La clave incluye un hash del header Authorization (una sesión nunca recibe
+lo guardado para otra) y cada entrada recuerda los headers de la solicitud
+nombrados en Vary: si no coinciden, se trata como un miss. Una solicitud con
+'Cache-Control: no-cache' no se sirve de la caché sin antes revalidarla.
+"""
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+import httpx
+
+_UNSAFE = {"POST", "PUT", "PATCH", "DELETE"}
+_DROP_HEADERS = {"transfer-encoding", "connection", "keep-alive"}
+
+
+class CacheEntry:
+    def __init__(self, status: int, headers: list[tuple[bytes, bytes]], content: bytes, expires: float,
+                 vary: dict[str, str | None] | None = None):
+        self.status = status
+        self.headers = headers
+        self.content = content
+        self.expires = expires
+        self.vary = vary or {}
+        h = httpx.Headers(headers)
+        self.etag = h.get("etag")
+        self.last_modified = h.get("last-modified")
+
+    @property
+    def validators(self) -> bool:
+        return bool(self.etag or self.last_modified)
+
+    def matches(self, request: httpx.Request) -> bool:
+        """True si la solicitud trae los mismos valores en los headers listados en Vary."""
+        return all(request.headers.get(name) == value for name, value in self.vary.items())
+
+
+class ResponseCache:
+    """LRU acotado por cantidad de entradas y bytes totales."""
+    def __init__(self, max_entries: int = 256, max_bytes: int = 16 << 20):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._d: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._d)
+
+    def get(self, key: str) -> CacheEntry | None:
+        e = self._d.get(key)
+        if e is not None:
+            self._d.move_to_end(key)
+        return e
+
+    def put(self, key: str, entry: CacheEntry):
+        self.pop(key)
+        self._d[key] = entry
+        self._bytes += len(entry.content)
+        while self._d and (len(self._d) > self.max_entries or self._bytes > self.max_bytes):
+            _, old = self._d.popitem(last=False)
+            self._bytes -= len(old.content)
+
+    def pop(self, key: str):
+        old = self._d.pop(key, None)
+        if old is not None:
+            self._bytes -= len(old.content)
+
+    def invalidate_prefix(self, prefix: str):
+        """Descarta las entradas cuya URL empieza con 'prefix' (esquema y host incluidos)."""
+        for k in [k for k in self._d if k.startswith(prefix)]:
+            self.pop(k)
+
+    def clear(self):
+        self._d.clear()
+        self._bytes = 0
+
+
+def _max_age(headers: httpx.Headers) -> float | None:
+    """max-age de Cache-Control; 0 si es no-cache; None si no hay."""
+    cc = [d.strip().lower() for d in headers.get("cache-control", "").split(",") if d.strip()]
+    if "no-cache" in cc:
+        return 0.0
+    for d in cc:
+        if d.startswith("max-age="):
+            try:
+                return max(0.0, float(d.split("=", 1)[1]))
+            except ValueError:
+                return None
+    return None
+
+
+def _collection(path: str) -> str:
+    """Prefijo a invalidar tras una escritura: 'usuarios/5' → 'usuarios/'; 'registros/' → sí mismo."""
+    if path.endswith("/"):
+        return path
+    head, _, last = path.rpartition("/")
+    return head + "/" if last.isdigit() else path
+
+
+def _no_store(headers: httpx.Headers) -> bool:
+    return "no-store" in headers.get("cache-control", "").lower()
+
+
+def _no_cache(headers: httpx.Headers) -> bool:
+    return "no-cache" in headers.get("cache-control", "").lower()
+
+
+def _vary(response: httpx.Response, request: httpx.Request) -> dict[str, str | None] | None:
+    """Valores de la solicitud para los headers de Vary; None si es 'Vary: *' (no se guarda)."""
+    names = [n.strip().lower() for n in response.headers.get("vary", "").split(",") if n.strip()]
+    if "*" in names:
+        return None
+    return {n: request.headers.get(n) for n in names}
+
+
+class _ReplayStream(httpx.AsyncByteStream):
+    """Reentrega lo ya leído y sigue con el resto del stream original (cuerpos que no entraron en la caché)."""
+    def __init__(self, head: list[bytes], rest, original: httpx.AsyncByteStream):
+        self._head = head
+        self._rest = rest
+        self._original = original
+
+    async def __aiter__(self):
+        for chunk in self._head:
+            yield chunk
+        async for chunk in self._rest:
+            yield chunk
+
+    async def aclose(self):
+        await self._original.aclose()
+
+
+class CachedTransport(httpx.AsyncBaseTransport):
+    """Transporte con caché condicional sobre otro transporte de httpx.
+
+    Args:
+        inner (httpx.AsyncBaseTransport): Transporte real (p. ej. AsyncHTTPTransport).
+        cache (ResponseCache | None): Caché compartida (sobrevive a recrear el cliente).
+        ttl_overrides (dict[str, float] | None): TTL en segundos por sufijo de ruta
+            (p. ej. {"status": 10, "usuarios/me": 60}); manda sobre Cache-Control.
+        max_body (int): Cuerpos más grandes no se guardan.
+    """
+    def __init__(self, inner: httpx.AsyncBaseTransport, cache: ResponseCache | None = None,
+                 ttl_overrides: dict[str, float] | None = None, max_body: int = 1 << 20):
+        self.inner = inner
+        self.cache = cache if cache is not None else ResponseCache()
+        self.ttl_overrides = {k.strip("/"): float(v) for k, v in (ttl_overrides or {}).items()}
+        self.max_body = max_body
+
+    def _ttl_override(self, url: httpx.URL) -> float | None:
+        path = url.path.rstrip("/")
+        for suffix, ttl in self.ttl_overrides.items():
+            if path.endswith("/" + suffix) or path == suffix:
+                return ttl
+        return None
+
+    @staticmethod
+    def _key(request: httpx.Request) -> str:
+        """URL (al principio, para invalidate_prefix) más un hash de Authorization si lo hay."""
+        auth = request.headers.get("authorization")
+        if not auth:
+            return str(request.url)
+        return f"{request.url} {hashlib.sha256(auth.encode()).hexdigest()[:16]}"
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        method = request.method.upper()
+        if method in _UNSAFE:
+            prefix = request.url.copy_with(path=_collection(request.url.path), query=None, fragment=None)
+            self.cache.invalidate_prefix(str(prefix))
+            return await self.inner.handle_async_request(request)
+        if method != "GET" or "range" in request.headers or \
+                "text/event-stream" in request.headers.get("accept", ""):
+            return await self.inner.handle_async_request(request)
+
+        key = self._key(request)
+        entry = self.cache.get(key)
+        if entry is not None and not entry.matches(request):
+            entry = None
+        now = time.monotonic()
+        if entry is not None and now < entry.expires and not _no_cache(request.headers):
+            self.cache.hits += 1
+            return self._from_cache(entry, request)
+        if entry is not None and entry.validators:
+            if entry.etag:
+                request.headers["If-None-Match"] = entry.etag
+            if entry.last_modified:
+                request.headers["If-Modified-Since"] = entry.last_modified
+
+        response = await self.inner.handle_async_request(request)
+
+        if response.status_code == 304 and entry is not None:
+            await response.aclose()
+            self.cache.revalidated += 1
+            ttl = self._ttl_override(request.url)
+            age = ttl if ttl is not None else _max_age(response.headers)
+            entry.expires = now + (age or 0.0)
+            self.cache.put(key, entry)
+            return self._from_cache(entry, request)
+
+        self.cache.misses += 1
+        if response.status_code != 200 or _no_store(response.headers):
+            self.cache.pop(key)
+            return response
+        ttl = self._ttl_override(request.url)
+        age = ttl if ttl is not None else _max_age(response.headers)
+        has_validators = "etag" in response.headers or "last-modified" in response.headers
+        vary = _vary(response, request)
+        if (not age and not has_validators) or vary is None:
+            self.cache.pop(key)
+            return response
+        length = response.headers.get("content-length")
+        if length is not None and (not length.isdigit() or int(length) > self.max_body):
+            return response
+
+        # Leer el cuerpo crudo (sin decodificar) hasta max_body; si se pasa, se reentrega tal cual
+        head, size = [], 0
+        raw = response.stream.__aiter__()
+        async for chunk in raw:
+            head.append(chunk)
+            size += len(chunk)
+            if size > self.max_body:
+                return httpx.Response(response.status_code, headers=response.headers,
+                                      stream=_ReplayStream(head, raw, response.stream),
+                                      extensions=response.extensions)
+        await response.aclose()
+        headers = [(k, v) for k, v in response.headers.raw if k.decode("latin-1").lower() not in _DROP_HEADERS]
+        entry = CacheEntry(response.status_code, headers, b"".join(head), now + (age or 0.0), vary)
+        self.cache.put(key, entry)
+        return self._from_cache(entry, request, hit=False)
+
+    @staticmethod
+    def _from_cache(entry: CacheEntry, request: httpx.Request, hit: bool = True) -> httpx.Response:
+        headers = [(k, v) for k, v in entry.headers if k.lower() != b"content-length"]
+        headers.append((b"Content-Length", str(len(entry.content)).encode()))
+        return httpx.Response(entry.status, headers=headers, content=entry.content, request=request,
+                              extensions={"from_cache": hit})
+
+    async def aclose(self):
+        await self.inner.aclose()
+
+
+# ---------- cliente compartido para URLs fuera de la API (updater, /status) ----------
+_shared_cache = ResponseCache(max_entries=64)
+_shared: dict = {}
+
+SHARED_TTLS = {"status": 10, "releases/latest": 600, "releases": 600}
+
+
+def shared_client() -> httpx.AsyncClient:
+    """AsyncClient con caché condicional, uno por event loop (las conexiones quedan ligadas al loop).
+
+    Lo usan las consultas sin autenticación: releases de GitHub y el probe de /status.
+    """
+    loop = asyncio.get_running_loop()
+    c = _shared.get("client")
+    if c is None or c.is_closed or _shared.get("loop") is not loop:
+        transport = CachedTransport(httpx.AsyncHTTPTransport(), _shared_cache, SHARED_TTLS)
+        c = httpx.AsyncClient(transport=transport, timeout=30, follow_redirects=True)
+        _shared["client"], _shared["loop"] = c, loop
+    return c
+
+
+async def close_shared_client():
+    """Cierra el cliente compartido (al salir de la app; llamar en el loop que lo creó)."""
+    c, loop = _shared.pop("client", None), _shared.pop("loop", None)
+    if c is not None and not c.is_closed and loop is asyncio.get_running_loop():
+        await c.aclose()
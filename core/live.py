@@ -0,0 +1,61 @@
+# core/live.py
+"""Ritmo del modo "en vivo": intervalo adaptativo y backoff ante errores."""
+import random
+import httpx
+from core.resilience import CircuitOpenError, parse_retry_after
+
+
+def retry_after_s(exc: BaseException) -> float | None:
+    """Segundos indicados por Retry-After (429/503) o por el circuit breaker abierto, si los hay."""
+    if isinstance(exc, CircuitOpenError):
+        return exc.retry_in
+    if not isinstance(exc, httpx.HTTPStatusError):
+        return None
+    return parse_retry_after(exc.response.headers.get("Retry-After"))
+
+
+def is_transient(exc: BaseException) -> bool:
+    """True si conviene reintentar más tarde: red caída, timeout, 429, 5xx o circuito abierto."""
+    if isinstance(exc, CircuitOpenError):
+        return True
+    if isinstance(exc, httpx.HTTPStatusError):
+        code = exc.response.status_code
+        return code == 429 or code >= 500
+    return isinstance(exc, httpx.TransportError)
+
+
+class LivePacer:
+    """Decide cuánto esperar hasta el próximo poll.
+
+    - Si llegaron filas, el intervalo se acorta (hasta min_s).
+    - Si no llegó nada, se alarga de a poco (hasta max_s).
+    - Ante errores, backoff exponencial con jitter (hasta backoff_max_s),
+      o lo que pida el servidor con Retry-After.
+    """
+    def __init__(self, min_s: float = 1.0, max_s: float = 30.0, start_s: float = 2.0,
+                 backoff_max_s: float = 120.0):
+        self.min_s = min_s
+        self.max_s = max_s
+        self.start_s = start_s
+        self.backoff_max_s = backoff_max_s
+        self.interval = start_s
+        self.failures = 0
+
+    def reset(self):
+        self.interval = self.start_s
+        self.failures = 0
+
+    def on_success(self, rows: int) -> float:
+        self.failures = 0
+        if rows > 0:
+            self.interval = max(self.min_s, self.interval * 0.5)
+        else:
+            self.interval = min(self.max_s, self.interval * 1.5)
+        return self.interval
+
+    def on_error(self, retry_after: float | None = None) -> float:
+        self.failures += 1
+        if retry_after is not None:
+            return min(self.backoff_max_s, max(self.min_s, retry_after))
+        delay = min(self.backoff_max_s, self.interval * 2 ** self.failures)
+        return random.uniform(delay / 2, delay)
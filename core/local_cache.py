@@ -0,0 +1,96 @@
+# core/local_cache.py
+"""Caché persistente de registros en SQLite, una base por URL de API.
+
+Cada fila guarda el ts (epoch-ns, PRIMARY KEY → índice implícito) y los
+valores de los sensores como blob float64. Al abrir la app se carga entera
+en el RegistrosStore y después sólo se piden al servidor las filas
+posteriores a su watermark.
+"""
+import hashlib
+import os
+import sqlite3
+import threading
+import numpy as np
+
+
+def cache_dir() -> str:
+    base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~")
+    return os.path.join(base, "FADEAPI-Client", "cache")
+
+
+class LocalCache:
+    """Registros de una API en un archivo SQLite (modo WAL); seguro entre hilos."""
+    def __init__(self, base_url: str, folder: str | None = None):
+        self.base_url = base_url
+        folder = folder or cache_dir()
+        os.makedirs(folder, exist_ok=True)
+        key = hashlib.sha1(base_url.encode()).hexdigest()[:16]
+        self.path = os.path.join(folder, f"registros-{key}.sqlite")
+        self._lock = threading.Lock()
+        self.closed = False
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        with self._lock:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute("CREATE TABLE IF NOT EXISTS registros (ts INTEGER PRIMARY KEY, vals BLOB NOT NULL)")
+            self._db.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+            self._db.execute("INSERT OR REPLACE INTO meta VALUES ('base_url', ?)", (base_url,))
+            self._db.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM registros").fetchone()[0]
+
+    def watermark(self) -> int | None:
+        with self._lock:
+            return self._db.execute("SELECT MAX(ts) FROM registros").fetchone()[0]
+
+    def load(self) -> tuple[np.ndarray, np.ndarray]:
+        """Todas las filas, ordenadas por ts: (ts int64, valores (n, n_sensores) con NaN de relleno)."""
+        with self._lock:
+            rows = [] if self.closed else self._db.execute("SELECT ts, vals FROM registros ORDER BY ts").fetchall()
+        n = len(rows)
+        if n == 0:
+            return np.empty(0, dtype=np.int64), np.empty((0, 0))
+        ts = np.fromiter((r[0] for r in rows), dtype=np.int64, count=n)
+        widths = np.fromiter((len(r[1]) for r in rows), dtype=np.int64, count=n) // 8
+        n_s = int(widths.max())
+        if (widths == n_s).all():
+            # Camino rápido: todas las filas con la misma cantidad de sensores
+            vals = np.frombuffer(b"".join(r[1] for r in rows), dtype=np.float64).reshape(n, n_s)
+        else:
+            vals = np.full((n, n_s), np.nan)
+            for i, (_, blob) in enumerate(rows):
+                vals[i, :len(blob) // 8] = np.frombuffer(blob, dtype=np.float64)
+        return ts, vals
+
+    def append(self, ts: np.ndarray, vals: np.ndarray):
+        """Guarda filas (reemplaza las de igual ts). Los NaN finales no se almacenan."""
+        if len(ts) == 0:
+            return
+        vals = np.ascontiguousarray(vals, dtype=np.float64)
+        if vals.shape[1] and np.isnan(vals[:, -1]).any():
+            present = ~np.isnan(vals)
+            width = np.where(present.any(axis=1), vals.shape[1] - present[:, ::-1].argmax(axis=1), 0)
+            data = [(int(t), v[:w].tobytes()) for t, v, w in zip(ts, vals, width)]
+        else:
+            data = [(int(t), v.tobytes()) for t, v in zip(ts, vals)]
+        with self._lock:
+            if self.closed:
+                return
+            self._db.executemany("INSERT OR REPLACE INTO registros VALUES (?, ?)", data)
+            self._db.commit()
+
+    def clear(self):
+        with self._lock:
+            if self.closed:
+                return
+            self._db.execute("DELETE FROM registros")
+            self._db.commit()
+
+    def close(self):
+        """Cierra la base (idempotente); las escrituras posteriores se ignoran."""
+        with self._lock:
+            if not self.closed:
+                self.closed = True
+                self._db.close()
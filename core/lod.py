@@ -0,0 +1,161 @@
+# core/lod.py
+"""Reducción de series para graficar (level of detail).
+
+- Min/max por bucket: conserva la envolvente completa (ningún pico se pierde).
+- LTTB (Largest-Triangle-Three-Buckets): menos puntos, forma visual fiel,
+  pero puede omitir picos aislados; es opcional.
+
+MinMaxPyramid precalcula min/max por bloques de tamaño creciente para que
+reducir un rango grande no recorra los datos crudos.
+"""
+import numpy as np
+
+
+def _block_reduce(y: np.ndarray, size: int) -> tuple[np.ndarray, np.ndarray]:
+    """Min/max (ignorando NaN) de bloques consecutivos de 'size' elementos; el último puede ser parcial."""
+    n = len(y)
+    nb = -(-n // size)
+    if nb == 0:
+        return np.empty(0), np.empty(0)
+    pad = nb * size - n
+    if pad:
+        y = np.concatenate([y, np.full(pad, np.nan)])
+    blocks = y.reshape(nb, size)
+    return np.fmin.reduce(blocks, axis=1), np.fmax.reduce(blocks, axis=1)
+
+
+def _pairwise_reduce(mins: np.ndarray, maxs: np.ndarray, size: int) -> tuple[np.ndarray, np.ndarray]:
+    n = len(mins)
+    nb = -(-n // size)
+    pad = nb * size - n
+    if pad:
+        mins = np.concatenate([mins, np.full(pad, np.nan)])
+        maxs = np.concatenate([maxs, np.full(pad, np.nan)])
+    return (np.fmin.reduce(mins.reshape(nb, size), axis=1),
+            np.fmax.reduce(maxs.reshape(nb, size), axis=1))
+
+
+def _interleave(x: np.ndarray, mins: np.ndarray, maxs: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Dos puntos por bucket (min y max) en la misma x: dibuja la envolvente vertical."""
+    xo = np.repeat(x, 2)
+    yo = np.empty(2 * len(mins))
+    yo[0::2] = mins
+    yo[1::2] = maxs
+    return xo, yo
+
+
+def minmax_decimate(x: np.ndarray, y: np.ndarray, n_buckets: int) -> tuple[np.ndarray, np.ndarray]:
+    """Reduce (x, y) crudos a 2*n_buckets puntos min/max. Si ya son pocos, devuelve vistas sin copia."""
+    n = len(y)
+    if n <= 2 * n_buckets:
+        return x, y
+    size = -(-n // n_buckets)
+    mins, maxs = _block_reduce(y, size)
+    return _interleave(x[::size], mins, maxs)
+
+
+def lttb(x: np.ndarray, y: np.ndarray, n_out: int) -> tuple[np.ndarray, np.ndarray]:
+    """Largest-Triangle-Three-Buckets. Los NaN se descartan antes de reducir."""
+    ok = ~np.isnan(y)
+    if not ok.all():
+        x, y = x[ok], y[ok]
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return x, y
+    xf = np.asarray(x, dtype=np.float64)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    out = np.empty(n_out, dtype=np.int64)
+    out[0], out[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        nlo, nhi = hi, edges[i + 2] if i + 2 < len(edges) else n
+        cx, cy = xf[nlo:nhi].mean(), y[nlo:nhi].mean()
+        ax, ay = xf[a], y[a]
+        area = np.abs((ax - cx) * (y[lo:hi] - ay) - (ax - xf[lo:hi]) * (cy - ay))
+        a = lo + int(area.argmax())
+        out[i + 1] = a
+    return x[out], y[out]
+
+
+class MinMaxPyramid:
+    """Pirámide de min/max de un canal, actualizable de forma incremental.
+
+    El nivel j agrupa bloques de base*factor**j filas crudas. Sólo se
+    recalculan los bloques a partir de la primera fila modificada.
+    """
+    def __init__(self, base: int = 16, factor: int = 4, max_levels: int = 12):
+        self.base = base
+        self.factor = factor
+        self.max_levels = max_levels
+        self.mins: list[np.ndarray] = []
+        self.maxs: list[np.ndarray] = []
+        self._n = 0
+
+    def block_size(self, level: int) -> int:
+        return self.base * self.factor ** level
+
+    def clear(self):
+        self.mins, self.maxs, self._n = [], [], 0
+
+    def update(self, y: np.ndarray, first_changed: int | None = None):
+        """Sincroniza con la columna 'y' (completa). first_changed=None → desde el último bloque conocido."""
+        n = len(y)
+        start = self._n if first_changed is None else min(first_changed, self._n)
+        if start == n and n == self._n:
+            return
+        level, size = 0, self.base
+        src_mins = src_maxs = None
+        while level < self.max_levels:
+            b0 = start // size
+            if level == 0:
+                mins, maxs = _block_reduce(y[b0 * size:n], size)
+            else:
+                lo = b0 * self.factor
+                mins, maxs = _pairwise_reduce(src_mins[lo:], src_maxs[lo:], self.factor)
+            if level < len(self.mins):
+                self.mins[level] = np.concatenate([self.mins[level][:b0], mins])
+                self.maxs[level] = np.concatenate([self.maxs[level][:b0], maxs])
+            else:
+                self.mins.append(mins)
+                self.maxs.append(maxs)
+            src_mins, src_maxs = self.mins[level], self.maxs[level]
+            if len(src_mins) <= 1:
+                break
+            level += 1
+            size *= self.factor
+        del self.mins[level + 1:], self.maxs[level + 1:]
+        self._n = n
+
+    def query(self, x: np.ndarray, y: np.ndarray, i0: int, i1: int, n_buckets: int) -> tuple[np.ndarray, np.ndarray]:
+        """Envolvente min/max de y[i0:i1] en ~n_buckets buckets, usando el nivel más grueso que alcance."""
+        span = i1 - i0
+        if span <= 2 * n_buckets or not self.mins:
+            return x[i0:i1], y[i0:i1]
+        rows_per_bucket = span / n_buckets
+        level = -1
+        while level + 1 < len(self.mins) and self.block_size(level + 1) <= rows_per_bucket:
+            level += 1
+        if level < 0:
+            return minmax_decimate(x[i0:i1], y[i0:i1], n_buckets)
+
+        size = self.block_size(level)
+        j0, j1 = -(-i0 // size), i1 // size
+        if j1 <= j0:
+            return minmax_decimate(x[i0:i1], y[i0:i1], n_buckets)
+        group = max(1, -(-(j1 - j0) // n_buckets))
+        mins, maxs = _pairwise_reduce(self.mins[level][j0:j1], self.maxs[level][j0:j1], group)
+        xb = x[j0 * size:j1 * size:size * group]
+
+        parts_x, parts_y = [], []
+        if i0 < j0 * size:   # bloque parcial al inicio: se reduce desde los crudos
+            h = y[i0:j0 * size]
+            parts_x.append(np.array([x[i0], x[i0]]))
+            parts_y.append(np.array([np.fmin.reduce(h), np.fmax.reduce(h)]))
+        bx, by = _interleave(xb, mins, maxs)
+        parts_x.append(bx); parts_y.append(by)
+        if j1 * size < i1:   # bloque parcial al final
+            t = y[j1 * size:i1]
+            parts_x.append(np.array([x[j1 * size], x[i1 - 1]]))
+            parts_y.append(np.array([np.fmin.reduce(t), np.fmax.reduce(t)]))
+        return np.concatenate(parts_x), np.concatenate(parts_y)
@@ -0,0 +1,273 @@
+# core/registros_store.py
+import tempfile
+import numpy as np
+from core.timeparse import iso_from_ns, parse_iso_array, parse_iso_ns  # noqa: F401  (re-export)
+
+
+def records_to_arrays(records: list[dict]) -> tuple[np.ndarray, np.ndarray]:
+    """Convierte registros de la API [{ts, sensores}, ...] a arrays columnares.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: (ts int64 epoch-ns, valores float64 (n, n_sensores)).
+        Los canales faltantes quedan en NaN. Se descartan registros sin 'ts'.
+    """
+    recs = [r for r in records if r.get("ts")]
+    ts = parse_iso_array([r["ts"] for r in recs])
+    sens = [r.get("sensores") or [] for r in recs]
+    n_s = max((len(s) for s in sens), default=0)
+    vals = np.full((len(recs), n_s), np.nan)
+    if n_s and all(len(s) == n_s for s in sens):
+        vals[:] = np.array(sens, dtype=np.float64)
+    else:
+        for i, s in enumerate(sens):
+            if s:
+                vals[i, :len(s)] = np.array(s, dtype=np.float64)
+    return ts, vals
+
+
+class RegistrosStore:
+    """Cache local de registros en formato columnar, ordenado asc por ts.
+
+    - ts: int64 epoch-ns, contiguo.
+    - valores: float64 (filas, sensores) en orden Fortran, de modo que cada
+      sensor es un bloque contiguo (vistas sin copia para tabla y gráfico).
+      Los canales ausentes en un registro valen NaN.
+
+    El almacenamiento crece por duplicación (appends amortizados O(1)).
+    'generation' se incrementa cuando cambian filas ya existentes (clear o
+    inserción intermedia); si no cambió, los consumidores pueden procesar
+    sólo las filas nuevas al final. Se incrementa antes de mover filas, así
+    quien copia desde otro hilo puede validar la copia comparándolo después.
+    """
+    def __init__(self, capacity: int = 1024):
+        self._ts = np.empty(capacity, dtype=np.int64)
+        self._vals = np.full((capacity, 0), np.nan, order="F")
+        self._n = 0
+        self.generation = 0
+
+    # ----------------- vistas -----------------
+    def __len__(self) -> int:
+        return self._n
+
+    @property
+    def n_sensors(self) -> int:
+        return self._vals.shape[1]
+
+    @property
+    def ts(self) -> np.ndarray:
+        """Vista (sin copia) de los timestamps epoch-ns."""
+        return self._ts[:self._n]
+
+    @property
+    def values(self) -> np.ndarray:
+        """Vista (sin copia) de los valores, forma (filas, sensores)."""
+        return self._vals[:self._n]
+
+    def column(self, i: int) -> np.ndarray:
+        """Vista contigua del sensor i (0-based)."""
+        return self._vals[:self._n, i]
+
+    def ts_iso(self, row: int) -> str:
+        return iso_from_ns(self._ts[row])
+
+    # ----------------- mutación -----------------
+    def clear(self):
+        self.generation += 1
+        self._n = 0
+
+    def _reserve(self, rows: int, cols: int):
+        cap, cur_cols = self._ts.shape[0], self._vals.shape[1]
+        if rows <= cap and cols <= cur_cols:
+            return
+        new_cap = cap
+        while new_cap < rows:
+            new_cap = max(2 * new_cap, 1024)
+        new_cols = max(cols, cur_cols)
+        ts = np.empty(new_cap, dtype=np.int64)
+        ts[:self._n] = self._ts[:self._n]
+        vals = np.full((new_cap, new_cols), np.nan, order="F")
+        vals[:self._n, :cur_cols] = self._vals[:self._n]
+        self._ts, self._vals = ts, vals
+
+    def append_arrays(self, ts: np.ndarray, vals: np.ndarray):
+        """Agrega filas al final tal cual (el llamador garantiza orden y unicidad)."""
+        k = len(ts)
+        if k == 0:
+            return
+        n = self._n
+        self._reserve(n + k, vals.shape[1])
+        self._ts[n:n + k] = ts
+        self._vals[n:n + k, :vals.shape[1]] = vals
+        self._vals[n:n + k, vals.shape[1]:] = np.nan
+        self._n = n + k
+
+    @property
+    def watermark(self) -> int | None:
+        """ts máximo en caché (epoch-ns), O(1) porque el store se mantiene ordenado."""
+        return int(self._ts[self._n - 1]) if self._n else None
+
+    def merge_arrays(self, ts: np.ndarray, vals: np.ndarray) -> tuple[int, int]:
+        """Incorpora filas nuevas descartando ts repetidos y manteniendo el orden.
+
+        El caso común (todo lo nuevo es posterior al watermark) es un append
+        O(k). Las filas fuera de orden se deduplican por búsqueda binaria sobre
+        el array de ts ya ordenado (que hace de índice) y se intercalan en una
+        sola pasada vectorizada.
+
+        Returns:
+            tuple[int, int]: (primera fila modificada, cantidad de filas agregadas).
+            Si la primera fila modificada es la cantidad previa de filas, fue un append puro.
+        """
+        n0 = self._n
+        if len(ts) == 0:
+            return n0, 0
+        ts = np.asarray(ts, dtype=np.int64)
+        if len(ts) > 1 and not (np.diff(ts) > 0).all():
+            # Lote desordenado o con repetidos: ordenar y quedarse con la primera aparición
+            ts, idx = np.unique(ts, return_index=True)
+            vals = vals[idx]
+
+        wm = self.watermark
+        if wm is None or ts[0] > wm:
+            self.append_arrays(ts, vals)
+            return n0, len(ts)
+
+        cut = int(np.searchsorted(ts, wm, side="right"))
+        old_ts, old_vals = ts[:cut], vals[:cut]
+        pos = np.searchsorted(self.ts, old_ts)
+        dup = self._ts[np.minimum(pos, n0 - 1)] == old_ts
+        old_ts, old_vals, pos = old_ts[~dup], old_vals[~dup], pos[~dup]
+
+        first = int(pos[0]) if len(pos) else n0
+        if len(old_ts):
+            self._insert_sorted(pos, old_ts, old_vals)
+        self.append_arrays(ts[cut:], vals[cut:])
+        return first, self._n - n0
+
+    def _insert_sorted(self, pos: np.ndarray, ts: np.ndarray, vals: np.ndarray):
+        """Intercala filas en las posiciones 'pos' (calculadas sobre el store actual)."""
+        n, k = self._n, len(ts)
+        self._reserve(n + k, vals.shape[1])
+        first = int(pos[0])
+        self.generation += 1
+        # Destino final de cada fila nueva y de cada fila existente desde 'first'
+        new_dst = pos + np.arange(k)
+        tail = np.arange(first, n)
+        old_dst = tail + np.searchsorted(pos, tail, side="right")
+        tail_ts = self._ts[first:n].copy()
+        tail_vals = self._vals[first:n].copy()
+        self._ts[old_dst] = tail_ts
+        self._vals[old_dst] = tail_vals
+        self._ts[new_dst] = ts
+        self._vals[new_dst, :vals.shape[1]] = vals
+        self._vals[new_dst, vals.shape[1]:] = np.nan
+        self._n = n + k
+
+    def merge_records(self, records: list[dict]) -> tuple[int, int]:
+        """Incorpora registros de la API [{ts, sensores}, ...]. Ver merge_arrays."""
+        return self.merge_arrays(*records_to_arrays(records))
+
+
+class BoundedRegistrosStore(RegistrosStore):
+    """RegistrosStore de capacidad fija respaldado por archivos mapeados en memoria.
+
+    Pensado para sesiones largas: ts y valores viven en np.memmap (archivos
+    temporales que se borran al cerrar), así el SO puede paginar los datos
+    fríos y la memoria residente queda acotada. Se retienen las últimas
+    max_rows filas y, si retention_s > 0, sólo las de los últimos
+    retention_s segundos respecto del watermark.
+
+    Los datos se mantienen contiguos desde la fila 0 (las vistas ts, values y
+    column siguen siendo sin copia). Para no desplazar en cada append se deja
+    una holgura de max_rows // 4 filas: se compacta de una vez cuando las
+    filas vencidas llegan a esa holgura (o a un cuarto de lo retenido), y se
+    incrementa 'generation'.
+    La cantidad de sensores es fija (max_sensors); los canales extra se descartan.
+    """
+    def __init__(self, max_rows: int = 1_000_000, max_sensors: int = 64,
+                 retention_s: float = 0.0, folder: str | None = None):
+        self.max_rows = max(1, int(max_rows))
+        self.max_sensors = max(1, int(max_sensors))
+        self.retention_ns = int(retention_s * 1e9)
+        self._slack = max(1, self.max_rows // 4)
+        cap = self.max_rows + self._slack
+        self._files = [tempfile.TemporaryFile(prefix="fadeapi-ts-", dir=folder),
+                       tempfile.TemporaryFile(prefix="fadeapi-vals-", dir=folder)]
+        self._ts = np.memmap(self._files[0], dtype=np.int64, mode="w+", shape=(cap,))
+        self._vals = np.memmap(self._files[1], dtype=np.float64, mode="w+",
+                               shape=(cap, self.max_sensors), order="F")
+        self._cols = 0
+        self._n = 0
+        self.generation = 0
+
+    # ----------------- vistas (sólo los sensores vistos) -----------------
+    @property
+    def n_sensors(self) -> int:
+        return self._cols
+
+    @property
+    def values(self) -> np.ndarray:
+        return self._vals[:self._n, :self._cols]
+
+    # ----------------- mutación -----------------
+    def _reserve(self, rows: int, cols: int):
+        if rows > self._ts.shape[0]:
+            raise RuntimeError("Capacidad del buffer excedida")
+        self._cols = max(self._cols, min(cols, self.max_sensors))
+
+    def _drop_head(self, k: int) -> int:
+        """Descarta las k filas más viejas desplazando el resto al inicio (en tramos, sin copia completa)."""
+        n = self._n
+        k = min(k, n)
+        if k <= 0:
+            return 0
+        self.generation += 1
+        step = max(1, min(k, 1 << 16))  # tramos que no se solapan con su origen
+        for s in range(0, n - k, step):
+            e = min(n - k, s + step)
+            self._ts[s:e] = self._ts[s + k:e + k]
+            self._vals[s:e] = self._vals[s + k:e + k]
+        self._n = n - k
+        return k
+
+    def _expired(self, incoming: int = 0) -> int:
+        """Filas del inicio que quedan fuera de la retención (contando 'incoming' filas por llegar)."""
+        drop = self._n + incoming - self.max_rows
+        if self.retention_ns and self._n:
+            drop = max(drop, int(np.searchsorted(self.ts, self.watermark - self.retention_ns)))
+        return max(0, drop)
+
+    def _fit(self, ts: np.ndarray, vals: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        ts = np.asarray(ts, dtype=np.int64)
+        vals = np.asarray(vals)
+        if vals.shape[1] > self.max_sensors:
+            vals = vals[:, :self.max_sensors]
+        if len(ts) > self.max_rows:
+            keep = np.argsort(ts, kind="stable")[-self.max_rows:]
+            ts, vals = ts[keep], vals[keep]
+        return ts, vals
+
+    def append_arrays(self, ts: np.ndarray, vals: np.ndarray):
+        ts, vals = self._fit(ts, vals)
+        if self._n + len(ts) > self._ts.shape[0]:
+            self._drop_head(self._expired(len(ts)))
+        super().append_arrays(ts, vals)
+
+    def merge_arrays(self, ts: np.ndarray, vals: np.ndarray) -> tuple[int, int]:
+        """Como RegistrosStore.merge_arrays; si se compactó devuelve primera fila 0 (la vista debe rehacerse)."""
+        ts, vals = self._fit(ts, vals)
+        dropped = 0
+        if self._n + len(ts) > self._ts.shape[0]:
+            dropped += self._drop_head(self._expired(len(ts)))
+        n0 = self._n
+        first, added = super().merge_arrays(ts, vals)
+        expired = self._expired()
+        if expired and expired >= min(self._slack, max(1, self._n // 4)):
+            dropped += self._drop_head(expired)
+        if dropped:
+            return 0, max(0, self._n - n0)
+        return first, added
+
+    def close(self):
+        for f in self._files:
+            f.close()
@@ -0,0 +1,136 @@
+# core/resilience.py
+"""Política de reintentos y circuit breaker para las solicitudes a la API.
+
+- Reintentos con backoff exponencial y jitter sólo para métodos idempotentes,
+  ante errores de red, 5xx y 429 (respetando Retry-After).
+- Circuit breaker: tras varias fallas seguidas se deja de consultar al
+  servidor por un tiempo (CircuitOpenError inmediato) y después se deja
+  pasar una sola solicitud de prueba.
+"""
+import random
+import time
+from email.utils import parsedate_to_datetime
+import httpx
+
+IDEMPOTENT = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+# 501/505 no son transitorios (y 501 indica endpoint no soportado)
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Segundos de un header Retry-After (número o fecha HTTP); None si no hay o no se entiende."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class CircuitOpenError(RuntimeError):
+    """El servidor falló repetidamente; no se lo consulta hasta que pase retry_in segundos."""
+    def __init__(self, retry_in: float):
+        self.retry_in = max(0.0, retry_in)
+        super().__init__(f"Servidor no disponible; se reintentará en {max(1, round(self.retry_in))} s")
+
+
+class CircuitBreaker:
+    """Estados: cerrado (normal), abierto (falla rápido) y semiabierto (una solicitud de prueba).
+
+    Cada reapertura seguida duplica el tiempo abierto, hasta max_open_s.
+    """
+    def __init__(self, failure_threshold: int = 3, open_s: float = 15.0, max_open_s: float = 300.0):
+        self.failure_threshold = failure_threshold
+        self.base_open_s = open_s
+        self.max_open_s = max_open_s
+        self.open_s = open_s
+        self.state = "closed"
+        self.failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+
+    def before(self) -> bool:
+        """Autoriza una solicitud. Devuelve True si es la solicitud de prueba (semiabierto).
+
+        Raises:
+            CircuitOpenError: Si el circuito está abierto o ya hay una prueba en curso.
+        """
+        if self.state == "closed":
+            return False
+        if self.state == "open":
+            remaining = self._opened_at + self.open_s - time.monotonic()
+            if remaining > 0:
+                raise CircuitOpenError(remaining)
+            self.state = "half_open"
+        if self._probing:
+            raise CircuitOpenError(1.0)
+        self._probing = True
+        return True
+
+    def on_success(self):
+        self.state = "closed"
+        self.failures = 0
+        self.open_s = self.base_open_s
+        self._probing = False
+
+    def on_failure(self):
+        if self.state == "half_open":
+            self.open_s = min(self.max_open_s, self.open_s * 2)
+            self._open()
+            return
+        self.failures += 1
+        if self.failures >= self.failure_threshold:
+            self._open()
+
+    def release(self):
+        """Libera la prueba si terminó sin resultado (p. ej. cancelada)."""
+        self._probing = False
+
+    def _open(self):
+        self.state = "open"
+        self._opened_at = time.monotonic()
+        self._probing = False
+
+
+class RetryPolicy:
+    """Cuántas veces y cuánto esperar entre intentos.
+
+    Args:
+        attempts (int): Intentos totales (el primero incluido).
+        base_s (float): Espera base; el intento n espera al azar entre 0 y base_s * 2**n.
+        max_s (float): Tope de cada espera.
+        max_retry_after_s (float): Si el servidor pide esperar más que esto, no se reintenta
+            y la respuesta vuelve al llamador (que decide, p. ej. el modo en vivo).
+    """
+    def __init__(self, attempts: int = 4, base_s: float = 0.5, max_s: float = 8.0,
+                 max_retry_after_s: float = 30.0):
+        self.attempts = attempts
+        self.base_s = base_s
+        self.max_s = max_s
+        self.max_retry_after_s = max_retry_after_s
+
+    def should_retry(self, method: str, attempt: int, exc: BaseException | None = None,
+                     response: httpx.Response | None = None) -> bool:
+        if attempt + 1 >= self.attempts:
+            return False
+        if exc is not None:
+            # Sin conexión la solicitud no llegó al servidor: se puede repetir aunque no sea idempotente
+            if isinstance(exc, (httpx.ConnectError, httpx.ConnectTimeout)):
+                return True
+            return method.upper() in IDEMPOTENT and isinstance(exc, httpx.TransportError)
+        if response is None or response.status_code not in RETRY_STATUS or method.upper() not in IDEMPOTENT:
+            return False
+        ra = parse_retry_after(response.headers.get("Retry-After"))
+        return ra is None or ra <= self.max_retry_after_s
+
+    def delay(self, attempt: int, response: httpx.Response | None = None) -> float:
+        """Espera antes del intento attempt+1: Retry-After si lo hay; si no, full jitter."""
+        if response is not None:
+            ra = parse_retry_after(response.headers.get("Retry-After"))
+            if ra is not None:
+                return ra
+        return random.uniform(0, min(self.max_s, self.base_s * 2 ** attempt))
@@ -0,0 +1,179 @@
+# core/telemetry.py
+"""Métricas de latencia por endpoint y por etapa del pipeline (red → JSON → merge → tabla → gráfico).
+
+Cada serie es un resumen con ventana móvil: guarda las últimas 'window'
+muestras para los percentiles p50/p95/p99 y además la suma y la cantidad
+acumuladas. Se exporta como JSON o como texto de Prometheus (tipo summary).
+
+Las fases de red salen de la extensión 'trace' de httpcore: conexión
+(resolución DNS + TCP, httpcore no las separa), TLS, TTFB (envío de
+headers → headers de la respuesta) y descarga del cuerpo. Sólo hay conexión
+y TLS cuando no se reutiliza una conexión del pool.
+"""
+import json
+import re
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+import numpy as np
+
+QUANTILES = (0.5, 0.95, 0.99)
+PREFIX = "fadeapi_"
+_ID_SEGMENT = re.compile(r"^\d+$")
+
+
+def endpoint_label(path: str) -> str:
+    """Ruta relativa normalizada para usar como etiqueta: 'usuarios/12/' → 'usuarios/{id}'."""
+    segs = [s for s in path.strip("/").split("/") if s]
+    return "/".join("{id}" if _ID_SEGMENT.match(s) else s for s in segs) or "/"
+
+
+class Histogram:
+    """Resumen de una serie: ventana móvil para percentiles, suma y cantidad acumuladas."""
+    def __init__(self, window: int = 1024):
+        self.samples: deque[float] = deque(maxlen=window)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.samples.append(value)
+        self.count += 1
+        self.sum += value
+
+    def summary(self) -> dict:
+        out = {"count": self.count, "sum": self.sum}
+        if self.samples:
+            a = np.fromiter(self.samples, dtype=np.float64, count=len(self.samples))
+            for q, v in zip(QUANTILES, np.quantile(a, QUANTILES)):
+                out[f"p{round(q * 100)}"] = float(v)
+            out["max"] = float(a.max())
+        return out
+
+
+class Telemetry:
+    """Registro de histogramas y contadores etiquetados; seguro entre hilos (UI y loop asyncio)."""
+    def __init__(self, window: int = 1024):
+        self.window = window
+        self._lock = threading.Lock()
+        self._hist: dict[tuple, Histogram] = {}
+        self._counters: dict[tuple, float] = {}
+        self.started = time.time()
+
+    @staticmethod
+    def _key(name: str, labels: dict) -> tuple:
+        return (name, tuple(sorted((k, str(v)) for k, v in labels.items())))
+
+    def observe(self, name: str, value: float, **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            h = self._hist.get(key)
+            if h is None:
+                h = self._hist[key] = Histogram(self.window)
+            h.observe(value)
+
+    def inc(self, name: str, value: float = 1, **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    @contextmanager
+    def timer(self, name: str, **labels):
+        """Mide en segundos el bloque 'with' (se registra aunque termine con excepción)."""
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - t0, **labels)
+
+    def stage(self, stage: str):
+        """Atajo para las etapas del pipeline: timer('stage_seconds', stage=...)."""
+        return self.timer("stage_seconds", stage=stage)
+
+    def reset(self):
+        with self._lock:
+            self._hist.clear()
+            self._counters.clear()
+            self.started = time.time()
+
+    def snapshot(self) -> dict:
+        """Estado actual: {'histograms': [...], 'counters': [...]} con etiquetas como dict."""
+        with self._lock:
+            hist = [(k, h.summary()) for k, h in self._hist.items()]
+            counters = list(self._counters.items())
+        return {
+            "started": self.started,
+            "taken": time.time(),
+            "histograms": [{"name": n, "labels": dict(lb), **s} for (n, lb), s in sorted(hist)],
+            "counters": [{"name": n, "labels": dict(lb), "value": v} for (n, lb), v in sorted(counters)],
+        }
+
+    def to_json(self) -> str:
+        return json.dumps(self.snapshot(), indent=2, ensure_ascii=False)
+
+    def to_prometheus(self) -> str:
+        """Formato de exposición de texto de Prometheus (histogramas como 'summary')."""
+        snap = self.snapshot()
+
+        def fmt_labels(labels: dict, **extra) -> str:
+            items = {**labels, **extra}
+            if not items:
+                return ""
+            esc = {k: str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for k, v in items.items()}
+            return "{" + ",".join(f'{k}="{v}"' for k, v in esc.items()) + "}"
+
+        lines, typed = [], set()
+        for h in snap["histograms"]:
+            name = PREFIX + h["name"]
+            if name not in typed:
+                lines.append(f"# TYPE {name} summary")
+                typed.add(name)
+            for q in QUANTILES:
+                v = h.get(f"p{round(q * 100)}")
+                if v is not None:
+                    lines.append(f"{name}{fmt_labels(h['labels'], quantile=q)} {v:.6g}")
+            lines.append(f"{name}_sum{fmt_labels(h['labels'])} {h['sum']:.6g}")
+            lines.append(f"{name}_count{fmt_labels(h['labels'])} {h['count']}")
+        for c in snap["counters"]:
+            name = PREFIX + c["name"]
+            if name not in typed:
+                lines.append(f"# TYPE {name} counter")
+                typed.add(name)
+            lines.append(f"{name}{fmt_labels(c['labels'])} {c['value']:.15g}")
+        return "\n".join(lines) + "\n"
+
+
+class RequestTrace:
+    """Callback de la extensión 'trace' de httpcore: toma tiempos de cada fase de una solicitud."""
+    _PHASES = {
+        "connect_tcp": "http_connect_seconds",
+        "start_tls": "http_tls_seconds",
+        "receive_response_body": "http_download_seconds",
+    }
+
+    def __init__(self, registry: "Telemetry", endpoint: str):
+        self.registry = registry
+        self.endpoint = endpoint
+        self._t: dict[str, float] = {}
+
+    async def __call__(self, event: str, info: dict):
+        now = time.perf_counter()
+        # 'connection.connect_tcp.started', 'http11.receive_response_headers.complete', ...
+        phase, _, state = event.partition(".")[2].rpartition(".")
+        if state == "started":
+            self._t[phase] = now
+            return
+        if state != "complete":
+            return
+        t0 = self._t.pop(phase, None)
+        if phase == "send_request_headers":
+            # TTFB: desde que salieron los headers hasta que llegan los de la respuesta
+            self._t["request_sent"] = now
+        elif phase in self._PHASES and t0 is not None:
+            self.registry.observe(self._PHASES[phase], now - t0, endpoint=self.endpoint)
+        elif phase == "receive_response_headers" and "request_sent" in self._t:
+            self.registry.observe("http_ttfb_seconds", now - self._t.pop("request_sent"), endpoint=self.endpoint)
+
+
+# Registro único de la aplicación (lo usan ApiClient y las pestañas)
+telemetry = Telemetry()
@@ -0,0 +1,124 @@
+# core/timeparse.py
+"""Parseo vectorizado de timestamps ISO-8601 y offsets de zona horaria cacheados."""
+from datetime import datetime, timezone, timedelta
+from functools import lru_cache
+from zoneinfo import ZoneInfo
+import numpy as np
+
+TZ_CORDOBA = "America/Argentina/Cordoba"
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_HOUR_NS = 3_600_000_000_000
+
+
+def parse_iso_ns(ts_str: str) -> int:
+    """ISO-8601 (con/sin 'Z' u offset; sin zona se asume UTC) → epoch en nanosegundos."""
+    dt = datetime.fromisoformat(ts_str.replace("Z", "+00:00"))
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return ((dt - _EPOCH) // timedelta(microseconds=1)) * 1000
+
+
+def iso_from_ns(ns: int) -> str:
+    """Epoch en nanosegundos → ISO-8601 UTC (resolución de microsegundos)."""
+    return (_EPOCH + timedelta(microseconds=int(ns) // 1000)).isoformat()
+
+
+def parse_iso_array(values) -> np.ndarray:
+    """Parsea un lote de timestamps ISO-8601 a int64 epoch-ns en una pasada vectorizada.
+
+    Acepta str o bytes, con sufijo 'Z', offset '±HH:MM' o sin zona (UTC).
+    El sufijo de zona se detecta y se recorta sobre la matriz de bytes; el
+    resto lo parsea NumPy en C (datetime64). Si algún valor no tiene un
+    formato que NumPy entienda, se cae al parseo elemento a elemento.
+    """
+    m = _to_byte_matrix(values)
+    if m is None:
+        return _parse_slow(values)
+    n, w = m.shape
+    if n == 0:
+        return np.empty(0, dtype=np.int64)
+    rows = np.arange(n)
+    length = (m != 0).sum(axis=1)
+    last = m[rows, np.maximum(length - 1, 0)]
+    is_z = (last == ord("Z")) | (last == ord("z"))
+
+    p = length - 6
+    pc = np.clip(p, 0, w - 1)
+    sign_c = m[rows, pc]
+    has_off = (p >= 16) & ((sign_c == ord("+")) | (sign_c == ord("-"))) \
+        & (m[rows, np.clip(length - 3, 0, w - 1)] == ord(":"))
+    off_ns = np.zeros(n, dtype=np.int64)
+    if has_off.any():
+        d = m.astype(np.int64) - ord("0")
+        hh = d[rows, np.clip(p + 1, 0, w - 1)] * 10 + d[rows, np.clip(p + 2, 0, w - 1)]
+        mm = d[rows, np.clip(p + 4, 0, w - 1)] * 10 + d[rows, np.clip(p + 5, 0, w - 1)]
+        sign = np.where(sign_c == ord("-"), -1, 1)
+        off_ns = np.where(has_off, sign * (hh * 3600 + mm * 60) * 1_000_000_000, 0)
+
+    core = np.where(is_z, length - 1, np.where(has_off, p, length))
+    m[np.arange(w)[None, :] >= core[:, None]] = 0
+    try:
+        base = m.view(f"S{w}").ravel().astype("datetime64[ns]").view(np.int64)
+    except ValueError:
+        return _parse_slow(values)
+    if (base == np.iinfo(np.int64).min).any():   # NaT: valor vacío o irreconocible
+        return _parse_slow(values)
+    return base - off_ns
+
+
+def _to_byte_matrix(values) -> np.ndarray | None:
+    """Matriz (n, ancho) uint8 con los caracteres ASCII de cada string (relleno con 0)."""
+    try:
+        if isinstance(values, np.ndarray):
+            if values.dtype.kind == "U":
+                n = values.shape[0]
+                u = np.ascontiguousarray(values).view(np.uint32).reshape(n, -1)
+                if n and u.max() > 127:
+                    return None
+                return u.astype(np.uint8)
+            a = values if values.dtype.kind == "S" else values.astype("S")
+        else:
+            a = np.array(values, dtype="S")
+    except (UnicodeEncodeError, ValueError, TypeError):
+        return None
+    n = a.shape[0] if a.ndim else 0
+    return a.view(np.uint8).reshape(n, a.dtype.itemsize).copy()
+
+
+def _parse_slow(values) -> np.ndarray:
+    out = [parse_iso_ns(v.decode() if isinstance(v, bytes) else str(v)) for v in values]
+    return np.array(out, dtype=np.int64)
+
+
+@lru_cache(maxsize=65536)
+def _offset_ns_at_hour(tz_name: str, hour: int) -> int:
+    dt = datetime.fromtimestamp(hour * 3600, timezone.utc).astimezone(ZoneInfo(tz_name))
+    return int(dt.utcoffset().total_seconds()) * 1_000_000_000
+
+
+def tz_offset_ns(ts_ns: np.ndarray, tz_name: str = TZ_CORDOBA) -> np.ndarray:
+    """Offset UTC→zona (ns) para cada timestamp, resuelto por hora con tabla cacheada.
+
+    Sólo se consulta zoneinfo una vez por hora distinta presente en los datos
+    (y se recuerda entre llamadas); con ts ordenados no hace falta ordenar.
+    """
+    ts_ns = np.asarray(ts_ns, dtype=np.int64)
+    if len(ts_ns) == 0:
+        return np.empty(0, dtype=np.int64)
+    hours = ts_ns // _HOUR_NS
+    if len(hours) == 1 or (np.diff(hours) >= 0).all():
+        starts = np.concatenate([[0], np.flatnonzero(np.diff(hours)) + 1])
+        counts = np.diff(np.append(starts, len(hours)))
+        offs = np.fromiter((_offset_ns_at_hour(tz_name, int(h)) for h in hours[starts]),
+                           dtype=np.int64, count=len(starts))
+        return np.repeat(offs, counts)
+    uh, inv = np.unique(hours, return_inverse=True)
+    offs = np.fromiter((_offset_ns_at_hour(tz_name, int(h)) for h in uh), dtype=np.int64, count=len(uh))
+    return offs[inv]
+
+
+def to_local_seconds(ts_ns: np.ndarray, tz_name: str = TZ_CORDOBA) -> np.ndarray:
+    """Epoch-ns UTC → segundos "de pared" en la zona dada (float64), para ejes de fecha."""
+    ts_ns = np.asarray(ts_ns, dtype=np.int64)
+    return (ts_ns + tz_offset_ns(ts_ns, tz_name)) / 1e9
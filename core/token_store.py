@@ -0,0 +1,228 @@
+# core/token_store.py
+"""Almacén de tokens con caché en memoria y persistencia diferida (write-behind).
+
+El backend por defecto es el keyring del sistema; con la variable de entorno
+FADEAPI_TOKEN_BACKEND=file|memory se usa un archivo JSON o sólo memoria
+(útil para corridas headless o de prueba).
+"""
+from __future__ import annotations
+import abc
+import atexit
+import json
+import os
+import threading
+from typing import Optional
+
+SERVICE = "FADEAPI-Client"
+
+Tokens = tuple[Optional[str], Optional[str]]
+
+
+class TokenBackend(abc.ABC):
+    """Interfaz mínima de persistencia de tokens por usuario."""
+    @abc.abstractmethod
+    def get(self, username: str) -> Tokens:
+        ...
+
+    @abc.abstractmethod
+    def set(self, username: str, access: str, refresh: str):
+        ...
+
+    @abc.abstractmethod
+    def delete(self, username: str):
+        ...
+
+
+class KeyringBackend(TokenBackend):
+    """Tokens en el keyring del SO (Credential Manager, SecretService, Keychain)."""
+    def get(self, username: str) -> Tokens:
+        import keyring
+        return (
+            keyring.get_password(SERVICE, f"{username}:access"),
+            keyring.get_password(SERVICE, f"{username}:refresh"),
+        )
+
+    def set(self, username: str, access: str, refresh: str):
+        import keyring
+        keyring.set_password(SERVICE, f"{username}:access", access)
+        keyring.set_password(SERVICE, f"{username}:refresh", refresh)
+
+    def delete(self, username: str):
+        import keyring
+        try:
+            keyring.delete_password(SERVICE, f"{username}:access")
+        except Exception:
+            pass
+        try:
+            keyring.delete_password(SERVICE, f"{username}:refresh")
+        except Exception:
+            pass
+
+
+class MemoryBackend(TokenBackend):
+    """Tokens sólo en memoria del proceso (no sobreviven al reinicio)."""
+    def __init__(self):
+        self._d: dict[str, tuple[str, str]] = {}
+
+    def get(self, username: str) -> Tokens:
+        return self._d.get(username, (None, None))
+
+    def set(self, username: str, access: str, refresh: str):
+        self._d[username] = (access, refresh)
+
+    def delete(self, username: str):
+        self._d.pop(username, None)
+
+
+class FileBackend(TokenBackend):
+    """Tokens en un archivo JSON (sin cifrar; pensado para entornos headless)."""
+    def __init__(self, path: str | None = None):
+        if path is None:
+            base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~")
+            path = os.path.join(base, "FADEAPI-Client", "tokens.json")
+        self.path = path
+        self._lock = threading.Lock()
+
+    def _read(self) -> dict:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write(self, d: dict):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(d, f)
+        try:
+            os.chmod(tmp, 0o600)
+        except OSError:
+            pass
+        os.replace(tmp, self.path)
+
+    def get(self, username: str) -> Tokens:
+        with self._lock:
+            v = self._read().get(username) or {}
+        return v.get("access"), v.get("refresh")
+
+    def set(self, username: str, access: str, refresh: str):
+        with self._lock:
+            d = self._read()
+            d[username] = {"access": access, "refresh": refresh}
+            self._write(d)
+
+    def delete(self, username: str):
+        with self._lock:
+            d = self._read()
+            if d.pop(username, None) is not None:
+                self._write(d)
+
+
+_DELETE = object()
+
+
+class TokenStore:
+    """Caché en proceso sobre un TokenBackend con escritura diferida.
+
+    load() consulta el backend una sola vez por usuario; save()/delete()
+    actualizan la caché al instante y encolan la persistencia en un hilo
+    escritor, de modo que ni el arranque ni el refresh esperan al keyring.
+    Las escrituras pendientes de un mismo usuario se coalescen (gana la última).
+    """
+    def __init__(self, backend: TokenBackend):
+        self.backend = backend
+        self._cache: dict[str, Tokens] = {}
+        self._pending: dict[str, object] = {}
+        self._cond = threading.Condition()
+        self._busy = False
+        self._writer: threading.Thread | None = None
+
+    def load(self, username: str) -> Tokens:
+        with self._cond:
+            if username in self._cache:
+                return self._cache[username]
+        tokens = self.backend.get(username)
+        with self._cond:
+            # Si mientras tanto alguien guardó, la caché manda
+            return self._cache.setdefault(username, tokens)
+
+    def save(self, username: str, access: str, refresh: str):
+        self._enqueue(username, (access, refresh), (access, refresh))
+
+    def delete(self, username: str):
+        self._enqueue(username, (None, None), _DELETE)
+
+    def _enqueue(self, username: str, cached: Tokens, op: object):
+        with self._cond:
+            self._cache[username] = cached
+            self._pending[username] = op
+            if self._writer is None or not self._writer.is_alive():
+                self._writer = threading.Thread(target=self._write_loop, name="token-writer", daemon=True)
+                self._writer.start()
+            self._cond.notify_all()
+
+    def _write_loop(self):
+        while True:
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+                username, op = next(iter(self._pending.items()))
+                del self._pending[username]
+                self._busy = True
+            try:
+                if op is _DELETE:
+                    self.backend.delete(username)
+                else:
+                    self.backend.set(username, *op)
+            except Exception:
+                pass
+            finally:
+                with self._cond:
+                    self._busy = False
+                    self._cond.notify_all()
+
+    def flush(self, timeout: float | None = 5) -> bool:
+        """Espera a que se persistan las escrituras pendientes. Devuelve False si vence el timeout."""
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._pending and not self._busy, timeout)
+
+
+def _backend_from_env() -> TokenBackend:
+    kind = (os.environ.get("FADEAPI_TOKEN_BACKEND") or "keyring").strip().lower()
+    if kind == "memory":
+        return MemoryBackend()
+    if kind == "file":
+        return FileBackend(os.environ.get("FADEAPI_TOKEN_FILE") or None)
+    return KeyringBackend()
+
+
+_store: TokenStore | None = None
+_store_lock = threading.Lock()
+
+
+def get_store() -> TokenStore:
+    """Devuelve el TokenStore del proceso (creado según FADEAPI_TOKEN_BACKEND)."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = TokenStore(_backend_from_env())
+        return _store
+
+
+def set_store(store: TokenStore):
+    """Reemplaza el TokenStore del proceso (p. ej. con un MemoryBackend en pruebas)."""
+    global _store
+    with _store_lock:
+        old, _store = _store, store
+    if old is not None:
+        old.flush()
+
+
+def flush_tokens(timeout: float | None = 5) -> bool:
+    with _store_lock:
+        store = _store
+    return store.flush(timeout) if store is not None else True
+
+
+atexit.register(flush_tokens)
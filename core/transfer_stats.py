@@ -0,0 +1,194 @@
+# core/transfer_stats.py
+"""Negociación de compresión y contabilidad de bytes por solicitud.
+
+httpx descomprime gzip siempre; brotli y zstd sólo si están instalados los
+paquetes 'brotli' (o 'brotlicffi') y 'zstandard' (pip install httpx[brotli,zstd]).
+Por cada respuesta se registran los bytes recibidos por la red y los bytes
+ya decodificados, para ver la relación de compresión real.
+
+La cuenta la hace AccountingTransport, que envuelve al transporte de httpx
+(como CachedTransport): mide el cuerpo crudo al pasar por el transporte, y
+los bytes decodificados al salir de Response.aiter_bytes, donde httpx ya los
+descomprime (por ahí pasan también aread(), aiter_text() y aiter_lines()).
+"""
+import time
+from collections import deque
+import httpx
+from core.telemetry import telemetry
+
+
+def _encodings() -> list[str]:
+    """Codificaciones que httpx puede decodificar en este entorno, en orden de preferencia."""
+    encs = []
+    try:
+        import zstandard  # noqa: F401
+        encs.append("zstd")
+    except ImportError:
+        pass
+    try:
+        import brotli  # noqa: F401
+        encs.append("br")
+    except ImportError:
+        try:
+            import brotlicffi  # noqa: F401
+            encs.append("br")
+        except ImportError:
+            pass
+    encs.append("gzip")
+    return encs
+
+
+ENCODINGS = _encodings()
+
+
+def accept_encoding(enabled: bool = True) -> str:
+    """Valor de Accept-Encoding: las codificaciones disponibles, o 'identity' si está desactivado."""
+    return ", ".join(ENCODINGS) if enabled else "identity"
+
+
+def fmt_bytes(n: float) -> str:
+    for unit in ("B", "KB", "MB", "GB"):
+        if n < 1024 or unit == "GB":
+            return f"{n:.0f} {unit}" if unit == "B" else f"{n:.1f} {unit}"
+        n /= 1024
+
+
+class TransferRecord:
+    """Una respuesta ya cerrada: bytes por la red (wire) y decodificados."""
+    def __init__(self, method: str, url: str, status: int, http_version: str, encoding: str,
+                 wire: int, decoded: int, from_cache: bool, elapsed_s: float):
+        self.method = method
+        self.url = url
+        self.status = status
+        self.http_version = http_version
+        self.encoding = encoding
+        self.wire = wire
+        self.decoded = decoded
+        self.from_cache = from_cache
+        self.elapsed_s = elapsed_s
+
+    @property
+    def ratio(self) -> float | None:
+        return self.decoded / self.wire if self.wire else None
+
+
+class _WireStream(httpx.AsyncByteStream):
+    """Cuenta los bytes crudos del cuerpo a medida que pasan por el transporte."""
+    def __init__(self, inner: httpx.AsyncByteStream):
+        self._inner = inner
+        self.wire = 0
+        self.exhausted = False
+
+    async def __aiter__(self):
+        async for chunk in self._inner:
+            self.wire += len(chunk)
+            yield chunk
+        self.exhausted = True
+
+    async def aclose(self):
+        await self._inner.aclose()
+
+
+class _AccountedResponse(httpx.Response):
+    """Respuesta que cuenta lo decodificado y se registra en TransferStats al terminar.
+
+    httpx cierra el stream apenas se agota el cuerpo crudo, antes de vaciar
+    el decodificador: si se estaba leyendo hasta el final, el registro se
+    hace al terminar aiter_bytes; si se cerró antes (cuerpo abandonado o no
+    leído), al cerrarse.
+    """
+    def _accounting(self, stats: "TransferStats", wire: _WireStream, t0: float):
+        self._stats, self._wire, self._t0 = stats, wire, t0
+        self._decoded, self._iterating, self._recorded = 0, False, False
+
+    async def aiter_bytes(self, chunk_size: int | None = None):
+        self._iterating = True
+        try:
+            async for part in super().aiter_bytes(chunk_size):
+                self._decoded += len(part)
+                yield part
+        finally:
+            self._iterating = False
+            self._finish()
+
+    async def aclose(self):
+        await super().aclose()
+        if not (self._iterating and self._wire.exhausted):
+            self._finish()
+
+    def _finish(self):
+        if not self._recorded:
+            self._recorded = True
+            self._stats._record(self.request, self, self._wire.wire, self._decoded,
+                                time.perf_counter() - self._t0)
+
+
+class TransferStats:
+    """Totales y últimas respuestas; los alimenta AccountingTransport.
+
+    Los bytes de red son los del cuerpo crudo que entrega el transporte
+    (antes de descomprimir); las respuestas servidas desde la caché HTTP
+    cuentan 0 bytes de red.
+    """
+    def __init__(self, keep: int = 200):
+        self.recent: deque[TransferRecord] = deque(maxlen=keep)
+        self.requests = 0
+        self.wire_bytes = 0
+        self.decoded_bytes = 0
+
+    def record(self, rec: TransferRecord):
+        self.recent.append(rec)
+        self.requests += 1
+        self.wire_bytes += rec.wire
+        self.decoded_bytes += rec.decoded
+
+    def snapshot(self) -> tuple[int, int]:
+        """(bytes de red, bytes decodificados) acumulados; para medir un tramo con describe()."""
+        return self.wire_bytes, self.decoded_bytes
+
+    def describe(self, since: tuple[int, int] = (0, 0)) -> str:
+        wire = self.wire_bytes - since[0]
+        decoded = self.decoded_bytes - since[1]
+        if not wire:
+            return f"{fmt_bytes(decoded)} (sin tráfico de red)"
+        return f"{fmt_bytes(wire)} por red → {fmt_bytes(decoded)} (×{decoded / wire:.1f})"
+
+    def _record(self, request: httpx.Request, response: httpx.Response, wire: int, decoded: int,
+                elapsed_s: float):
+        from_cache = bool(response.extensions.get("from_cache"))
+        wire = 0 if from_cache else wire
+        endpoint = request.extensions.get("endpoint")
+        if endpoint:
+            telemetry.inc("http_wire_bytes_total", wire, endpoint=endpoint)
+            telemetry.inc("http_decoded_bytes_total", decoded, endpoint=endpoint)
+        version = response.extensions.get("http_version", b"HTTP/1.1")
+        self.record(TransferRecord(
+            request.method, str(request.url), response.status_code,
+            version.decode("ascii", "replace") if isinstance(version, bytes) else str(version),
+            response.headers.get("content-encoding", "identity"),
+            wire, decoded, from_cache, elapsed_s,
+        ))
+
+
+class AccountingTransport(httpx.AsyncBaseTransport):
+    """Transporte que registra en TransferStats los bytes de cada respuesta.
+
+    Args:
+        inner (httpx.AsyncBaseTransport): Transporte envuelto (red o CachedTransport).
+        stats (TransferStats): Dónde se acumulan los registros.
+    """
+    def __init__(self, inner: httpx.AsyncBaseTransport, stats: TransferStats):
+        self.inner = inner
+        self.stats = stats
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        t0 = time.perf_counter()
+        response = await self.inner.handle_async_request(request)
+        wire = _WireStream(response.stream)
+        out = _AccountedResponse(response.status_code, headers=response.headers, stream=wire,
+                                 request=request, extensions=response.extensions)
+        out._accounting(self.stats, wire, t0)
+        return out
+
+    async def aclose(self):
+        await self.inner.aclose()
@@ -4,10 +4,11 @@ import os
 import re
 import subprocess
 import sys
-import asyncio
 from typing import Optional
 import httpx
 from packaging.version import Version
+from core.http_cache import shared_client
+from core.workers import run_sync
 
 # En entornos corporativos con inspección TLS
 try:
@@ -25,17 +26,19 @@ def _parse_version(tag: str) -> str:
 
 async def _get_latest_release_json() -> dict:
     """Devuelve el JSON del release más reciente. Fallback a la lista si /latest no existe."""
-    async with httpx.AsyncClient(timeout=30, follow_redirects=True) as c:
-        r = await c.get(API_LATEST)
-        if r.status_code == 404:
-            rl = await c.get(API_LIST)
-            rl.raise_for_status()
-            releases = [x for x in rl.json() if not x.get("draft")]
-            if not releases:
-                raise RuntimeError("No hay releases públicos")
-            return releases[0]
-        r.raise_for_status()
-        return r.json()
+    # Cliente compartido con caché condicional: GitHub responde 304 (sin cuerpo y sin
+    # consumir cuota de rate limit) si el release no cambió
+    c = shared_client()
+    r = await c.get(API_LATEST)
+    if r.status_code == 404:
+        rl = await c.get(API_LIST)
+        rl.raise_for_status()
+        releases = [x for x in rl.json() if not x.get("draft")]
+        if not releases:
+            raise RuntimeError("No hay releases públicos")
+        return releases[0]
+    r.raise_for_status()
+    return r.json()
 
 async def check_update(current_version: str) -> tuple[bool, str]:
     """¿Hay una versión más nueva? -> (True/False, latest_str)"""
@@ -122,4 +125,6 @@ def run_installer(path: str):
 
 # Helpers para la UI (sincronizar con run_bg desde Qt)
 def download_and_get_path_sync(version: str) -> str:
-    return asyncio.run(download_latest_asset(version))
+    # En el loop compartido de la app (no desde ese mismo hilo): con asyncio.run
+    # cada llamada creaba un loop nuevo y el cliente compartido quedaba sin cerrar
+    return run_sync(download_latest_asset(version))
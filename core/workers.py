@@ -1,11 +1,15 @@
 # core/workers.py
 from PySide6.QtCore import QObject, Signal, QRunnable, QThreadPool
+import asyncio
+import concurrent.futures
+import threading
 import traceback
 
 class WorkerSignals(QObject):
     finished = Signal()
     error = Signal(str)
     result = Signal(object)
+    item = Signal(object)   # elementos parciales (run_async_iter)
 
 class Worker(QRunnable):
     def __init__(self, fn, *args, **kwargs):
@@ -32,3 +36,176 @@ def run_bg(fn, on_result=None, on_error=None, *args, **kwargs):
     if on_error:
         w.signals.error.connect(on_error)
     QThreadPool.globalInstance().start(w)
+
+
+# ---------------------------------------------------------------------------
+# Event loop asyncio único, en su propio hilo
+# ---------------------------------------------------------------------------
+class AsyncLoopThread(threading.Thread):
+    """Hilo daemon que mantiene vivo un event loop asyncio compartido."""
+    def __init__(self):
+        super().__init__(name="asyncio-loop", daemon=True)
+        self.loop = asyncio.new_event_loop()
+        self._ready = threading.Event()
+
+    def run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.call_soon(self._ready.set)
+        try:
+            self.loop.run_forever()
+        finally:
+            try:
+                pending = asyncio.all_tasks(self.loop)
+                for t in pending:
+                    t.cancel()
+                if pending:
+                    self.loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+                self.loop.run_until_complete(self.loop.shutdown_asyncgens())
+            finally:
+                self.loop.close()
+
+    def start(self):
+        super().start()
+        self._ready.wait()
+
+    def stop(self, timeout: float | None = 5):
+        if self.loop.is_running():
+            self.loop.call_soon_threadsafe(self.loop.stop)
+        self.join(timeout)
+
+
+_loop_thread: AsyncLoopThread | None = None
+_loop_lock = threading.Lock()
+
+def get_loop() -> asyncio.AbstractEventLoop:
+    """Devuelve el loop compartido, arrancando su hilo la primera vez."""
+    global _loop_thread
+    with _loop_lock:
+        if _loop_thread is None or not _loop_thread.is_alive():
+            _loop_thread = AsyncLoopThread()
+            _loop_thread.start()
+        return _loop_thread.loop
+
+def shutdown_loop(timeout: float | None = 5):
+    """Detiene el loop compartido (llamar al salir de la aplicación)."""
+    global _loop_thread
+    with _loop_lock:
+        t, _loop_thread = _loop_thread, None
+    if t is not None:
+        t.stop(timeout)
+
+
+class AsyncTask:
+    """Handle de una corrutina lanzada con run_async; permite cancelarla."""
+    def __init__(self, future: concurrent.futures.Future, signals: WorkerSignals):
+        self.future = future
+        self.signals = signals
+
+    def cancel(self) -> bool:
+        return self.future.cancel()
+
+    def cancelled(self) -> bool:
+        return self.future.cancelled()
+
+    def done(self) -> bool:
+        return self.future.done()
+
+
+def run_async(coro, on_result=None, on_error=None) -> AsyncTask:
+    """Ejecuta la corrutina en el loop compartido y entrega el resultado por señales Qt.
+
+    Las señales se crean en el hilo que llama (el de la UI), así que los
+    callbacks corren en ese hilo. Si la tarea se cancela no se emite ni
+    result ni error, sólo finished.
+    """
+    signals = WorkerSignals()
+    if on_result:
+        signals.result.connect(on_result)
+    if on_error:
+        signals.error.connect(on_error)
+    return _submit(coro, signals)
+
+
+# Referencias fuertes a las señales en vuelo: si el QObject emisor se recolecta
+# antes de que la UI procese el evento encolado, Qt descarta la entrega.
+_inflight: set[WorkerSignals] = set()
+
+
+def _submit(coro, signals: WorkerSignals) -> AsyncTask:
+    _inflight.add(signals)
+    signals.finished.connect(lambda: _inflight.discard(signals))
+    fut = asyncio.run_coroutine_threadsafe(coro, get_loop())
+
+    def _done(f: concurrent.futures.Future):
+        try:
+            if not f.cancelled():
+                exc = f.exception()
+                if exc is not None:
+                    signals.error.emit("".join(traceback.format_exception(exc)))
+                else:
+                    signals.result.emit(f.result())
+            signals.finished.emit()
+        except RuntimeError:
+            # La app se está cerrando y el QObject de señales ya fue destruido
+            pass
+
+    fut.add_done_callback(_done)
+    return AsyncTask(fut, signals)
+
+
+def run_async_iter(agen, on_item=None, on_result=None, on_error=None) -> AsyncTask:
+    """Consume un async generator en el loop compartido emitiendo cada elemento por señal Qt.
+
+    on_item recibe cada elemento en el hilo de la UI; on_result recibe la
+    cantidad de elementos al terminar. Cancelar el handle cierra el generador.
+    """
+    signals = WorkerSignals()
+    if on_item:
+        signals.item.connect(on_item)
+    if on_result:
+        signals.result.connect(on_result)
+    if on_error:
+        signals.error.connect(on_error)
+
+    async def consume():
+        n = 0
+        try:
+            async for it in agen:
+                signals.item.emit(it)
+                n += 1
+        finally:
+            await agen.aclose()
+        return n
+
+    return _submit(consume(), signals)
+
+
+async def iter_in_thread(it):
+    """Recorre un iterador sincrónico (I/O o CPU pesado) trayendo cada elemento en un hilo del pool.
+
+    Si el consumidor se detiene (cancelación), el iterador se cierra recién
+    cuando termina el next() en curso, así su limpieza (finally) corre siempre.
+    """
+    pending = None
+    try:
+        while True:
+            pending = asyncio.ensure_future(asyncio.to_thread(next, it, _END))
+            item = await asyncio.shield(pending)
+            if item is _END:
+                return
+            yield item
+    finally:
+        close = getattr(it, "close", None)
+        if close is not None:
+            if pending is not None and not pending.done():
+                pending.add_done_callback(lambda _: close())
+            else:
+                close()
+
+
+_END = object()
+
+
+def run_sync(coro, timeout: float | None = None):
+    """Ejecuta la corrutina en el loop compartido bloqueando hasta el resultado."""
+    return asyncio.run_coroutine_threadsafe(coro, get_loop()).result(timeout)
@@ -0,0 +1,48 @@
+# tests/conftest.py
+"""Fixtures comunes: configuración y tokens aislados, y la FAdeAPI simulada de tools/mock_fadeapi.py."""
+import os
+import sys
+
+import pytest
+from PySide6.QtCore import QSettings
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "tools"))
+
+from core.config import Config  # noqa: E402
+from core.token_store import MemoryBackend, TokenStore, set_store  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def isolated_settings(tmp_path, monkeypatch):
+    """QSettings en un ámbito propio bajo tmp_path y tokens sólo en memoria."""
+    set_store(TokenStore(MemoryBackend()))
+    for fmt in (QSettings.Format.NativeFormat, QSettings.Format.IniFormat):
+        QSettings.setPath(fmt, QSettings.Scope.UserScope, str(tmp_path))
+    monkeypatch.setattr(Config, "application", f"FADEAPI-Client-test-{os.getpid()}")
+    yield
+    QSettings(Config.organization, Config.application).clear()
+
+
+@pytest.fixture
+def mock_api():
+    """Fábrica: mock_api(rate=..., history_s=..., sensors=...) → (servidor, ApiClient con sesión)."""
+    from core.api import ApiClient
+    from mock_fadeapi import serve_in_thread
+
+    servers = []
+
+    def make(**kwargs):
+        srv = serve_in_thread(**kwargs)
+        servers.append(srv)
+        api = ApiClient("test")
+        api.cfg.set_base_url(srv.url)
+        api._set_tokens("test", None)
+        return srv, api
+
+    yield make
+    for srv in servers:
+        srv.stopping = True
+        srv.shutdown()
+        srv.server_close()
@@ -0,0 +1,76 @@
+# tests/test_api.py
+import asyncio
+import time
+
+from core.telemetry import telemetry
+from core.timeparse import iso_from_ns
+
+
+def _requests(endpoint: str) -> float:
+    return sum(c["value"] for c in telemetry.snapshot()["counters"]
+               if c["name"] == "http_requests_total" and c["labels"].get("endpoint") == endpoint)
+
+
+def test_parallel_sparse_range_widens_empty_windows(mock_api):
+    # Una hora de datos (10 Hz) al final de un rango de 30 días
+    srv, api = mock_api(rate=10, history_s=3600, sensors=3)
+    now = time.time_ns()
+    telemetry.reset()
+
+    async def run():
+        rows = []
+        async for batch in api.iter_registros_parallel(iso_from_ns(now - 30 * 86400 * 10**9), iso_from_ns(now),
+                                                       target_rows=1000, page_size=1000):
+            rows.extend(batch)
+        await api.aclose()
+        return rows
+
+    rows = asyncio.run(run())
+    ts = [r["ts"] for r in rows]
+    assert len(rows) >= 36000
+    assert ts == sorted(ts) and len(set(ts)) == len(ts)
+    # ~36 ventanas con datos más unas pocas de sondeo (antes: más de 700 solicitudes)
+    assert _requests("registros") <= 60
+
+
+def test_parallel_window_row_cap(mock_api):
+    # La ventana inicial (1 h) abarca toda la historia: se corta en max_window_rows y el resto
+    # se pide como ventanas adicionales, sin huecos ni duplicados
+    srv, api = mock_api(rate=20, history_s=600, sensors=2)
+    now = time.time_ns()
+
+    async def run():
+        ts = []
+        async for batch in api.iter_registros_parallel(iso_from_ns(now - 600 * 10**9), iso_from_ns(now),
+                                                       target_rows=1000, page_size=1000, max_window_rows=2000):
+            ts.extend(r["ts"] for r in batch)
+        await api.aclose()
+        return ts
+
+    ts = asyncio.run(run())
+    assert len(ts) >= 11990
+    assert ts == sorted(ts) and len(set(ts)) == len(ts)
+
+
+def test_option_change_keeps_in_flight_stream(mock_api):
+    # Cambiar un timeout recrea el cliente, pero el stream abierto con el anterior
+    # termina de leerse y ese cliente se cierra recién después
+    srv, api = mock_api(rate=10, history_s=600, sensors=2)
+    breaker = api.breaker
+
+    async def run():
+        async with api.stream("GET", "registros/", params={"limit": 5000}) as r:
+            old = await api.client()
+            api.cfg.set_http_connect_timeout(api.cfg.get_http_connect_timeout() + 1)
+            api.cfg.set_http_retries(2)
+            await api.request("GET", "status")
+            new = await api.client()
+            assert new is not old and not old.is_closed
+            body = await r.aread()
+        assert old.is_closed and not new.is_closed
+        assert api.retry.attempts == 2
+        await api.aclose()
+        return body
+
+    assert len(asyncio.run(run())) > 0
+    assert api.breaker is breaker
@@ -0,0 +1,42 @@
+# tests/test_export.py
+import numpy as np
+import pytest
+
+from core.export import iter_export
+from core.registros_store import RegistrosStore
+
+
+def _store(n: int) -> RegistrosStore:
+    store = RegistrosStore()
+    ts = np.arange(0, 2 * n, 2, dtype=np.int64)
+    store.merge_arrays(ts, np.column_stack([ts * 1.0, -ts * 1.0]))
+    return store
+
+
+def test_export_ignores_rows_appended_while_writing(tmp_path):
+    store = _store(1000)
+    path = str(tmp_path / "r.npz")
+    steps = iter_export(store, path, chunk_rows=100)
+    next(steps)
+    # Append al final (con realocación del buffer) durante la escritura
+    store.merge_arrays(np.arange(10_000, 20_000, dtype=np.int64), np.zeros((10_000, 3)))
+    for _ in steps:
+        pass
+    with np.load(path) as z:
+        assert sorted(z.files) == ["s1", "s2", "ts"]
+        np.testing.assert_array_equal(z["ts"], np.arange(0, 2000, 2))
+        np.testing.assert_array_equal(z["s2"], -np.arange(0, 2000, 2.0))
+
+
+def test_export_aborts_when_rows_shift(tmp_path):
+    store = _store(1000)
+    path = tmp_path / "r.npz"
+    steps = iter_export(store, str(path), chunk_rows=100)
+    next(steps)
+    # Inserción intermedia: desplaza filas ya exportables
+    store.merge_arrays(np.array([1], dtype=np.int64), np.zeros((1, 2)))
+    with pytest.raises(RuntimeError):
+        for _ in steps:
+            pass
+    assert not path.exists()
+    assert not list(tmp_path.iterdir())
@@ -0,0 +1,27 @@
+# tests/test_telemetry.py
+import asyncio
+
+import httpx
+
+from core.telemetry import RequestTrace, Telemetry
+
+
+def _count(reg: Telemetry, name: str) -> int:
+    return sum(h["count"] for h in reg.snapshot()["histograms"] if h["name"] == name)
+
+
+def test_request_trace_records_ttfb(mock_api):
+    srv, _ = mock_api()
+    reg = Telemetry()
+
+    async def run():
+        async with httpx.AsyncClient(base_url=srv.url) as c:
+            for _ in range(2):
+                r = await c.get("status", extensions={"trace": RequestTrace(reg, "status")})
+                assert r.status_code == 200
+
+    asyncio.run(run())
+    assert _count(reg, "http_ttfb_seconds") == 2
+    # La conexión se abre una sola vez: la segunda solicitud la reutiliza
+    assert _count(reg, "http_connect_seconds") == 1
+    assert _count(reg, "http_download_seconds") == 2
@@ -0,0 +1,421 @@
+# tools/mock_fadeapi.py
+"""Servidor local que imita FAdeAPI con registros sintéticos (para probar sin la API real).
+
+Genera una fila cada 1/rate segundos desde (arranque - history) hasta ahora;
+no guarda nada, cada fila se calcula a partir de su índice.
+
+Uso:
+    python tools/mock_fadeapi.py --port 8765 --rate 1 --history 3600 --sensors 3
+    # y en Configuración → URL base: http://127.0.0.1:8765/
+
+Endpoints: status, token, token/refresh, registros/ (GET, DELETE),
+registros/csv, registros/stream (Server-Sent Events) y usuarios/ (me, listar,
+crear, actualizar). Con --no-stream el stream responde 404, para probar el
+fallback a polling. Cualquier usuario/contraseña es válido; los usuarios
+nuevos reciben el rol de --role (admin por defecto). Las respuestas de
+registros se comprimen con gzip si el cliente lo acepta.
+"""
+import argparse
+import json
+import math
+import socket
+import threading
+import time
+import zlib
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+from jose import jwt
+
+_EPOCH = datetime(1970, 1, 1)
+_SECRET = "mock-fadeapi"
+
+
+def _iso(ns: int) -> str:
+    return (_EPOCH + timedelta(microseconds=ns // 1000)).isoformat()
+
+
+def _parse_ns(s: str) -> int:
+    dt = datetime.fromisoformat(s.replace("Z", "+00:00"))
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return ((dt - _EPOCH) // timedelta(microseconds=1)) * 1000
+
+
+class SyntheticData:
+    """Serie sintética a tasa fija: la fila k tiene ts = t0 + k*periodo."""
+    def __init__(self, rate: float = 1.0, history_s: float = 3600.0, sensors: int = 3):
+        self.period_ns = int(1e9 / rate)
+        self.sensors = sensors
+        now = time.time_ns()
+        self.t0 = now - int(history_s * 1e9)
+        self.t0 -= self.t0 % self.period_ns
+        self._lock = threading.Lock()
+
+    def clear(self) -> int:
+        """Simula un borrado total: las filas empiezan a partir de ahora."""
+        with self._lock:
+            old = self.t0
+            now = time.time_ns()
+            self.t0 = now - now % self.period_ns + self.period_ns
+            return max(0, (self.t0 - old) // self.period_ns)
+
+    def index_range(self, desde_ns: int | None, hasta_ns: int | None) -> tuple[int, int]:
+        """Rango [k0, k1) de índices existentes (ts <= ahora) dentro de [desde, hasta]."""
+        t0, p = self.t0, self.period_ns
+        last = (time.time_ns() - t0) // p            # última fila ya "medida"
+        k0 = 0 if desde_ns is None else max(0, -(-(desde_ns - t0) // p))
+        k1 = last + 1 if hasta_ns is None else min(last + 1, (hasta_ns - t0) // p + 1)
+        return k0, max(k0, k1)
+
+    def row(self, k: int) -> dict:
+        ts = self.t0 + k * self.period_ns
+        return {"id": k + 1, "ts": _iso(ts), "sensores": self._values(ts)}
+
+    def _values(self, ts: int) -> list[float]:
+        t = ts / 1e9
+        # 6 decimales, como un sensor real (y el cuerpo no se infla con 17 dígitos)
+        return [round(0.5 + 0.5 * math.sin(2 * math.pi * t / 60 + j * math.pi / 4), 6) for j in range(self.sensors)]
+
+    def _block(self, k0: int, k1: int) -> tuple[list[int], list[str], list[str]]:
+        """Filas [k0, k1) vectorizadas: (ids, ts ISO, valores ya formateados y unidos por coma)."""
+        k = np.arange(k0, k1, dtype=np.int64)
+        ts = self.t0 + k * self.period_ns
+        iso = np.datetime_as_string(ts.astype("datetime64[ns]").astype("datetime64[us]"), unit="us")
+        t = (ts / 1e9)[:, None]
+        vals = 0.5 + 0.5 * np.sin(2 * np.pi * t / 60 + np.arange(self.sensors) * np.pi / 4)
+        fmt = ",".join(["%.6f"] * self.sensors)
+        cells = [fmt % tuple(r) for r in vals.tolist()]
+        return (k + 1).tolist(), iso.tolist(), cells
+
+    def rows_json(self, k0: int, k1: int) -> str:
+        """Filas [k0, k1) como elementos JSON separados por coma (sin corchetes)."""
+        ids, iso, cells = self._block(k0, k1)
+        return ",".join(f'{{"id": {i}, "ts": "{s}", "sensores": [{c}]}}' for i, s, c in zip(ids, iso, cells))
+
+    def rows_csv(self, k0: int, k1: int) -> str:
+        ids, iso, cells = self._block(k0, k1)
+        return "".join(f"{i},{s},{c}\n" for i, s, c in zip(ids, iso, cells))
+
+
+class Users:
+    """Usuarios en memoria; se crean al vuelo en el primer login."""
+    FIELDS = ("username", "nombre", "apellido", "email", "is_active", "role")
+
+    def __init__(self, default_role: str = "admin"):
+        self.default_role = default_role
+        self._lock = threading.Lock()
+        self._by_id: dict[int, dict] = {}
+
+    def _new(self, data: dict) -> dict:
+        uid = max(self._by_id, default=0) + 1
+        u = {"id": uid, "username": data.get("username") or f"user{uid}", "nombre": data.get("nombre", ""),
+             "apellido": data.get("apellido", ""), "email": data.get("email", ""),
+             "is_active": bool(data.get("is_active", True)), "role": data.get("role") or self.default_role,
+             "created_at": datetime.now(timezone.utc).isoformat()}
+        self._by_id[uid] = u
+        return u
+
+    def ensure(self, username: str) -> dict:
+        with self._lock:
+            for u in self._by_id.values():
+                if u["username"] == username:
+                    return u
+            return self._new({"username": username})
+
+    def list(self) -> list[dict]:
+        with self._lock:
+            return list(self._by_id.values())
+
+    def create(self, data: dict) -> dict | None:
+        with self._lock:
+            if any(u["username"] == data.get("username") for u in self._by_id.values()):
+                return None
+            return self._new(data)
+
+    def update(self, uid: int, data: dict) -> dict | None:
+        with self._lock:
+            u = self._by_id.get(uid)
+            if u is not None:
+                u.update({k: v for k, v in data.items() if k in self.FIELDS})
+            return u
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "MockFAdeAPI/1.0"
+
+    data: SyntheticData
+    stream_enabled = True
+
+    # ----------------- utilidades -----------------
+    def log_message(self, fmt, *args):
+        if self.server.verbose:
+            super().log_message(fmt, *args)
+
+    def _route(self) -> tuple[str, dict]:
+        u = urlsplit(self.path)
+        q = {k: v[-1] for k, v in parse_qs(u.query).items()}
+        return u.path.strip("/"), q
+
+    def _body(self) -> bytes:
+        n = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(n) if n else b""
+
+    def _send_json(self, obj, status: int = 200):
+        body = json.dumps(obj).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _start_chunked(self, content_type: str, encoding: str | None = None):
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        if encoding:
+            self.send_header("Content-Encoding", encoding)
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+    def _chunk(self, data: bytes):
+        if data:
+            self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+
+    def _end_chunked(self):
+        self.wfile.write(b"0\r\n\r\n")
+
+    def _authorized(self) -> bool:
+        if (self.headers.get("Authorization") or "").startswith("Bearer "):
+            return True
+        self._send_json({"detail": "Not authenticated"}, 401)
+        return False
+
+    def _subject(self) -> str:
+        token = (self.headers.get("Authorization") or "")[len("Bearer "):]
+        try:
+            return jwt.decode(token, _SECRET, algorithms=["HS256"]).get("sub") or "mock"
+        except Exception:
+            return "mock"
+
+    def _admin(self) -> bool:
+        if self.server.users.ensure(self._subject())["role"] == "admin":
+            return True
+        self._send_json({"detail": "Not enough permissions"}, 403)
+        return False
+
+    def _tokens(self, sub: str) -> dict:
+        now = int(time.time())
+        access = jwt.encode({"sub": sub, "exp": now + self.server.access_ttl}, _SECRET, algorithm="HS256")
+        refresh = jwt.encode({"sub": sub, "exp": now + 7 * 86400, "typ": "refresh"}, _SECRET, algorithm="HS256")
+        return {"access_token": access, "refresh_token": refresh, "token_type": "bearer"}
+
+    # ----------------- verbos -----------------
+    def do_GET(self):
+        path, q = self._route()
+        if path == "status":
+            k0, k1 = self.data.index_range(None, None)
+            return self._send_json({
+                "api_name": "FAdeAPI (mock)", "version": "mock", "status": "ok",
+                "server_name": socket.gethostname(),
+                "server_time": datetime.now(timezone.utc).isoformat(),
+                "uptime_s": round(time.monotonic() - self.server.started, 3),
+                "registros": k1 - k0, "sensores": self.data.sensors,
+                "rate_hz": 1e9 / self.data.period_ns, "stream": self.stream_enabled,
+            })
+        if path == "registros":
+            if self._authorized():
+                self._get_registros(q)
+            return
+        if path == "registros/csv":
+            if self._authorized():
+                self._get_csv(q)
+            return
+        if path == "usuarios/me":
+            if self._authorized():
+                self._send_json(self.server.users.ensure(self._subject()))
+            return
+        if path == "usuarios":
+            if self._authorized() and self._admin():
+                self._send_json(self.server.users.list())
+            return
+        if path == "registros/stream":
+            if not self.stream_enabled:
+                return self._send_json({"detail": "Not Found"}, 404)
+            if self._authorized():
+                self._stream_registros(q)
+            return
+        self._send_json({"detail": "Not Found"}, 404)
+
+    def do_POST(self):
+        path, _ = self._route()
+        body = self._body()
+        if path == "token":
+            form = {k: v[-1] for k, v in parse_qs(body.decode()).items()}
+            username = form.get("username", "mock")
+            self.server.users.ensure(username)
+            return self._send_json(self._tokens(username))
+        if path == "token/refresh":
+            try:
+                claims = jwt.decode(json.loads(body)["refresh_token"], _SECRET, algorithms=["HS256"])
+            except Exception:
+                return self._send_json({"detail": "Invalid refresh token"}, 401)
+            return self._send_json(self._tokens(claims.get("sub", "mock")))
+        if path == "usuarios":
+            if self._authorized() and self._admin():
+                u = self.server.users.create(json.loads(body or b"{}"))
+                if u is None:
+                    return self._send_json({"detail": "El usuario ya existe"}, 400)
+                self._send_json(u, 201)
+            return
+        self._send_json({"detail": "Not Found"}, 404)
+
+    def do_PUT(self):
+        path, _ = self._route()
+        body = self._body()
+        head, _, uid = path.rpartition("/")
+        if head == "usuarios" and uid.isdigit():
+            if self._authorized() and self._admin():
+                u = self.server.users.update(int(uid), json.loads(body or b"{}"))
+                if u is None:
+                    return self._send_json({"detail": "Usuario inexistente"}, 404)
+                self._send_json(u)
+            return
+        self._send_json({"detail": "Not Found"}, 404)
+
+    def do_DELETE(self):
+        path, _ = self._route()
+        if path == "registros":
+            if self._authorized():
+                self._send_json({"deleted": self.data.clear()})
+            return
+        self._send_json({"detail": "Not Found"}, 404)
+
+    # ----------------- registros -----------------
+    def _get_registros(self, q: dict):
+        limit = int(q.get("limit", 100))
+        desde = _parse_ns(q["desde"]) if q.get("desde") else None
+        hasta = _parse_ns(q["hasta"]) if q.get("hasta") else None
+        k0, k1 = self.data.index_range(desde, hasta)
+        k1 = min(k1, k0 + limit)
+        gz = "gzip" in (self.headers.get("Accept-Encoding") or "")
+        z = zlib.compressobj(6, zlib.DEFLATED, 31) if gz else None
+        # Cuerpo por tramos (comprimido si el cliente acepta gzip): no se arma la respuesta entera en memoria
+        self._start_chunked("application/json", "gzip" if gz else None)
+        out = z.compress if gz else (lambda b: b)
+        self._chunk(out(b"["))
+        step = 5000
+        for a in range(k0, k1, step):
+            part = self.data.rows_json(a, min(k1, a + step))
+            self._chunk(out((("," if a > k0 else "") + part).encode()))
+        self._chunk(out(b"]"))
+        if gz:
+            self._chunk(z.flush())
+        self._end_chunked()
+
+    def _get_csv(self, q: dict):
+        desde = _parse_ns(q["desde"]) if q.get("desde") else None
+        hasta = _parse_ns(q["hasta"]) if q.get("hasta") else None
+        k0, k1 = self.data.index_range(desde, hasta)
+        gz = "gzip" in (self.headers.get("Accept-Encoding") or "")
+        z = zlib.compressobj(6, zlib.DEFLATED, 31) if gz else None
+        out = z.compress if gz else (lambda b: b)
+        self._start_chunked("text/csv", "gzip" if gz else None)
+        header = "id,ts," + ",".join(f"s{j + 1}" for j in range(self.data.sensors)) + "\n"
+        self._chunk(out(header.encode()))
+        for a in range(k0, k1, 5000):
+            self._chunk(out(self.data.rows_csv(a, min(k1, a + 5000)).encode()))
+        if gz:
+            self._chunk(z.flush())
+        self._end_chunked()
+
+    def _stream_registros(self, q: dict):
+        desde = _parse_ns(q["desde"]) if q.get("desde") else None
+        k_next = self.data.index_range(desde, None)[0] if desde is not None \
+            else self.data.index_range(None, None)[1]
+        self._start_chunked("text/event-stream")
+        try:
+            self._chunk(b"retry: 1000\n\n")
+            last_beat = time.monotonic()
+            while not self.server.stopping:
+                k_end = self.data.index_range(None, None)[1]
+                if k_end > k_next:
+                    # Atraso (reconexión con 'desde'): se envía en eventos de hasta 1000 filas
+                    for a in range(k_next, k_end, 1000):
+                        rows = [self.data.row(k) for k in range(a, min(k_end, a + 1000))]
+                        ev = f"event: registro\nid: {rows[-1]['ts']}\ndata: {json.dumps(rows)}\n\n"
+                        self._chunk(ev.encode())
+                    k_next = k_end
+                    last_beat = time.monotonic()
+                elif time.monotonic() - last_beat > 15:
+                    self._chunk(b": keep-alive\n\n")
+                    last_beat = time.monotonic()
+                self.wfile.flush()
+                time.sleep(min(0.25, self.data.period_ns / 4e9))
+            self._end_chunked()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+
+class MockServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, addr, data: SyntheticData, stream_enabled: bool = True,
+                 access_ttl: int = 3600, verbose: bool = False, role: str = "admin"):
+        handler = type("BoundHandler", (Handler,), {"data": data, "stream_enabled": stream_enabled})
+        super().__init__(addr, handler)
+        self.data = data
+        self.users = Users(role)
+        self.access_ttl = access_ttl
+        self.verbose = verbose
+        self.stopping = False
+        self.started = time.monotonic()
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def shutdown(self):
+        self.stopping = True
+        super().shutdown()
+
+
+def serve_in_thread(port: int = 0, **kwargs) -> MockServer:
+    """Levanta el servidor en un hilo daemon (port=0 → puerto libre). Devuelve el servidor."""
+    data = SyntheticData(**{k: kwargs.pop(k) for k in ("rate", "history_s", "sensors") if k in kwargs})
+    srv = MockServer(("127.0.0.1", port), data, **kwargs)
+    threading.Thread(target=srv.serve_forever, name="mock-fadeapi", daemon=True).start()
+    return srv
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Servidor local que imita FAdeAPI con datos sintéticos.")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--rate", type=float, default=1.0, help="filas por segundo")
+    ap.add_argument("--history", type=float, default=3600.0, help="segundos de historia al arrancar")
+    ap.add_argument("--sensors", type=int, default=3)
+    ap.add_argument("--access-ttl", type=int, default=3600, help="vida del access token (s)")
+    ap.add_argument("--no-stream", action="store_true", help="registros/stream responde 404")
+    ap.add_argument("--role", choices=("admin", "user"), default="admin", help="rol de los usuarios nuevos")
+    ap.add_argument("-v", "--verbose", action="store_true")
+    a = ap.parse_args()
+
+    data = SyntheticData(a.rate, a.history, a.sensors)
+    srv = MockServer((a.host, a.port), data, stream_enabled=not a.no_stream,
+                     access_ttl=a.access_ttl, verbose=a.verbose, role=a.role)
+    print(f"Mock FAdeAPI en {srv.url} ({a.rate:g} filas/s, {a.sensors} sensores)")
+    try:
+        srv.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        srv.stopping = True
+        srv.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,7 @@
 from PySide6.QtWidgets import QDialog, QLineEdit, QVBoxLayout, QLabel, QPushButton, QMessageBox, QCheckBox
 from core.auth import login, save_tokens
 from core.config import Config
-import asyncio
+from core.workers import run_sync
 from datetime import datetime, timezone
 
 
@@ -46,7 +46,7 @@ class LoginDialog(QDialog):
         username = self.u.text().strip()
         password = self.p.text()
         try:
-            access, refresh = asyncio.run(login(base_url, username, password))
+            access, refresh = run_sync(login(base_url, username, password))
             save_tokens(username, access, refresh)
             cfg = Config()
             cfg.set_last_username(username)
@@ -1,10 +1,7 @@
 # ui/main_window.py
 import asyncio
-from datetime import datetime, timezone, timedelta
-from zoneinfo import ZoneInfo  # Python 3.9+; en Windows conviene instalar 'tzdata'
-from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas
-from matplotlib.figure import Figure
-import matplotlib.dates as mdates
+import time
+import numpy as np
 from PySide6.QtWidgets import (
     QMainWindow,
     QWidget,
@@ -16,8 +13,11 @@ from PySide6.QtWidgets import (
     QHBoxLayout,
     QTableWidget,
     QTableWidgetItem,
+    QTableView,
+    QHeaderView,
     QFileDialog,
     QSpinBox,
+    QDoubleSpinBox,
     QLineEdit,
     QFormLayout,
     QGroupBox,
@@ -27,93 +27,174 @@ from PySide6.QtWidgets import (
     QTextEdit,
     QDialog,
     QProgressDialog,
+    QComboBox,
 )
 
-from core.api import ApiClient
-from core.workers import run_bg
+from core.api import _HTTP2_AVAILABLE, ApiClient, StreamUnsupported
+from core.registros_store import BoundedRegistrosStore, RegistrosStore, iso_from_ns, records_to_arrays
+from core.lod import MinMaxPyramid, lttb
+from core.live import LivePacer, is_transient, retry_after_s
+from core.local_cache import LocalCache
+from core.csv_import import iter_csv_chunks
+from core.export import iter_export
+from core.http_cache import shared_client
+from core.transfer_stats import ENCODINGS
+from core.telemetry import telemetry
+from core.timeparse import parse_iso_ns
+from core.timeparse import to_local_seconds
+from core.workers import iter_in_thread, run_async, run_async_iter, run_sync
 from core.__version__ import VERSION
 from core.updater import check_update, download_latest_asset, run_installer
 from ui.about import AboutDialog
+from ui.registros_model import RegistrosTableModel, resize_columns_from_sample
 
 from PySide6.QtCore import Signal, QObject, Qt, QTimer
+import pyqtgraph as pg
 from core.config import Config
 
 
 
+def error_summary(msg: str) -> str:
+    """Una línea legible a partir de un traceback (la última línea 'Tipo: mensaje')."""
+    lines = msg.strip().splitlines()
+    summary = next((ln for ln in reversed(lines) if ln and not ln[0].isspace() and ": " in ln
+                    and not ln.startswith("For more information")), lines[-1] if lines else msg)
+    name, _, text = summary.partition(": ")
+    if "CircuitOpenError" in name or "ConnectError" in name or "Timeout" in name:
+        text = f"No se pudo contactar al servidor. {text}".strip()
+    return text or summary
+
+
+def show_error(parent, msg: str, title: str = "Error"):
+    """Muestra la última línea del traceback; el traceback completo queda en 'Mostrar detalles'."""
+    box = QMessageBox(QMessageBox.Critical, title, error_summary(msg), parent=parent)
+    if len(msg.strip().splitlines()) > 1:
+        box.setDetailedText(msg)
+    box.exec()
+
+
 # flake8: noqa: E701,E702
 class GraficoTab(QWidget):
-    """Pestaña de gráfico con Matplotlib ocupando todo el espacio."""
+    """Pestaña de gráfico (pyqtgraph) con una curva persistente por sensor.
+
+    El eje X está en segundos "de pared" de Córdoba (UTC + offset), así el
+    DateAxisItem con utcOffset=0 rotula directamente en hora local.
+    Cada curva muestra sólo una reducción del rango visible (min/max por
+    pixel o LTTB) calculada sobre una pirámide precomputada por sensor, y se
+    recalcula al hacer zoom/pan.
+    """
     def __init__(self):
         super().__init__()
-        self.fig = Figure(figsize=(6, 4))
-        self.ax = self.fig.add_subplot(111)
-        self.canvas = FigureCanvas(self.fig)
+        pg.setConfigOptions(antialias=False)
+        cfg = Config()
+        self.lod_mode = cfg.get_plot_lod()   # "minmax" | "lttb"
+        self.axis = pg.DateAxisItem(orientation="bottom", utcOffset=0)
+        self.plot = pg.PlotWidget(axisItems={"bottom": self.axis})
+        self.plot.setBackground("w")
+        self.plot.showGrid(x=True, y=True, alpha=0.3)
+        self.plot.setLabel("bottom", "Tiempo (Córdoba)")
+        self.plot.setLabel("left", "Valor")
+        self.legend = self.plot.addLegend()
+        if cfg.get_plot_opengl():
+            try:
+                self.plot.useOpenGL(True)
+            except Exception:
+                pass
+
+        self.curves: list[pg.PlotDataItem] = []
+        self.pyramids: list[MinMaxPyramid] = []
+        self._store: RegistrosStore | None = None
+        # X en hora local (float64 s), extendido incrementalmente mientras el store sólo crezca al final
+        self._x = np.empty(0)
+        self._n = 0
+        self._generation = None
+
+        # Re-reducción al cambiar el rango visible o el tamaño (con debounce)
+        self._render_timer = QTimer(self)
+        self._render_timer.setSingleShot(True)
+        self._render_timer.setInterval(30)
+        self._render_timer.timeout.connect(self._render)
+        vb = self.plot.getViewBox()
+        vb.sigXRangeChanged.connect(lambda *_: self._render_timer.start())
+        vb.sigResized.connect(lambda *_: self._render_timer.start())
 
         lay = QVBoxLayout(self)
         lay.setContentsMargins(6, 6, 6, 6)
-        lay.addWidget(self.canvas)
-        
-
-    @staticmethod
-    def _parse_iso(ts_str: str) -> datetime:
-        s = ts_str.replace("Z", "+00:00")
-        dt = datetime.fromisoformat(s)
-        if dt.tzinfo is None:
-            dt = dt.replace(tzinfo=timezone.utc)
-        return dt
-
-    def update_plot(self, data: list[dict]):
-        """Redibuja todas las series con los datos provistos (timezone Córdoba)."""
-        tz = ZoneInfo("America/Argentina/Cordoba")
-
-        self.fig.clear()
-        ax = self.fig.add_subplot(111)
-
-        if not data:
-            ax.set_xlabel("Tiempo")
-            ax.set_ylabel("Valor")
-            ax.grid(True)
-            self.canvas.draw()
+        lay.addWidget(self.plot)
+
+    def _sync_x(self, store: RegistrosStore) -> tuple[np.ndarray, int | None]:
+        """Extiende X con las filas nuevas. Devuelve (x, primera fila recalculada o None si se rehízo todo)."""
+        n = len(store)
+        first: int | None = self._n
+        if self._generation != store.generation or n < self._n:
+            self._n, first = 0, None
+            self._generation = store.generation
+        if n > self._x.shape[0]:
+            x = np.empty(max(n, 2 * self._x.shape[0]))
+            x[:self._n] = self._x[:self._n]
+            self._x = x
+        if n > self._n:
+            self._x[self._n:n] = to_local_seconds(store.ts[self._n:n])  # tabla de offsets cacheada
+            self._n = n
+        return self._x[:n], first
+
+    def _curve(self, idx: int) -> pg.PlotDataItem:
+        while len(self.curves) <= idx:
+            i = len(self.curves)
+            c = self.plot.plot(
+                pen=pg.mkPen(pg.intColor(i, hues=9), width=1),
+                name=f"s{i+1}",
+                connect="finite",   # NaN (canal ausente) → hueco
+            )
+            self.curves.append(c)
+            self.pyramids.append(MinMaxPyramid())
+        return self.curves[idx]
+
+    def update_plot(self, store: RegistrosStore):
+        """Actualiza pirámides y curvas; si fue un append sólo procesa las filas nuevas."""
+        self._store = store
+        if not len(store) or store.n_sensors == 0:
+            for c, p in zip(self.curves, self.pyramids):
+                c.setData([], [])
+                p.clear()
+            self._n = 0
             return
 
-        max_s = max((len(r.get("sensores", [])) for r in data), default=0)
-        if max_s == 0:
-            self.canvas.draw()
+        with telemetry.stage("plot_update"):
+            _, first = self._sync_x(store)
+            for idx in range(store.n_sensors):
+                self._curve(idx)
+                pyr = self.pyramids[idx]
+                if first is None:
+                    pyr.clear()
+                pyr.update(store.column(idx))
+        self._render()
+
+    def _visible_rows(self, x: np.ndarray) -> tuple[int, int]:
+        vb = self.plot.getViewBox()
+        if vb.state["autoRange"][0]:
+            return 0, len(x)
+        x0, x1 = vb.viewRange()[0]
+        i0 = max(0, int(np.searchsorted(x, x0)) - 1)
+        i1 = min(len(x), int(np.searchsorted(x, x1, side="right")) + 1)
+        return i0, i1
+
+    def _render(self):
+        store = self._store
+        if store is None or not self._n:
             return
-
-        # Timestamps → datetime local Córdoba
-        x_dt_local = [self._parse_iso(r["ts"]).astimezone(tz) for r in data]
-        x_num = mdates.date2num(x_dt_local)
-
-        # Curvas
-        for idx in range(max_s):
-            y_vals = []
-            for r in data:
-                sensores = r.get("sensores", [])
-                y_vals.append(sensores[idx] if idx < len(sensores) else None)
-            ax.plot_date(x_num, y_vals, "-", marker="o", label=f"s{idx+1}")
-
-        # Formato de fechas: locator+Concise para que no ensucie
-        locator = mdates.AutoDateLocator(tz=tz)
-        formatter = mdates.ConciseDateFormatter(locator, tz=tz)
-        ax.xaxis.set_major_locator(locator)
-        ax.xaxis.set_major_formatter(formatter)
-
-        ax.set_ylabel("Valor")
-        ax.set_xlabel("Tiempo (Córdoba)")
-        ax.grid(True)
-        ax.legend()
-
-        # Padding Y
-        try:
-            ymin, ymax = ax.get_ybound()
-            if ymin == ymax:
-                ymin, ymax = ymin - 0.5, ymax + 0.5
-            ax.set_ybound(ymin - 0.05*(ymax-ymin), ymax + 0.05*(ymax-ymin))
-        except Exception:
-            pass
-
-        self.canvas.draw()
+        with telemetry.stage("plot_render"):
+            x = self._x[:self._n]
+            i0, i1 = self._visible_rows(x)
+            width = max(100, int(self.plot.getViewBox().width()))
+            for idx in range(min(store.n_sensors, len(self.curves))):
+                y = store.column(idx)
+                if self.lod_mode == "lttb":
+                    xs, ys = self.pyramids[idx].query(x, y, i0, i1, 2 * width)
+                    xs, ys = lttb(xs, ys, width)
+                else:
+                    xs, ys = self.pyramids[idx].query(x, y, i0, i1, width)
+                self.curves[idx].setData(xs, ys)
 
 
 class StatusViewDialog(QDialog):
@@ -159,6 +240,86 @@ class StatusViewDialog(QDialog):
         lay.addLayout(btns)
 
 
+class DiagnosticsDialog(QDialog):
+    """Latencias por endpoint y por etapa (p50/p95/p99) y contadores, con exportación JSON/Prometheus."""
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Diagnóstico")
+        self.resize(760, 480)
+
+        lay = QVBoxLayout(self)
+        self.lbl = QLabel()
+        lay.addWidget(self.lbl)
+
+        self.tbl_hist = QTableWidget()
+        self.tbl_hist.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        lay.addWidget(self.tbl_hist, 3)
+        self.tbl_count = QTableWidget()
+        self.tbl_count.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        lay.addWidget(self.tbl_count, 2)
+
+        btns = QHBoxLayout()
+        btn_refresh = QPushButton("Actualizar")
+        btn_reset = QPushButton("Reiniciar")
+        btn_json = QPushButton("Exportar JSON…")
+        btn_prom = QPushButton("Exportar Prometheus…")
+        btn_cerrar = QPushButton("Cerrar")
+        btn_refresh.clicked.connect(self.refresh)
+        btn_reset.clicked.connect(lambda: (telemetry.reset(), self.refresh()))
+        btn_json.clicked.connect(lambda: self._export("telemetria.json", "JSON (*.json)", telemetry.to_json))
+        btn_prom.clicked.connect(lambda: self._export("telemetria.prom", "Prometheus (*.prom *.txt)", telemetry.to_prometheus))
+        btn_cerrar.clicked.connect(self.accept)
+        for b in (btn_refresh, btn_reset, btn_json, btn_prom):
+            btns.addWidget(b)
+        btns.addStretch(1); btns.addWidget(btn_cerrar)
+        lay.addLayout(btns)
+
+        # Mientras está abierto se actualiza solo
+        self._timer = QTimer(self)
+        self._timer.setInterval(2000)
+        self._timer.timeout.connect(self.refresh)
+        self._timer.start()
+        self.refresh()
+
+    @staticmethod
+    def _labels(labels: dict) -> str:
+        return ", ".join(f"{k}={v}" for k, v in labels.items())
+
+    def refresh(self):
+        snap = telemetry.snapshot()
+        self.lbl.setText(f"Desde {time.strftime('%H:%M:%S', time.localtime(snap['started']))} · "
+                         f"percentiles sobre las últimas {telemetry.window} muestras de cada serie")
+
+        headers = ["métrica", "etiquetas", "n", "p50 (ms)", "p95 (ms)", "p99 (ms)", "máx (ms)"]
+        self.tbl_hist.setColumnCount(len(headers))
+        self.tbl_hist.setHorizontalHeaderLabels(headers)
+        self.tbl_hist.setRowCount(len(snap["histograms"]))
+        for r, h in enumerate(snap["histograms"]):
+            cells = [h["name"], self._labels(h["labels"]), f"{h['count']:,}"]
+            cells += [f"{h[k] * 1000:.1f}" if k in h else "—" for k in ("p50", "p95", "p99", "max")]
+            for c, text in enumerate(cells):
+                self.tbl_hist.setItem(r, c, QTableWidgetItem(text))
+        self.tbl_hist.resizeColumnsToContents()
+
+        self.tbl_count.setColumnCount(3)
+        self.tbl_count.setHorizontalHeaderLabels(["contador", "etiquetas", "valor"])
+        self.tbl_count.setRowCount(len(snap["counters"]))
+        for r, cnt in enumerate(snap["counters"]):
+            for c, text in enumerate([cnt["name"], self._labels(cnt["labels"]), f"{cnt['value']:,.0f}"]):
+                self.tbl_count.setItem(r, c, QTableWidgetItem(text))
+        self.tbl_count.resizeColumnsToContents()
+
+    def _export(self, default: str, filt: str, render):
+        path, _ = QFileDialog.getSaveFileName(self, "Exportar telemetría", default, filt)
+        if not path:
+            return
+        try:
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(render())
+        except OSError as e:
+            QMessageBox.critical(self, "Exportar", str(e))
+
+
 class ConfigTab(QWidget):
     
     theme_changed = Signal(str)   # "light" | "dark"
@@ -200,16 +361,67 @@ class ConfigTab(QWidget):
         grp_prefs = QGroupBox("Preferencias")
         self.cb_auto_update = QCheckBox("Buscar actualizaciones al iniciar")
         self.cb_auto_update.setChecked(self.cfg.get_auto_check_updates())
+        self.cb_opengl = QCheckBox("Gráfico con aceleración OpenGL (requiere reiniciar)")
+        self.cb_opengl.setChecked(self.cfg.get_plot_opengl())
+        self.cb_local_cache = QCheckBox("Guardar registros en caché local (requiere reiniciar)")
+        self.cb_local_cache.setChecked(self.cfg.get_local_cache())
+        self.cb_http_cache = QCheckBox("Caché HTTP condicional (ETag / 304)")
+        self.cb_http_cache.setChecked(self.cfg.get_http_cache())
+        self.cb_csv_gzip = QCheckBox("Descargar CSV comprimido")
+        self.cb_csv_gzip.setChecked(self.cfg.get_csv_gzip())
+        self.cb_compression = QCheckBox(f"Respuestas comprimidas ({', '.join(ENCODINGS)})")
+        self.cb_compression.setChecked(self.cfg.get_http_compression())
+        self.cb_compression.setToolTip("Para brotli/zstd instale httpx[brotli,zstd]")
+        self.cb_http2 = QCheckBox("HTTP/2 si el servidor lo ofrece")
+        self.cb_http2.setChecked(self.cfg.get_http2())
+        if not _HTTP2_AVAILABLE:
+            self.cb_http2.setEnabled(False)
+            self.cb_http2.setToolTip("Requiere httpx[http2]")
+        self.cmb_lod = QComboBox()
+        self.cmb_lod.addItem("Envolvente min/max (conserva picos)", "minmax")
+        self.cmb_lod.addItem("LTTB (menos puntos)", "lttb")
+        self.cmb_lod.setCurrentIndex(max(0, self.cmb_lod.findData(self.cfg.get_plot_lod())))
 
         self.sp_limit = QSpinBox(); self.sp_limit.setRange(1, 1_000_000); self.sp_limit.setValue(self.cfg.get_default_limit())
         self.sp_rem   = QSpinBox(); self.sp_rem.setRange(1, 365); self.sp_rem.setValue(self.cfg.get_remember_days_default())
+        self.sp_connect_to = QDoubleSpinBox(); self.sp_connect_to.setRange(1, 120); self.sp_connect_to.setValue(self.cfg.get_http_connect_timeout())
+        self.sp_read_to = QDoubleSpinBox(); self.sp_read_to.setRange(1, 600); self.sp_read_to.setValue(self.cfg.get_http_read_timeout())
+        self.sp_retries = QSpinBox(); self.sp_retries.setRange(1, 10); self.sp_retries.setValue(self.cfg.get_http_retries())
 
         lay_prefs = QFormLayout()
         lay_prefs.addRow("Límite por defecto (Registros)", self.sp_limit)
         lay_prefs.addRow("Recordarme (días)", self.sp_rem)
+        lay_prefs.addRow("Timeout de conexión (s)", self.sp_connect_to)
+        lay_prefs.addRow("Timeout de lectura (s)", self.sp_read_to)
+        lay_prefs.addRow("Intentos por solicitud", self.sp_retries)
         lay_prefs.addRow(self.cb_auto_update)
+        lay_prefs.addRow(self.cb_opengl)
+        lay_prefs.addRow(self.cb_local_cache)
+        lay_prefs.addRow(self.cb_csv_gzip)
+        lay_prefs.addRow(self.cb_http_cache)
+        lay_prefs.addRow(self.cb_compression)
+        lay_prefs.addRow(self.cb_http2)
+        lay_prefs.addRow("Reducción del gráfico", self.cmb_lod)
         grp_prefs.setLayout(lay_prefs)
         
+        # === Memoria (sesiones largas) ===
+        grp_mem = QGroupBox("Memoria (requiere reiniciar)")
+        self.cb_bounded = QCheckBox("Limitar registros en memoria (buffer en disco mapeado)")
+        self.cb_bounded.setChecked(self.cfg.get_store_bounded())
+        self.sp_max_rows = QSpinBox(); self.sp_max_rows.setRange(1_000, 100_000_000)
+        self.sp_max_rows.setSingleStep(100_000); self.sp_max_rows.setValue(self.cfg.get_store_max_rows())
+        self.sp_retention = QDoubleSpinBox(); self.sp_retention.setRange(0, 24 * 365); self.sp_retention.setDecimals(1)
+        self.sp_retention.setSpecialValueText("sin límite"); self.sp_retention.setValue(self.cfg.get_store_retention_h())
+        self.sp_max_sensors = QSpinBox(); self.sp_max_sensors.setRange(1, 1024)
+        self.sp_max_sensors.setValue(self.cfg.get_store_max_sensors())
+
+        lay_mem = QFormLayout()
+        lay_mem.addRow(self.cb_bounded)
+        lay_mem.addRow("Máximo de filas", self.sp_max_rows)
+        lay_mem.addRow("Retención (horas)", self.sp_retention)
+        lay_mem.addRow("Máximo de sensores", self.sp_max_sensors)
+        grp_mem.setLayout(lay_mem)
+
         # === Tema ===
         grp_theme = QGroupBox("Tema de la interfaz")
         self.rb_light = QRadioButton("Claro")
@@ -230,20 +442,24 @@ class ConfigTab(QWidget):
         # === Botones ===
         btn_save = QPushButton("Guardar")
         btn_test = QPushButton("Probar /status")
+        btn_diag = QPushButton("Diagnóstico")
 
         btn_save.clicked.connect(self._save)
         btn_test.clicked.connect(self._test_status)
+        btn_diag.clicked.connect(lambda: DiagnosticsDialog(self).exec())
 
         # === Layout principal ===
         root = QVBoxLayout(self)
         root.addWidget(grp_api)
         root.addWidget(grp_prefs)
+        root.addWidget(grp_mem)
         root.addWidget(grp_theme)
 
 
         row = QHBoxLayout()
         row.addStretch(1)
         row.addWidget(btn_test)
+        row.addWidget(btn_diag)
         row.addWidget(btn_save)
         root.addLayout(row)
         root.addStretch(1)
@@ -266,6 +482,21 @@ class ConfigTab(QWidget):
 
         # Prefs
         self.cfg.set_auto_check_updates(self.cb_auto_update.isChecked())
+        self.cfg.set_plot_opengl(self.cb_opengl.isChecked())
+        self.cfg.set_plot_lod(self.cmb_lod.currentData())
+        self.cfg.set_csv_gzip(self.cb_csv_gzip.isChecked())
+        self.cfg.set_http_cache(self.cb_http_cache.isChecked())
+        self.cfg.set_http_compression(self.cb_compression.isChecked())
+        self.cfg.set_http_connect_timeout(float(self.sp_connect_to.value()))
+        self.cfg.set_http_read_timeout(float(self.sp_read_to.value()))
+        self.cfg.set_http_retries(int(self.sp_retries.value()))
+        if self.cb_http2.isEnabled():
+            self.cfg.set_http2(self.cb_http2.isChecked())
+        self.cfg.set_local_cache(self.cb_local_cache.isChecked())
+        self.cfg.set_store_bounded(self.cb_bounded.isChecked())
+        self.cfg.set_store_max_rows(int(self.sp_max_rows.value()))
+        self.cfg.set_store_retention_h(float(self.sp_retention.value()))
+        self.cfg.set_store_max_sensors(int(self.sp_max_sensors.value()))
         self.cfg.set_default_limit(int(self.sp_limit.value()))
         self.cfg.set_remember_days_default(int(self.sp_rem.value()))
         # Tema
@@ -277,55 +508,98 @@ class ConfigTab(QWidget):
         QMessageBox.information(self, "Configuración", "Preferencias guardadas.\nLos cambios aplican a nuevas conexiones.")
 
     def _test_status(self):
-        # pequeño test síncrono usando httpx (sin ApiClient para no depender de auth)
-        try:
-            import httpx
-            url = self.cfg.base_url()
-            with httpx.Client(base_url=url, timeout=10, follow_redirects=True) as c:
-                r = c.get("status")
-                r.raise_for_status()
-                data = r.json() if r.headers.get("content-type","").startswith("application/json") else {"raw": r.text}
-            # Mostrar con formato lindo
-            dlg = StatusViewDialog(data, self)
-            dlg.exec()
-        except Exception as e:
-            QMessageBox.critical(self, "Status ERROR", str(e))
+        # Consulta sin ApiClient para no depender de auth; pasa por la caché condicional compartida
+        url = self.cfg.base_url()
+
+        async def probe():
+            r = await shared_client().get(url + "status")
+            r.raise_for_status()
+            return r.json() if r.headers.get("content-type", "").startswith("application/json") else {"raw": r.text}
+
+        # Mostrar con formato lindo
+        run_async(probe(),
+                  on_result=lambda data: StatusViewDialog(data, self).exec(),
+                  on_error=lambda msg: QMessageBox.critical(self, "Status ERROR", msg.strip().splitlines()[-1]))
 
 
 
 class RegistrosTab(QWidget):
     """Pestaña de registros: SOLO la tabla. Emite señal con los datos para el gráfico."""
-    data_updated = Signal(list)  # emite la lista de dicts [{ts, sensores}, ...]
+    data_updated = Signal(object)  # emite el RegistrosStore (arrays ts / valores)
 
     def __init__(self, api: ApiClient):
         super().__init__()
         self.api = api
-        self._data: list[dict] = []  # cache local ordenado asc por ts
-
-        # --- Tabla ---
-        self.table = QTableWidget(0, 0)
+        cfg = Config()
+        # cache local columnar, ordenado asc por ts (acotado y en memmap si así se configuró)
+        if cfg.get_store_bounded():
+            self._data = BoundedRegistrosStore(max_rows=cfg.get_store_max_rows(),
+                                               max_sensors=cfg.get_store_max_sensors(),
+                                               retention_s=cfg.get_store_retention_h() * 3600)
+        else:
+            self._data = RegistrosStore()
+        self._cache: LocalCache | None = None  # copia en disco (SQLite), si está habilitada
+        self._cache_opening = None             # AsyncTask de open_local_cache en curso
+        self._imported = False  # el store tiene datos de un CSV importado (no del servidor)
+
+        # El gráfico se notifica como mucho cada 150 ms aunque lleguen muchos lotes seguidos
+        self._emit_timer = QTimer(self)
+        self._emit_timer.setSingleShot(True)
+        self._emit_timer.setInterval(150)
+        self._emit_timer.timeout.connect(lambda: self.data_updated.emit(self._data))
+
+        # Modo en vivo: un solo poll a la vez; el próximo se agenda al terminar el anterior
+        self._pacer = LivePacer()
+        self._live_timer = QTimer(self)
+        self._live_timer.setSingleShot(True)
+        self._live_timer.timeout.connect(self._live_poll)
+        self._live_busy = False
+        self._live_stream = None      # AsyncTask del stream SSE, si está activo
+        self._stream_supported = True # se apaga si el servidor no tiene registros/stream
+
+        # --- Tabla (modelo virtual: las celdas se leen del store al pintarse) ---
+        self.model = RegistrosTableModel(self._data, self)
+        self.table = QTableView()
+        self.table.setModel(self.model)
         self.table.setAlternatingRowColors(True)
         self.table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
         self.table.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
+        self.table.setWordWrap(False)
+        vh = self.table.verticalHeader()
+        vh.setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        vh.setDefaultSectionSize(self.table.fontMetrics().height() + 6)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Interactive)
 
         # --- Controles ---
         self.limit = QSpinBox()
         self.limit.setRange(1, 1_000_000)
         # self.limit.setValue(10_000)
         self.limit.setValue(Config().get_default_limit())
+        self.desde = QLineEdit(); self.desde.setPlaceholderText("YYYY-MM-DDTHH:MM:SS")
         self.hasta = QLineEdit(); self.hasta.setPlaceholderText("YYYY-MM-DDTHH:MM:SS (opcional)")
 
         btn_refresh = QPushButton("Actualizar (incremental)")
+        btn_range   = QPushButton("Cargar rango")
         btn_csv     = QPushButton("Descargar CSV")
+        btn_import  = QPushButton("Importar CSV")
+        btn_export  = QPushButton("Exportar...")
         btn_delete  = QPushButton("Borrar TODOS (admin)")
         btn_refresh.clicked.connect(self.load_async)
+        btn_range.clicked.connect(self.load_range_async)
         btn_csv.clicked.connect(self.download_csv_async)
+        btn_import.clicked.connect(self.import_csv_async)
+        btn_export.clicked.connect(self.export_async)
         btn_delete.clicked.connect(self.delete_all_async)
+        self.cb_live = QCheckBox("En vivo")
+        self.cb_live.toggled.connect(self._set_live)
+        self.lbl_live = QLabel("")
 
         top = QHBoxLayout()
         top.addWidget(QLabel("limit:")); top.addWidget(self.limit)
+        top.addWidget(QLabel("desde:")); top.addWidget(self.desde)
         top.addWidget(QLabel("hasta:")); top.addWidget(self.hasta)
-        top.addStretch(1); top.addWidget(btn_refresh); top.addWidget(btn_csv); top.addWidget(btn_delete)
+        top.addStretch(1); top.addWidget(self.lbl_live); top.addWidget(self.cb_live)
+        top.addWidget(btn_refresh); top.addWidget(btn_range); top.addWidget(btn_csv); top.addWidget(btn_import); top.addWidget(btn_export); top.addWidget(btn_delete)
 
         lay = QVBoxLayout(self)
         lay.addLayout(top)
@@ -333,98 +607,411 @@ class RegistrosTab(QWidget):
 
     # ----------------- helpers -----------------
     def _err(self, msg: str):
-        QMessageBox.critical(self, "Error", msg)
-
-    @staticmethod
-    def _parse_iso(ts_str: str) -> datetime:
-        s = ts_str.replace("Z", "+00:00")
-        dt = datetime.fromisoformat(s)
-        if dt.tzinfo is None:
-            dt = dt.replace(tzinfo=timezone.utc)
-        return dt
+        show_error(self, msg)
 
     def _max_ts_plus_eps_iso(self) -> str | None:
-        if not self._data:
+        wm = self._data.watermark
+        if wm is None:
             return None
-        mx = max(self._parse_iso(r["ts"]) for r in self._data if r.get("ts"))
-        return (mx + timedelta(microseconds=1)).isoformat()
-
-    def _merge_new_data(self, new: list[dict]):
-        if not new:
+        return iso_from_ns(wm + 1000)  # +1 µs
+
+    def _merge(self, ts: np.ndarray, vals: np.ndarray) -> tuple[int, int]:
+        with telemetry.stage("merge"):
+            return self._data.merge_arrays(ts, vals)
+
+    async def _to_arrays(self, recs: list[dict]) -> tuple[np.ndarray, np.ndarray]:
+        """Registros → arrays (en el hilo del loop) y copia a la caché en disco sin bloquear el loop."""
+        with telemetry.stage("to_arrays"):
+            arrays = records_to_arrays(recs)
+        cache = await self._local_cache()
+        if cache is not None:
+            await asyncio.to_thread(cache.append, *arrays)
+        return arrays
+
+    # ----------------- caché en disco -----------------
+    def open_local_cache(self):
+        """Carga en segundo plano la caché en disco y después sincroniza desde su watermark."""
+        if not Config().get_local_cache():
             return
-        seen = {r["ts"] for r in self._data if r.get("ts")}
-        for r in new:
-            ts = r.get("ts")
-            if ts and ts not in seen:
-                self._data.append(r)
-        self._data.sort(key=lambda r: self._parse_iso(r["ts"]))  # ascendente
+        base_url = self.api.base_url
+
+        async def load():
+            cache = await asyncio.to_thread(LocalCache, base_url)
+            self._cache = cache
+            return await asyncio.to_thread(cache.load)
+
+        def done(res):
+            if self._cache_opening is not task:
+                return  # se cerró mientras cargaba
+            self._cache_opening = None
+            ts, vals = res
+            if len(ts):
+                self._update_table(*self._merge(ts, vals))
+                self.lbl_live.setText(f"{len(ts):,} registros desde la caché local")
+            self.load_async(quiet=True)
+
+        def failed(msg: str):
+            if self._cache_opening is task:
+                self._cache_opening = None
+            self._err(msg)
+
+        task = self._cache_opening = run_async(load(), on_result=done, on_error=failed)
+
+    async def _local_cache(self) -> LocalCache | None:
+        """Caché en disco de la URL actual (en el hilo del loop).
+
+        Si todavía se está abriendo, se la espera: una página descargada antes
+        quedaría fuera de la caché para siempre, porque la próxima sesión
+        retoma desde su watermark. Si cambió la URL de la API se la cierra.
+        """
+        opening = self._cache_opening
+        if opening is not None and not opening.done():
+            await asyncio.wait([asyncio.wrap_future(opening.future)])
+        cache = self._cache
+        if cache is not None and cache.base_url != self.api.base_url:
+            await self._close_cache()
+            return None
+        return cache
+
+    async def _close_cache(self):
+        # _cache sólo se asigna en el hilo del loop (acá y en open_local_cache)
+        cache, self._cache = self._cache, None
+        if cache is not None:
+            await asyncio.to_thread(cache.close)
+
+    def close_local_cache(self, wait: bool = False):
+        """Cierra la caché en disco (cierre de ventana, logout o cambio de servidor).
+
+        El cierre se delega al hilo del loop; con wait=True se lo espera
+        (al cerrar la ventana, antes de detener el loop).
+        """
+        if self._cache_opening is not None:
+            self._cache_opening.cancel()
+            self._cache_opening = None
+        if wait:
+            run_sync(self._close_cache(), timeout=5)
+        else:
+            run_async(self._close_cache(), on_error=self._err)
 
     # ----------------- UI update -----------------
-    def _update_table(self):
-        data = self._data
-        max_s = max((len(r.get("sensores", [])) for r in data), default=0)
-        headers = ["ts"] + [f"s{i+1}" for i in range(max_s)]
-        self.table.setRowCount(len(data))
-        self.table.setColumnCount(len(headers))
-        self.table.setHorizontalHeaderLabels(headers)
-        for row, r in enumerate(data):
-            self.table.setItem(row, 0, QTableWidgetItem(str(r.get("ts",""))))
-            sensores = r.get("sensores", [])
-            for i in range(max_s):
-                val = "" if i >= len(sensores) else str(sensores[i])
-                self.table.setItem(row, i+1, QTableWidgetItem(val))
-        self.table.resizeColumnsToContents()
+    def _update_table(self, first: int | None = None, added: int = 0):
+        """Refresca la vista tras un merge; sin argumentos resetea el modelo completo."""
+        with telemetry.stage("table"):
+            cols_before = self.model.columnCount()
+            if first is None:
+                self.model.reset()
+            else:
+                self.model.notify_merge(first, added)
+            if self.model.columnCount() != cols_before or first is None:
+                resize_columns_from_sample(self.table)
 
-        # Notificar a la pestaña de Gráfico
-        self.data_updated.emit(self._data)
+        # Notificar a la pestaña de Gráfico (coalescido)
+        if not self._emit_timer.isActive():
+            self._emit_timer.start()
 
     # ----------------- acciones en background -----------------
-    def load_async(self):
+    def _leave_imported(self):
+        """Si se estaba viendo un CSV importado, se descarta antes de volver a datos del servidor."""
+        if self._imported:
+            self._imported = False
+            self._data.clear()
+            self._update_table()
+
+    def load_async(self, quiet: bool = False):
+        self._leave_imported()
         limit = self.limit.value()
         hasta_str = self.hasta.text().strip() or None
         desde_iso = self._max_ts_plus_eps_iso()  # incremental
-        
-        busy = QProgressDialog("Actualizando registros...", None, 0, 0, self)
-        busy.setWindowTitle("Por favor, espere")
-        busy.setCancelButton(None)
-        busy.setAutoClose(True)
-        busy.setMinimumDuration(0)
-        busy.show()
+        page_size = Config().get_page_size()
+        # Páginas en streaming desde el watermark
+        self._stream_into_store(
+            self.api.iter_registros(desde_iso, hasta_str, page_size=page_size, max_rows=limit),
+            "Actualizando registros...", quiet=quiet)
+
+    def load_range_async(self):
+        desde_str = self.desde.text().strip()
+        hasta_str = self.hasta.text().strip() or None
+        if not desde_str:
+            self._err("Indicá 'desde' para cargar un rango.")
+            return
+        self._leave_imported()
+        cfg = Config()
+        # Ventanas de tiempo concurrentes; los lotes llegan en orden
+        self._stream_into_store(
+            self.api.iter_registros_parallel(desde_str, hasta_str,
+                                             concurrency=cfg.get_fetch_concurrency(),
+                                             target_rows=cfg.get_page_size(),
+                                             page_size=cfg.get_page_size()),
+            "Cargando rango...")
+
+    def _stream_into_store(self, records_iter, title: str, quiet: bool = False):
+        """Consume un async iterator de lotes de registros y los mezcla en el store a medida que llegan.
+
+        Con quiet=True no se muestra el diálogo modal: el avance va a la etiqueta de estado.
+        """
+        if quiet:
+            busy = None
+        else:
+            busy = QProgressDialog(title, "Cancelar", 0, 0, self)
+            busy.setWindowTitle("Por favor, espere")
+            busy.setAutoClose(True)
+            busy.setMinimumDuration(0)
+            busy.show()
+
+        async def batches():
+            # El parseo a arrays se hace en el hilo del loop, no en la UI
+            try:
+                async for recs in records_iter:
+                    yield await self._to_arrays(recs)
+            finally:
+                await records_iter.aclose()
 
-        def work():
-            return asyncio.run(self.api.get_registros(limit=limit, desde_iso=desde_iso, hasta_iso=hasta_str))
+        received = 0
+        mark = self.api.transfer_stats.snapshot()
 
-        def done(new_data: list[dict]):
+        def on_batch(arrays):
+            nonlocal received
+            received += len(arrays[0])
+            self._update_table(*self._merge(*arrays))
+            if busy is not None:
+                busy.setLabelText(f"{title} ({received:,} recibidos)")
+            else:
+                self.lbl_live.setText(f"{title} ({received:,} recibidos)")
+
+        def on_done(_n):
+            if not quiet:
+                self.lbl_live.setText(f"{received:,} registros · {self.api.transfer_stats.describe(mark)}")
+
+        task = run_async_iter(batches(),
+                              on_item=on_batch,
+                              on_result=on_done,
+                              on_error=self._err)
+        if busy is not None:
+            task.signals.finished.connect(busy.close)
+            busy.canceled.connect(task.cancel)
+
+    # ----------------- modo en vivo -----------------
+    def _set_live(self, on: bool):
+        if on:
+            self._leave_imported()
+            self._pacer.reset()
+            self.lbl_live.setText("En vivo: iniciando...")
+            if self._stream_supported:
+                self._start_stream()
+            elif not self._live_busy:
+                self._live_timer.start(0)
+        else:
+            self._live_timer.stop()
+            if self._live_stream is not None:
+                self._live_stream.cancel()
+                self._live_stream = None
+            self.lbl_live.setText("")
+
+    def stop_live(self):
+        """Apaga el modo en vivo y cancela el polling o el stream pendiente (cierre de ventana / logout)."""
+        self._live_timer.stop()
+        if self._live_stream is not None:
+            self._live_stream.cancel()
+            self._live_stream = None
+        if self.cb_live.isChecked():
+            self.cb_live.setChecked(False)
+
+    def _start_stream(self):
+        """Suscripción push (SSE); si el servidor no la soporta se pasa a polling."""
+        desde_iso = self._max_ts_plus_eps_iso()
+
+        async def feed():
             try:
-                self._merge_new_data(new_data)
-                self._update_table()
-            finally:
-                busy.close()
+                async for recs in self.api.stream_registros(desde_iso):
+                    yield await self._to_arrays(recs)
+            except StreamUnsupported:
+                yield None  # marca para caer a polling
+
+        def on_item(arrays):
+            if arrays is None:
+                self._stream_supported = False
+                self._live_stream = None
+                if self.cb_live.isChecked():
+                    self.lbl_live.setText("En vivo (polling)")
+                    self._live_timer.start(0)
+                return
+            first, added = self._merge(*arrays)
+            self._update_table(first, added)
+            self.lbl_live.setText(f"En vivo (stream): +{added} filas ({time.strftime('%H:%M:%S')})")
 
-        run_bg(work,
-           on_result=done,
-           on_error=lambda err: (busy.close(), self._err(err)))
+        def on_error(msg: str):
+            self._live_stream = None
+            if self.cb_live.isChecked():
+                self.lbl_live.setToolTip(msg)
+                self.cb_live.setChecked(False)
+                self.lbl_live.setText("En vivo detenido: error en el stream")
 
-    def download_csv_async(self):
-        def work(): return asyncio.run(self.api.download_csv())
-        def done(content: bytes):
-            path, _ = QFileDialog.getSaveFileName(self, "Guardar CSV", "registros.csv", "CSV (*.csv)")
-            if not path: return
+        self._live_stream = run_async_iter(feed(), on_item=on_item, on_error=on_error)
+
+    def _live_poll(self):
+        if self._live_busy or not self.cb_live.isChecked():
+            return
+        if not self.api.has_tokens:
+            self.stop_live()
+            self.lbl_live.setText("En vivo detenido: sin sesión")
+            return
+        self._live_busy = True
+        desde_iso = self._max_ts_plus_eps_iso()
+        page_size = Config().get_page_size()
+
+        async def poll():
+            # Los errores vuelven como resultado para poder clasificarlos (429/5xx/red)
             try:
-                with open(path, "wb") as f: f.write(content)
-                QMessageBox.information(self, "OK", f"CSV guardado en:\n{path}")
+                out = []
+                async for recs in self.api.iter_registros(desde_iso, None, page_size=page_size, max_rows=page_size):
+                    out.append(await self._to_arrays(recs))
+                return out, None
             except Exception as e:
-                self._err(str(e))
-        run_bg(work, on_result=done, on_error=self._err)
+                return None, e
+
+        run_async(poll(), on_result=self._live_done,
+                  on_error=lambda msg: self._live_done((None, RuntimeError(msg))))
+
+    def _live_done(self, res):
+        self._live_busy = False
+        batches, exc = res
+        if not self.cb_live.isChecked():
+            return
+        hora = time.strftime("%H:%M:%S")
+        if exc is None:
+            rows = 0
+            for ts, vals in batches:
+                first, added = self._merge(ts, vals)
+                self._update_table(first, added)
+                rows += added
+            delay = self._pacer.on_success(rows)
+            self.lbl_live.setText(f"En vivo: +{rows} filas ({hora}), próximo en {delay:.0f} s")
+        elif is_transient(exc):
+            delay = self._pacer.on_error(retry_after_s(exc))
+            self.lbl_live.setText(f"En vivo: error ({hora}), reintento en {delay:.0f} s")
+            self.lbl_live.setToolTip(str(exc))
+        else:
+            # Error no recuperable (p. ej. sesión inválida): se apaga el modo en vivo sin modales
+            self.lbl_live.setToolTip(str(exc))
+            self.cb_live.setChecked(False)
+            self.lbl_live.setText(f"En vivo detenido: {exc}"[:120])
+            return
+        self._live_timer.start(int(delay * 1000))
+
+    def download_csv_async(self):
+        path, _ = QFileDialog.getSaveFileName(self, "Guardar CSV", "registros.csv", "CSV (*.csv)")
+        if not path:
+            return
+
+        busy = QProgressDialog("Descargando CSV...", "Cancelar", 0, 0, self)
+        busy.setWindowTitle("Por favor, espere")
+        busy.setAutoClose(False)
+        busy.setMinimumDuration(0)
+        busy.show()
+
+        def on_progress(p):
+            done, total = p
+            if total:
+                busy.setMaximum(100)
+                busy.setValue(int(done * 100 / total))
+            busy.setLabelText(f"Descargando CSV... ({done / 1e6:,.1f} MB)")
+
+        def finished(_):
+            busy.close()
+            QMessageBox.information(self, "OK", f"CSV guardado en:\n{path}")
+
+        task = run_async_iter(self.api.download_csv_to(path, gzip=Config().get_csv_gzip()),
+                              on_item=on_progress,
+                              on_result=finished,
+                              on_error=self._err)
+        task.signals.error.connect(lambda _: busy.close())
+        busy.canceled.connect(task.cancel)
+
+    def import_csv_async(self):
+        path, _ = QFileDialog.getOpenFileName(self, "Importar CSV", "", "CSV (*.csv);;Todos (*)")
+        if not path:
+            return
+        if self.cb_live.isChecked():
+            self.cb_live.setChecked(False)
+        # Los datos importados reemplazan a los del servidor y no van a la caché en disco
+        self._imported = True
+        self._data.clear()
+        self._update_table()
+
+        busy = QProgressDialog("Importando CSV...", "Cancelar", 0, 100, self)
+        busy.setWindowTitle("Por favor, espere")
+        busy.setAutoClose(False)
+        busy.setMinimumDuration(0)
+        busy.show()
+
+        def on_chunk(chunk):
+            ts, vals, done, total = chunk
+            self._update_table(*self._merge(ts, vals))
+            busy.setValue(int(done * 100 / total) if total else 100)
+            busy.setLabelText(f"Importando CSV... ({len(self._data):,} filas)")
+
+        def finished(_):
+            busy.close()
+            self.lbl_live.setText(f"CSV importado: {len(self._data):,} filas")
+
+        # Cada bloque se lee y parsea en un hilo aparte: ni la UI ni el loop se bloquean
+        task = run_async_iter(iter_in_thread(iter_csv_chunks(path)),
+                              on_item=on_chunk, on_result=finished, on_error=self._err)
+        task.signals.error.connect(lambda _: busy.close())
+        busy.canceled.connect(task.cancel)
+
+    def export_async(self):
+        """Exporta los registros locales (todos, o el rango desde/hasta si está indicado)."""
+        if not len(self._data):
+            self._err("No hay registros para exportar.")
+            return
+        try:
+            desde_ns = parse_iso_ns(self.desde.text().strip()) if self.desde.text().strip() else None
+            hasta_ns = parse_iso_ns(self.hasta.text().strip()) if self.hasta.text().strip() else None
+        except ValueError as e:
+            self._err(f"Rango inválido: {e}")
+            return
+        path, _ = QFileDialog.getSaveFileName(
+            self, "Exportar registros", "registros.parquet",
+            "Parquet (*.parquet);;Arrow IPC (*.arrow);;NumPy (*.npz)")
+        if not path:
+            return
+        # El rango se fija aquí, en el hilo de la UI; los bloques se copian al
+        # escribirlos y un merge que desplace filas aborta la exportación
+        try:
+            steps = iter_export(self._data, path, desde_ns, hasta_ns)
+        except RuntimeError as e:
+            self._err(str(e))
+            return
+
+        busy = QProgressDialog("Exportando...", "Cancelar", 0, 100, self)
+        busy.setWindowTitle("Por favor, espere")
+        busy.setAutoClose(False)
+        busy.setMinimumDuration(0)
+        busy.show()
+
+        def on_step(step):
+            done, total = step
+            busy.setValue(int(done * 100 / total) if total else 100)
+
+        def finished(_):
+            busy.close()
+            QMessageBox.information(self, "OK", f"Registros exportados en:\n{path}")
+
+        task = run_async_iter(iter_in_thread(steps),
+                              on_item=on_step, on_result=finished, on_error=self._err)
+        task.signals.error.connect(lambda _: busy.close())
+        busy.canceled.connect(task.cancel)
 
     def delete_all_async(self):
         if QMessageBox.question(self, "Confirmar", "¿Eliminar TODOS los registros? Esta acción no se puede deshacer.") != QMessageBox.Yes:
             return
         def done(_):
             self._data.clear()
+            if self._cache is not None:
+                self._cache.clear()
             self._update_table()
-        run_bg(lambda: asyncio.run(self.api.delete_registros()),
-               on_result=done, on_error=self._err)
+        run_async(self.api.delete_registros(), on_result=done, on_error=self._err)
 
 class ProgressProxy(QObject):
     progress = Signal(int)  # 0..100
@@ -453,6 +1040,10 @@ class MainWindow(QMainWindow):
         
         # Conectar: cuando llegan/ cambian datos en "Registros", actualizamos "Gráfico"
         self.reg_tab.data_updated.connect(self.graph_tab.update_plot)
+        self.reg_tab.open_local_cache()
+        # Identidad/rol de la sesión: se consulta una vez y queda en el ApiClient
+        run_async(self.api.identity(), on_error=lambda msg: self.statusBar().showMessage(
+            f"No se pudo obtener la identidad de la sesión: {error_summary(msg)}", 10000))
         config_tab.theme_changed.connect(lambda _: self._apply_theme())
         
         self._apply_theme()
@@ -460,7 +1051,7 @@ class MainWindow(QMainWindow):
         tabs.addTab(self.reg_tab, "Registros")
         tabs.addTab(self.graph_tab, "Gráfico")
         tabs.addTab(UsuariosTab(self.api), "Usuarios (admin)")
-        tabs.addTab(ConfigTab(), "Configuración")
+        tabs.addTab(config_tab, "Configuración")
 
         about_btn = QPushButton("Acerca de")
         about_btn.clicked.connect(lambda: AboutDialog().exec())
@@ -470,6 +1061,8 @@ class MainWindow(QMainWindow):
         def _logout():
             from core.auth import delete_tokens
             from core.config import Config
+            self.reg_tab.stop_live()
+            self.reg_tab.close_local_cache()
             try:
                 delete_tokens(self.username)
                 Config().clear_remember(self.username)
@@ -488,15 +1081,16 @@ class MainWindow(QMainWindow):
         update_btn = QPushButton("Buscar actualizaciones")
 
         def _do_update_check_and_run():
-            try:
-                hay, latest = asyncio.run(check_update(VERSION))
+            def done(res):
+                hay, latest = res
                 if not hay:
                     QMessageBox.information(self, "Actualizaciones", f"Estás en la última versión ({VERSION}).")
                     return
                 # Mostrar el prompt SIEMPRE en el hilo UI, al frente
                 QTimer.singleShot(0, lambda: self._prompt_update(latest))
-            except Exception as e:
-                QMessageBox.warning(self, "Actualizaciones", f"No se pudo verificar:\n{e}")
+            run_async(check_update(VERSION),
+                      on_result=done,
+                      on_error=lambda err: QMessageBox.warning(self, "Actualizaciones", f"No se pudo verificar:\n{err}"))
 
         update_btn.clicked.connect(_do_update_check_and_run)
 
@@ -511,8 +1105,6 @@ class MainWindow(QMainWindow):
         
         # Auto-check de actualizaciones al iniciar
         if Config().get_auto_check_updates():
-            def work():
-                return asyncio.run(check_update(VERSION))
             def done(res):
                 try:
                     hay, latest = res
@@ -526,11 +1118,26 @@ class MainWindow(QMainWindow):
                         ))
                 except Exception:
                     pass
-            run_bg(work, on_result=done, on_error=lambda e: None)
+            run_async(check_update(VERSION), on_result=done, on_error=lambda e: None)
             
         QTimer.singleShot(0, lambda: (self.raise_(), self.activateWindow()))
 
             
+    def closeEvent(self, event):
+        # Apagar el modo en vivo antes de cerrar el pool: si no, el próximo
+        # poll recrearía el cliente con la sesión vieja (también aplica al logout)
+        self.reg_tab.stop_live()
+        try:
+            self.reg_tab.close_local_cache(wait=True)
+        except Exception:
+            pass
+        # Cerrar el pool de conexiones del ApiClient
+        try:
+            run_sync(self.api.aclose(), timeout=5)
+        except Exception:
+            pass
+        super().closeEvent(event)
+
     def _prompt_update(self, latest: str):
         # Popup en hilo UI, modal y al frente
         box = QMessageBox(self)
@@ -561,13 +1168,6 @@ class MainWindow(QMainWindow):
         proxy = ProgressProxy()
         proxy.progress.connect(dlg.setValue)
 
-        def work():
-            # descarga con callbacks de progreso
-            return asyncio.run(download_latest_asset(
-                latest,
-                progress_cb=lambda p: proxy.progress.emit(int(p))
-            ))
-
         def done(path: str):
             try:
                 run_installer(path)
@@ -580,9 +1180,10 @@ class MainWindow(QMainWindow):
             finally:
                 dlg.close()
 
-        run_bg(work,
-            on_result=done,
-            on_error=lambda err: (dlg.close(), QMessageBox.critical(self, "Actualización", err)))
+        # descarga con callbacks de progreso
+        run_async(download_latest_asset(latest, progress_cb=lambda p: proxy.progress.emit(int(p))),
+                  on_result=done,
+                  on_error=lambda err: (dlg.close(), QMessageBox.critical(self, "Actualización", err)))
 
         
     def _apply_theme(self):
@@ -616,6 +1217,7 @@ class UsuariosTab(QWidget):
         """Pestaña de administración de usuarios (100% no bloqueante)."""
         super().__init__()
         self.api = api
+        self._users: list[dict] = []
 
         # --- Lista ---
         self.table = QTableWidget(0, 0)
@@ -674,9 +1276,10 @@ class UsuariosTab(QWidget):
 
     # ---------- Helpers UI ----------
     def _err(self, msg: str):
-        QMessageBox.critical(self, "Error", msg)
+        show_error(self, msg)
 
     def _fill_table(self, users: list[dict]):
+        self._users = users
         headers = ["id", "username", "nombre", "apellido", "email", "created_at", "is_active", "role"]
         self.table.setRowCount(len(users))
         self.table.setColumnCount(len(headers))
@@ -686,19 +1289,23 @@ class UsuariosTab(QWidget):
                 self.table.setItem(r, c, QTableWidgetItem(str(u.get(k, ""))))
         self.table.resizeColumnsToContents()
 
+    async def _require_admin(self, msg: str):
+        # Identidad cacheada en el ApiClient (sin round trip); el 403 del servidor sigue mandando
+        me = await self.api.identity()
+        if me.get("role") != "admin":
+            # Un rol negativo cacheado puede estar viejo (p. ej. recién promovido): se confirma antes de negar
+            me = await self.api.identity(refresh=True)
+        if me.get("role") != "admin":
+            raise RuntimeError(msg)
+
     # ---------- Background actions ----------
     def load_async(self):
         """Lista usuarios (verifica admin) en background."""
-        def work():
-            # Ejecuta flujo async dentro del worker
-            async def flow():
-                me = await self.api.get_me()
-                if me.get("role") != "admin":
-                    raise RuntimeError("Sólo un administrador puede acceder a esta sección.")
-                return await self.api.list_usuarios()
-            return asyncio.run(flow())
+        async def flow():
+            await self._require_admin("Sólo un administrador puede acceder a esta sección.")
+            return await self.api.list_usuarios()
 
-        run_bg(work, on_result=self._fill_table, on_error=self._err)
+        run_async(flow(), on_result=self._fill_table, on_error=self._err)
 
     def create_user_async(self):
         """Crea usuario en background y refresca la lista."""
@@ -713,21 +1320,17 @@ class UsuariosTab(QWidget):
         if role:
             payload["role"] = role
 
-        def work():
-            async def flow():
-                # opcional: validar admin antes de crear
-                me = await self.api.get_me()
-                if me.get("role") != "admin":
-                    raise RuntimeError("Sólo un administrador puede crear usuarios.")
-                return await self.api.create_usuario(payload)
-            return asyncio.run(flow())
+        async def flow():
+            await self._require_admin("Sólo un administrador puede crear usuarios.")
+            return await self.api.create_usuario(payload)
 
         def done(res: dict):
             QMessageBox.information(self, "OK", f"Usuario creado: {res.get('username')}")
             self.u_username.clear(); self.u_password.clear()
-            self.load_async()
+            # La API devuelve el usuario creado: se agrega sin volver a pedir la lista
+            self._fill_table(self._users + [res])
 
-        run_bg(work, on_result=done, on_error=self._err)
+        run_async(flow(), on_result=done, on_error=self._err)
 
     def update_user_async(self):
         """Actualiza usuario en background y refresca la lista."""
@@ -744,19 +1347,15 @@ class UsuariosTab(QWidget):
 
         user_id = int(self.e_id.text())
 
-        def work():
-            async def flow():
-                me = await self.api.get_me()
-                if me.get("role") != "admin":
-                    raise RuntimeError("Sólo un administrador puede actualizar usuarios.")
-                return await self.api.update_usuario(user_id, payload)
-            return asyncio.run(flow())
+        async def flow():
+            await self._require_admin("Sólo un administrador puede actualizar usuarios.")
+            return await self.api.update_usuario(user_id, payload)
 
         def done(res: dict):
             QMessageBox.information(self, "OK", f"Actualizado: {res.get('username')}")
-            self.load_async()
+            self._fill_table([res if u.get("id") == res.get("id") else u for u in self._users])
 
-        run_bg(work, on_result=done, on_error=self._err)
+        run_async(flow(), on_result=done, on_error=self._err)
 
     # ---------- UI wiring ----------
     def _on_table_select(self):
@@ -0,0 +1,83 @@
+# ui/registros_model.py
+from PySide6.QtCore import QAbstractTableModel, QModelIndex, Qt
+from PySide6.QtWidgets import QTableView
+from core.registros_store import RegistrosStore
+
+
+class RegistrosTableModel(QAbstractTableModel):
+    """Modelo virtual sobre RegistrosStore: las celdas se formatean sólo al pintarse."""
+    def __init__(self, store: RegistrosStore, parent=None):
+        super().__init__(parent)
+        self.store = store
+        # Tamaño que conoce la vista; se actualiza entre begin*/end* al notificar cambios
+        self._rows = len(store)
+        self._cols = 1 + store.n_sensors
+
+    # ----------------- API de Qt -----------------
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else self._rows
+
+    def columnCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else self._cols
+
+    def data(self, index: QModelIndex, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        row, col = index.row(), index.column()
+        if role == Qt.ItemDataRole.DisplayRole:
+            if col == 0:
+                return self.store.ts_iso(row)
+            v = self.store.values[row, col - 1]
+            return "" if v != v else str(float(v))  # NaN → canal ausente
+        if role == Qt.ItemDataRole.TextAlignmentRole and col > 0:
+            return int(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+        return None
+
+    def headerData(self, section: int, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role != Qt.ItemDataRole.DisplayRole:
+            return None
+        if orientation == Qt.Orientation.Horizontal:
+            return "ts" if section == 0 else f"s{section}"
+        return str(section + 1)
+
+    # ----------------- notificaciones desde el store -----------------
+    def notify_merge(self, first: int, added: int):
+        """Avisa a la vista de un merge ya aplicado en el store.
+
+        Un append puro (first == filas conocidas) se anuncia con rowsInserted;
+        si cambió la cantidad de sensores o hubo inserciones intermedias se
+        resetea el modelo.
+        """
+        cols = 1 + self.store.n_sensors
+        if cols != self._cols or first < self._rows:
+            self.reset()
+            return
+        if added <= 0:
+            return
+        self.beginInsertRows(QModelIndex(), self._rows, self._rows + added - 1)
+        self._rows += added
+        self.endInsertRows()
+
+    def reset(self):
+        self.beginResetModel()
+        self._rows = len(self.store)
+        self._cols = 1 + self.store.n_sensors
+        self.endResetModel()
+
+
+def resize_columns_from_sample(view: QTableView, sample: int = 50, padding: int = 16):
+    """Ajusta anchos midiendo sólo las primeras y últimas 'sample' filas (no toda la tabla)."""
+    model = view.model()
+    rows, cols = model.rowCount(), model.columnCount()
+    if cols == 0:
+        return
+    sample_rows = list(range(min(sample, rows))) + list(range(max(sample, rows - sample), rows))
+    fm = view.fontMetrics()
+    hfm = view.horizontalHeader().fontMetrics()
+    for c in range(cols):
+        w = hfm.horizontalAdvance(str(model.headerData(c, Qt.Orientation.Horizontal)))
+        for r in sample_rows:
+            txt = model.data(model.index(r, c))
+            if txt:
+                w = max(w, fm.horizontalAdvance(txt))
+        view.setColumnWidth(c, w + padding)